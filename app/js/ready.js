@@ -506,7 +506,10 @@ document.addEventListener("DOMContentLoaded", function () {
         updateFootSwitchStatus(true);
         
         // 사이클 실행 (WebSocket 연결 상태 확인)
-        if (window.wsManager.isConnected) {
+        if (data.sequencer) {
+          // 백엔드 샷 시퀀서가 이미 샷을 실행 중 (결과는 shot_complete 이벤트)
+          console.log('[Ready.js] 백엔드 시퀀서 샷 - UI 사이클 생략');
+        } else if (window.wsManager.isConnected) {
           console.log('[Ready.js] executeCycle() 함수 호출 시작');
           executeCycle();
           console.log('[Ready.js] executeCycle() 함수 호출 완료');
@@ -177,6 +177,12 @@ class WebSocketManager {
                 console.log('[RF] 샷 명령 결과:', data.result);
                 this.emit('rf_shot_result', data.result);
                 break;
+
+            case 'rf_shot_reply':
+                // RF 제너레이터 응답 프레임(원시 hex)과 응답 시간
+                console.log('[RF] 샷 명령 응답:', data.result);
+                this.emit('rf_shot_reply', data.result);
+                break;
                 
             case 'rf_dtr_high':
                 // RF DTR HIGH 명령 결과
@@ -194,7 +200,19 @@ class WebSocketManager {
                 console.log('[WebSocket] foot_switch 이벤트 발생 완료');
                 console.log('='.repeat(50));
                 break;
-                
+
+            case 'shot_complete':
+                // 백엔드 시퀀서 샷 결과 (단계별 소요 시간 포함)
+                console.log('[WebSocket] 샷 완료:', data.data);
+                this.emit('shot_complete', data.data);
+                break;
+
+            case 'force_trigger':
+                // 접촉력 임계값 트리거 발사 (force, 수신 -> 발사 지연)
+                console.log('[WebSocket] 접촉력 트리거:', data.data);
+                this.emit('force_trigger', data.data);
+                break;
+
             case 'error':
                 console.error('[WebSocket] 서버 오류:', data.result);
                 this.emit('server_error', data.result);
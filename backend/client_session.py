@@ -0,0 +1,210 @@
+# client_session.py
+
+"""
+WebSocket 클라이언트별 구독 상태와 상태(status) 푸시 스케줄.
+
+클라이언트마다 받을 토픽과 상태 푸시 주기를 {"cmd": "subscribe"}로 정할 수 있고,
+상태 푸시는 전역 sleep 루프 대신 세션별 태스크가 자기 주기(단조 시계 데드라인)에 맞춰 보냅니다.
+- 교정 화면: status 100Hz
+- 모니터링 노트북: status 5Hz
+- 로거: foot_switch/gpio17_status/shot_complete 이벤트만
+
+전송은 세션별 송신 큐와 writer 태스크가 담당하므로 느린 클라이언트(혼잡한 Wi-Fi, 멈춘 렌더러)는
+자기 큐만 밀리고 다른 클라이언트나 이벤트 루프를 막지 않습니다.
+- 상태(텔레메트리): 최신 값 하나만 보관, 아직 못 보낸 이전 값은 버림 (status_dropped)
+- 명령 응답/이벤트: 버리지 않고 순서대로 전송, 큐가 SEND_QUEUE_LIMIT를 넘으면 연결을 닫음
+"""
+
+import asyncio
+import time
+from collections import deque
+
+TOPICS = ("status", "foot_switch", "gpio17_status", "shot_complete", "force_trigger")
+
+DEFAULT_RATE_HZ = 20.0   # 기존 50ms 푸시 주기
+MIN_RATE_HZ = 0.5
+MAX_RATE_HZ = 200.0
+
+# 값 변화가 없을 때의 전송 정책 (푸시 주기와 무관하게 시간 기준)
+STATUS_HEARTBEAT_INTERVAL = 1.0   # 이 시간 동안 보낸 것이 없으면 heartbeat
+STATUS_RESYNC_INTERVAL = 5.0      # 값이 그대로여도 이 주기로 전체 상태 재전송
+
+# 명령 응답/이벤트 큐 상한 - 넘으면 클라이언트가 따라오지 못하는 것으로 보고 연결 종료
+SEND_QUEUE_LIMIT = 256
+
+FULL = "full"
+HEARTBEAT = "heartbeat"
+
+
+class ClientSession:
+    def __init__(self, websocket, topics=TOPICS, rate_hz=DEFAULT_RATE_HZ):
+        self.websocket = websocket
+        self.encoding = "json"
+        self.topics = set(topics)
+        self.rate_hz = rate_hz
+        self.status_task = None
+        self.writer_task = None
+        # 송신 큐
+        self.send_queue = deque()
+        self.latest_status = None
+        self.wakeup = asyncio.Event()
+        self.closing = False
+        self.stats = {
+            "messages_sent": 0,
+            "status_sent": 0,
+            "status_dropped": 0,
+            "bytes_sent": 0,
+            "max_queue_depth": 0,
+            "send_time_max": 0.0,
+            "send_time_total": 0.0,
+        }
+        # 델타 억제 상태
+        self.last_values = None
+        self.last_full = 0.0
+        self.last_sent = 0.0
+        self.needs_full = True
+
+    @property
+    def interval(self):
+        return 1.0 / self.rate_hz
+
+    def wants(self, topic):
+        return topic in self.topics
+
+    def subscribe(self, topics=None, rate_hz=None):
+        """토픽/주기를 변경합니다. 잘못된 값이면 ValueError."""
+        if topics is not None:
+            unknown = [topic for topic in topics if topic not in TOPICS]
+            if unknown:
+                raise ValueError(f"지원하지 않는 토픽입니다: {unknown}")
+            self.topics = set(topics)
+        if rate_hz is not None:
+            rate_hz = float(rate_hz)
+            if not MIN_RATE_HZ <= rate_hz <= MAX_RATE_HZ:
+                raise ValueError(f"rate_hz는 {MIN_RATE_HZ}~{MAX_RATE_HZ} 범위여야 합니다: {rate_hz}")
+            self.rate_hz = rate_hz
+        self.needs_full = True
+        return self.describe()
+
+    def describe(self):
+        return {"topics": sorted(self.topics), "rate_hz": self.rate_hz, "encoding": self.encoding}
+
+    def status_due(self, values, now):
+        """
+        이번 틱에 보낼 상태 종류를 결정합니다.
+        반환값: FULL(값 변경/재동기화), HEARTBEAT(오랫동안 보낸 것이 없음), None(건너뜀)
+        """
+        if self.needs_full or values != self.last_values or now - self.last_full >= STATUS_RESYNC_INTERVAL:
+            self.needs_full = False
+            self.last_values = values
+            self.last_full = self.last_sent = now
+            return FULL
+        if now - self.last_sent >= STATUS_HEARTBEAT_INTERVAL:
+            self.last_sent = now
+            return HEARTBEAT
+        return None
+
+    def start(self, next_status_payload):
+        """
+        상태 푸시 태스크와 writer 태스크를 시작합니다.
+        next_status_payload(session) -> 보낼 str/bytes 또는 None (이번 틱 건너뜀)
+        """
+        loop = asyncio.get_running_loop()
+        self.writer_task = loop.create_task(self._run_writer())
+        self.status_task = loop.create_task(self._run_status(next_status_payload))
+
+    def stop(self):
+        for task in (self.status_task, self.writer_task):
+            if task:
+                task.cancel()
+        self.status_task = self.writer_task = None
+
+    # --- 송신 큐 (이벤트 루프에서 호출) ---
+    def send(self, payload, on_sent=None):
+        """
+        명령 응답/이벤트를 큐에 넣습니다 (버리지 않음). 큐가 가득 차면 연결을 닫고 False.
+        on_sent는 실제 전송이 끝난 뒤 호출됩니다 (지연 측정용).
+        """
+        if self.closing:
+            return False
+        if len(self.send_queue) >= SEND_QUEUE_LIMIT:
+            print(f"[WARN] 클라이언트 송신 큐 초과 ({SEND_QUEUE_LIMIT}) - 연결 종료")
+            self.closing = True
+            asyncio.get_running_loop().create_task(self.websocket.close(1013, "send queue overflow"))
+            return False
+        self.send_queue.append((payload, on_sent))
+        depth = len(self.send_queue)
+        if depth > self.stats["max_queue_depth"]:
+            self.stats["max_queue_depth"] = depth
+        self.wakeup.set()
+        return True
+
+    def offer_status(self, payload):
+        """최신 상태로 교체합니다. 아직 보내지 못한 이전 상태는 버립니다."""
+        if self.latest_status is not None:
+            self.stats["status_dropped"] += 1
+        self.latest_status = payload
+        self.wakeup.set()
+
+    def get_stats(self):
+        stats = self.stats
+        sent = stats["messages_sent"]
+        return {
+            **self.describe(),
+            "queue_depth": len(self.send_queue),
+            "status_pending": self.latest_status is not None,
+            "max_queue_depth": stats["max_queue_depth"],
+            "messages_sent": sent,
+            "status_sent": stats["status_sent"],
+            "status_dropped": stats["status_dropped"],
+            "bytes_sent": stats["bytes_sent"],
+            "send_time_avg_ms": round(stats["send_time_total"] / sent * 1000, 3) if sent else 0.0,
+            "send_time_max_ms": round(stats["send_time_max"] * 1000, 3),
+        }
+
+    async def _run_writer(self):
+        stats = self.stats
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+            # 명령 응답/이벤트 먼저, 그다음 최신 상태
+            while self.send_queue or self.latest_status is not None:
+                if self.send_queue:
+                    payload, on_sent = self.send_queue.popleft()
+                    is_status = False
+                else:
+                    payload, self.latest_status = self.latest_status, None
+                    on_sent = None
+                    is_status = True
+                started = time.perf_counter()
+                try:
+                    await self.websocket.send(payload)
+                except Exception as e:
+                    print(f"[WARN] 클라이언트 전송 실패: {e}")
+                    return
+                elapsed = time.perf_counter() - started
+                stats["messages_sent"] += 1
+                stats["bytes_sent"] += len(payload)
+                stats["send_time_total"] += elapsed
+                if elapsed > stats["send_time_max"]:
+                    stats["send_time_max"] = elapsed
+                if is_status:
+                    stats["status_sent"] += 1
+                if on_sent:
+                    try:
+                        on_sent()
+                    except Exception as e:
+                        print(f"[WARN] 전송 완료 콜백 오류: {e}")
+
+    async def _run_status(self, next_status_payload):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while True:
+            # 주기가 바뀌어도 다음 데드라인부터 바로 반영, 밀린 틱은 몰아서 보내지 않음
+            deadline = max(deadline + self.interval, loop.time())
+            await asyncio.sleep(deadline - loop.time())
+            if "status" not in self.topics:
+                continue
+            payload = next_status_payload(self)
+            if payload is not None:
+                self.offer_status(payload)
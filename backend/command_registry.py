@@ -0,0 +1,151 @@
+# command_registry.py
+
+"""
+WebSocket 명령 레지스트리.
+
+명령마다 파라미터 스키마, 블로킹 여부, 응답 타입을 선언해 두고
+handler는 dict 조회 한 번으로 디스패치합니다. 명령별 처리 시간 히스토그램과 오류 수를 기록합니다.
+
+    commands = CommandRegistry()
+
+    @commands.command("move", reply="serial", params={
+        "position": Param(float),
+        "mode": Param(str, "position"),
+    })
+    def cmd_move(session, position, mode):
+        return motor.move_to_position(position, mode)
+
+- 핸들러 첫 인자는 요청한 클라이언트의 ClientSession
+- blocking=True인 핸들러(동기 함수)는 asyncio.to_thread로 실행되어 이벤트 루프를 막지 않음
+- 반환값은 {"type": reply, "result": 반환값}으로 전송, Reply를 반환하면 그 키들을 그대로 사용
+- 반환값이 None이고 reply가 None이면 응답을 보내지 않음
+"""
+
+import asyncio
+import bisect
+import inspect
+import time
+
+REQUIRED = object()
+
+# 처리 시간 히스토그램 구간 상한 (ms) - 마지막 구간은 그 이상
+LATENCY_BUCKETS_MS = (0.1, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class Param:
+    __slots__ = ("types", "default")
+
+    def __init__(self, types=None, default=REQUIRED):
+        # JSON 숫자는 int/float 구분이 모호하므로 float 파라미터는 int도 허용
+        if types is float:
+            types = (int, float)
+        self.types = types
+        self.default = default
+
+
+class Reply(dict):
+    """type 외에 result가 아닌 키(data, status 등)가 필요한 응답"""
+
+
+class CommandSpec:
+    def __init__(self, name, func, params, blocking, reply):
+        self.name = name
+        self.func = func
+        self.params = params
+        self.blocking = blocking
+        self.reply = reply
+        self.is_async = inspect.iscoroutinefunction(func)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def bind(self, data):
+        """요청 dict에서 스키마에 맞는 키워드 인자를 만듭니다. 잘못된 값이면 ValueError."""
+        kwargs = {}
+        for name, param in self.params.items():
+            value = data.get(name, param.default)
+            if value is REQUIRED:
+                raise ValueError(f"{self.name}: 필수 파라미터가 없습니다: {name}")
+            if value is not None and value is not param.default and param.types and not isinstance(value, param.types):
+                raise ValueError(f"{self.name}: {name} 파라미터 타입이 올바르지 않습니다: {value!r}")
+            kwargs[name] = value
+        return kwargs
+
+    def record(self, elapsed, failed):
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+        if failed:
+            self.errors += 1
+        self.histogram[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed * 1000)] += 1
+
+    def get_stats(self):
+        return {
+            "blocking": self.blocking,
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+            "histogram": {
+                (f"<={bound}ms" if i < len(LATENCY_BUCKETS_MS) else f">{LATENCY_BUCKETS_MS[-1]}ms"): n
+                for i, (bound, n) in enumerate(zip(LATENCY_BUCKETS_MS + (None,), self.histogram))
+                if n
+            },
+        }
+
+
+class CommandRegistry:
+    def __init__(self):
+        self.specs = {}
+        self.unknown = 0
+
+    def command(self, name, reply=None, params=None, blocking=False):
+        """명령 핸들러 등록 데코레이터"""
+        def register(func):
+            if name in self.specs:
+                raise ValueError(f"이미 등록된 명령입니다: {name}")
+            if blocking and inspect.iscoroutinefunction(func):
+                raise ValueError(f"{name}: blocking 핸들러는 동기 함수여야 합니다")
+            self.specs[name] = CommandSpec(name, func, params or {}, blocking, reply)
+            return func
+        return register
+
+    async def dispatch(self, session, data):
+        """
+        명령을 실행하고 보낼 응답 메시지(dict)를 반환합니다 (응답이 없으면 None).
+        알 수 없는 명령이나 파라미터 오류는 ValueError, 핸들러 예외는 그대로 전달됩니다.
+        """
+        spec = self.specs.get(data.get("cmd"))
+        if spec is None:
+            self.unknown += 1
+            raise ValueError("알 수 없는 명령어")
+
+        started = time.perf_counter()
+        failed = True
+        try:
+            kwargs = spec.bind(data)
+            if spec.blocking:
+                result = await asyncio.to_thread(spec.func, session, **kwargs)
+            elif spec.is_async:
+                result = await spec.func(session, **kwargs)
+            else:
+                result = spec.func(session, **kwargs)
+            # 예외 대신 {"success": False, ...}로 실패를 알리는 핸들러도 오류로 집계
+            failed = isinstance(result, dict) and result.get("success") is False
+        finally:
+            spec.record(time.perf_counter() - started, failed)
+
+        if isinstance(result, Reply):
+            return {"type": spec.reply, **result}
+        if result is None and spec.reply is None:
+            return None
+        return {"type": spec.reply, "result": result}
+
+    def get_stats(self):
+        return {
+            "commands": {name: spec.get_stats() for name, spec in self.specs.items() if spec.count},
+            "unknown": self.unknown,
+        }
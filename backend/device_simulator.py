@@ -0,0 +1,200 @@
+# device_simulator.py
+
+"""
+의사 터미널(PTY) 기반 모터 / RF 장치 시뮬레이터.
+
+실제 /dev/usb-motor, /dev/usb-rf 없이 MotorThreadedController와 RF 경로를 시험할 수 있도록
+PTY 쌍을 열고 slave 경로(예: /dev/pts/3)를 포트 이름으로 노출합니다.
+
+- MotorSimulator: 0x32 모드 명령(55 AA ...)에 AA 55 텔레메트리 프레임으로 응답
+- RfSimulator: 0x44 샷 프레임 등 STX/ETX 프레임을 받아 같은 명령 바이트로 응답
+
+사용 예:
+    python device_simulator.py            # 두 장치를 띄우고 포트 경로 출력
+"""
+
+import os
+import select
+import struct
+import time
+import tty
+from threading import Thread, Event, Lock
+
+from motor_frame_parser import MotorFrameParser, COMMAND_HEADER
+from rf_utils import RfFrameParser, build_rf_output_command
+
+
+class PtyDevice:
+    """PTY master 쪽을 읽고 쓰는 장치 시뮬레이터 기반 클래스"""
+
+    def __init__(self, baudrate=19200, name="device"):
+        self.name = name
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.slave_fd)
+        self.port = os.ttyname(self.slave_fd)
+        # 10비트(시작/정지 비트 포함) 기준 바이트 전송 시간 - 0이면 지연 없음
+        self.byte_time = 10.0 / baudrate if baudrate else 0.0
+        self.running = False
+        self.thread = None
+        self.stop_event = Event()
+        self.write_lock = Lock()
+        self.rx_timestamps = []  # 완성된 명령 프레임 수신 시각 (time.perf_counter)
+        self.rx_frames = 0
+
+    def start(self):
+        self.running = True
+        self.thread = Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+        for fd in (self.master_fd, self.slave_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def write(self, data):
+        if self.byte_time:
+            time.sleep(len(data) * self.byte_time)
+        with self.write_lock:
+            os.write(self.master_fd, data)
+
+    def _run(self):
+        while self.running:
+            try:
+                ready, _, _ = select.select([self.master_fd], [], [], 0.05)
+                if not ready:
+                    self.on_idle()
+                    continue
+                data = os.read(self.master_fd, 4096)
+                if data:
+                    self.on_data(data)
+            except OSError:
+                break
+            except Exception as e:
+                print(f"[SIM {self.name} Error] {str(e)}")
+
+    def on_data(self, data):
+        raise NotImplementedError
+
+    def on_idle(self):
+        pass
+
+
+class MotorSimulator(PtyDevice):
+    """
+    모드 명령을 받을 때마다 텔레메트리 프레임 하나로 응답하는 리니어 액추에이터 모델.
+    위치는 speed(단위/s, 0이면 default_speed)로 목표를 향해 움직이고,
+    contact_position을 넘어선 만큼 stiffness로 힘(g)이 발생합니다.
+    """
+
+    TELEMETRY_LENGTH = 0x0D
+
+    def __init__(self, baudrate=19200, motor_ids=(0x01,), default_speed=2000.0,
+                 contact_position=600, stiffness=5.0, noise_ratio=0.0):
+        super().__init__(baudrate, name="motor")
+        self.parser = MotorFrameParser(header=COMMAND_HEADER)
+        self.default_speed = default_speed
+        self.contact_position = contact_position
+        self.stiffness = stiffness
+        self.noise_ratio = noise_ratio  # 응답 사이에 섞을 잡음 바이트 비율 (재동기화 시험용)
+        self.motors = {
+            motor_id: {"mode": 0x00, "target": 0, "speed": 0, "position": 0.0, "updated": time.perf_counter()}
+            for motor_id in motor_ids
+        }
+
+    def _advance(self, state, now):
+        dt = now - state["updated"]
+        state["updated"] = now
+        speed = state["speed"] or self.default_speed
+        step = speed * dt
+        diff = state["target"] - state["position"]
+        if abs(diff) <= step:
+            state["position"] = float(state["target"])
+        else:
+            state["position"] += step if diff > 0 else -step
+
+    def build_telemetry(self, motor_id, state):
+        position = int(round(state["position"]))
+        force_g = max(0, int((position - self.contact_position) * self.stiffness))
+        body = bytes([self.TELEMETRY_LENGTH, motor_id, 0x32, 0x25, 0x00]) + struct.pack(
+            '<hhhhh', state["target"], position, 0, min(force_g, 0x7FFF), force_g // 10
+        )
+        return b'\xAA\x55' + body + bytes([sum(body) & 0xFF])
+
+    def on_data(self, data):
+        now = time.perf_counter()
+        for frame in self.parser.feed(data):
+            self.rx_frames += 1
+            self.rx_timestamps.append(now)
+            motor_id = frame[3]
+            state = self.motors.get(motor_id)
+            if state is None or frame[4] != 0x32 or len(frame) < 14:
+                continue
+
+            self._advance(state, now)
+            mode = frame[7]
+            state["mode"] = mode
+            if len(frame) >= 18:
+                # 55 AA | LEN | ID | 32 | 25 00 | mode 00 | 00 00 | force | speed | position | CS
+                _, speed, target = struct.unpack_from('<hhh', frame, 11)
+                state["target"] = target
+                state["speed"] = abs(speed)
+
+            reply = self.build_telemetry(motor_id, state)
+            if self.noise_ratio:
+                reply = os.urandom(max(1, int(len(reply) * self.noise_ratio))) + reply
+            self.write(reply)
+
+
+class RfSimulator(PtyDevice):
+    """
+    STX/ETX 프레임을 받아 같은 명령 바이트의 응답 프레임을 돌려주는 RF 제너레이터 모델.
+    응답 DATA는 실제 제너레이터 형식이 확인되지 않아 임의의 고정값입니다 (타이밍 확인용).
+    """
+
+    def __init__(self, baudrate=19200, reply_delay=0.002, status_data=b'\x00\x00\x19'):
+        super().__init__(baudrate, name="rf")
+        self.parser = RfFrameParser()
+        self.reply_delay = reply_delay
+        self.status_data = status_data  # 0x41 상태 응답 DATA
+        self.shots = []  # (수신 시각, level, ontime_ms)
+
+    def on_data(self, data):
+        now = time.perf_counter()
+        for frame in self.parser.feed(data):
+            self.rx_frames += 1
+            self.rx_timestamps.append(now)
+            command = frame[3]
+            if command == 0x44 and len(frame) >= 15:
+                level = int.from_bytes(frame[4:6], 'big') or int.from_bytes(frame[8:10], 'big')
+                ontime = (int.from_bytes(frame[6:8], 'big') or int.from_bytes(frame[10:12], 'big')) // 10
+                self.shots.append((now, level, ontime))
+                reply_data = b'\x00'
+            elif command == 0x41:
+                reply_data = self.status_data
+            else:
+                reply_data = b'\x00'
+            if self.reply_delay:
+                time.sleep(self.reply_delay)
+            self.write(build_rf_output_command(command, reply_data))
+
+
+if __name__ == "__main__":
+    motor_sim = MotorSimulator().start()
+    rf_sim = RfSimulator().start()
+    print(f"[SIM] motor port: {motor_sim.port}")
+    print(f"[SIM] rf port: {rf_sim.port}")
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        motor_sim.stop()
+        rf_sim.stop()
@@ -0,0 +1,125 @@
+# device_watcher.py
+
+"""
+/dev 아래 장치 노드(예: udev 심볼릭 링크 /dev/usb-motor)가 나타나기를 asyncio에서 기다립니다.
+
+리눅스에서는 inotify(libc, ctypes)로 /dev 디렉터리의 생성 이벤트를 이벤트 루프에 등록하고,
+inotify를 쓸 수 없는 환경에서는 지수 백오프 폴링(os.path.exists)으로 동작합니다.
+"""
+
+import asyncio
+import ctypes
+import os
+import platform
+import struct
+
+IN_ATTRIB = 0x00000004
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT_STRUCT = struct.Struct('iIII')  # wd, mask, cookie, len
+
+BACKOFF_MIN = 0.05
+BACKOFF_MAX = 2.0
+
+
+class DeviceWatcher:
+    def __init__(self, directory="/dev"):
+        self.directory = directory
+        self.fd = None
+        self.waiters = {}  # 파일 이름 -> [asyncio.Future]
+        self.loop = None
+        self.inotify_available = False
+
+    def start(self, loop=None):
+        """inotify 감시를 시작합니다. 실패하면 폴링 모드로 남습니다."""
+        self.loop = loop or asyncio.get_running_loop()
+        if platform.system().lower() != 'linux':
+            print("[WATCH] inotify 미지원 플랫폼 - 폴링 모드로 동작")
+            return
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 실패")
+            wd = libc.inotify_add_watch(fd, self.directory.encode(), IN_CREATE | IN_MOVED_TO | IN_ATTRIB)
+            if wd < 0:
+                os.close(fd)
+                raise OSError(ctypes.get_errno(), "inotify_add_watch 실패")
+            self.fd = fd
+            self.loop.add_reader(fd, self._on_readable)
+            self.inotify_available = True
+            print(f"[WATCH] inotify 감시 시작: {self.directory}")
+        except Exception as e:
+            print(f"[WATCH] inotify 사용 불가 - 폴링 모드로 동작: {e}")
+
+    def stop(self):
+        if self.fd is not None:
+            try:
+                self.loop.remove_reader(self.fd)
+                os.close(self.fd)
+            except Exception:
+                pass
+            self.fd = None
+            self.inotify_available = False
+
+    def _on_readable(self):
+        try:
+            data = os.read(self.fd, 4096)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            print(f"[WATCH] inotify 읽기 오류: {e}")
+            self.stop()
+            return
+
+        offset = 0
+        while offset + _EVENT_STRUCT.size <= len(data):
+            _, _, _, name_len = _EVENT_STRUCT.unpack_from(data, offset)
+            offset += _EVENT_STRUCT.size
+            name = data[offset:offset + name_len].rstrip(b'\0').decode(errors='replace')
+            offset += name_len
+            for future in self.waiters.pop(name, []):
+                if not future.done():
+                    future.set_result(True)
+
+    async def wait_for(self, path, timeout=None):
+        """
+        path가 존재하면 즉시 True. 아니면 생성 이벤트(또는 폴링) 또는 timeout까지 기다립니다.
+        반환값: 장치가 나타났으면 True, timeout이면 False
+        """
+        if os.path.exists(path):
+            return True
+
+        if self.inotify_available and os.path.dirname(path) == self.directory:
+            future = self.loop.create_future()
+            name = os.path.basename(path)
+            self.waiters.setdefault(name, []).append(future)
+            try:
+                # 등록 직전에 생성되었을 수 있으므로 한 번 더 확인
+                if os.path.exists(path):
+                    return True
+                await asyncio.wait_for(future, timeout)
+                return True
+            except asyncio.TimeoutError:
+                return os.path.exists(path)
+            finally:
+                waiters = self.waiters.get(name)
+                if waiters and future in waiters:
+                    waiters.remove(future)
+
+        # 폴링 폴백: 짧은 간격에서 시작해 BACKOFF_MAX까지 늘림
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        delay = BACKOFF_MIN
+        while not os.path.exists(path):
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return False
+                delay = min(delay, remaining)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, BACKOFF_MAX)
+        return True
@@ -0,0 +1,163 @@
+# eeprom_layout.py
+
+"""
+니들팁 EEPROM 레코드 배치(layout) 선언과 블록 쓰기 코덱.
+
+팁 세대/국가별로 장치 주소, 시작 오프셋, 필드 위치만 선언해 두고
+- 쓰기: 바꿀 필드를 바이트 맵으로 만든 뒤 연속 구간을 묶어, 페이지 경계를 넘지 않는
+  최소 개수의 write_i2c_block_data 호출로 씀
+- 쓰기 완료 대기: 고정 sleep 대신 장치가 다시 ACK할 때까지 폴링 (내부 쓰기 사이클 보통 3~5 ms)
+- 읽기: 필드 전체 구간을 블록 읽기로 한 번에 읽고 해석
+
+    TIP_RECORD_LAYOUT.write(bus, {"tip_type": 3, "shot_count": 10,
+                                  "manufacture_date": {"year": 2025, "month": 3, "day": 4},
+                                  "manufacturer": 2})
+    record = TIP_RECORD_LAYOUT.read(bus)
+"""
+
+import time
+from collections import namedtuple
+
+# 24C02 기준 쓰기 페이지 크기 (16바이트 페이지 부품에서도 8바이트 정렬 쓰기는 안전)
+PAGE_SIZE = 8
+# SMBus 블록 전송 최대 길이
+I2C_BLOCK_MAX = 32
+# 쓰기 후 ACK 폴링 제한 시간 (데이터시트 tWR 최대 5~10 ms)
+ACK_TIMEOUT = 0.05
+# ACK 폴링 간격 - I2C 워커가 같이 쓰는 버스를 주소 바이트로 채우지 않도록 쉼
+ACK_POLL_INTERVAL = 0.0005
+
+# 필드 종류: u8, u16 (Big Endian), date (연-2000, 월, 일 각 1바이트)
+Field = namedtuple("Field", ("name", "offset", "kind"))
+
+FIELD_SIZES = {"u8": 1, "u16": 2, "date": 3}
+
+# Shot Count 필드(u16) 최대값
+SHOT_COUNT_MAX = 0xFFFF
+
+
+def _encode_field(field, value):
+    if field.kind == "u8":
+        return [int(value) & 0xFF]
+    if field.kind == "u16":
+        value = int(value)
+        return [(value >> 8) & 0xFF, value & 0xFF]
+    # date
+    return [(int(value["year"]) - 2000) & 0xFF, int(value["month"]) & 0xFF, int(value["day"]) & 0xFF]
+
+
+def _decode_field(field, data):
+    if field.kind == "u8":
+        return data[0]
+    if field.kind == "u16":
+        return (data[0] << 8) | data[1]
+    year = 2000 + data[0] if data[0] < 100 else 1900 + data[0]
+    return f"{year:04d}-{data[1]:02d}-{data[2]:02d}"
+
+
+def wait_for_ack(bus, device_address, timeout=ACK_TIMEOUT):
+    """
+    EEPROM 내부 쓰기 사이클이 끝나 장치가 다시 ACK할 때까지 폴링합니다.
+    쓰기 중에는 장치가 NACK하므로 OSError가 나며, 대기한 시간(초)을 반환합니다.
+    """
+    started = time.perf_counter()
+    while True:
+        try:
+            bus.read_byte(device_address)
+            return time.perf_counter() - started
+        except OSError:
+            if time.perf_counter() - started > timeout:
+                raise TimeoutError(f"EEPROM 0x{device_address:02X} 쓰기 완료 ACK 없음 ({timeout * 1000:.0f} ms)")
+            time.sleep(ACK_POLL_INTERVAL)
+
+
+class EepromLayout:
+    def __init__(self, name, device_address, base, fields, page_size=PAGE_SIZE):
+        self.name = name
+        self.device_address = device_address
+        self.base = base
+        self.fields = {field.name: field for field in fields}
+        self.page_size = page_size
+
+    def relocated(self, device_address, base):
+        """같은 필드 배치를 다른 장치 주소/시작 오프셋에 둔 레이아웃"""
+        return EepromLayout(self.name, device_address, base, self.fields.values(), self.page_size)
+
+    def encode(self, record, fields=None):
+        """레코드를 {EEPROM 주소: 바이트}로 만듭니다. fields를 주면 그 필드만."""
+        image = {}
+        for name in fields or self.fields:
+            field = self.fields[name]
+            for i, byte in enumerate(_encode_field(field, record[name])):
+                image[self.base + field.offset + i] = byte
+        return image
+
+    def write_plan(self, image):
+        """
+        바이트 맵을 (주소, 데이터) 블록 쓰기 목록으로 묶습니다.
+        연속된 주소는 한 블록으로, 페이지 경계와 SMBus 블록 최대 길이에서는 나눔
+        """
+        plan = []
+        for address in sorted(image):
+            if plan:
+                start, data = plan[-1]
+                if (start + len(data) == address and len(data) < I2C_BLOCK_MAX
+                        and address // self.page_size == start // self.page_size):
+                    data.append(image[address])
+                    continue
+            plan.append((address, [image[address]]))
+        return plan
+
+    def write(self, bus, record, fields=None, ack_timeout=ACK_TIMEOUT):
+        """레코드(또는 일부 필드)를 쓰고 {"writes", "ack_wait_ms"}를 반환합니다."""
+        ack_wait = 0.0
+        plan = self.write_plan(self.encode(record, fields))
+        for address, data in plan:
+            bus.write_i2c_block_data(self.device_address, address, data)
+            ack_wait += wait_for_ack(bus, self.device_address, ack_timeout)
+        return {"writes": len(plan), "ack_wait_ms": round(ack_wait * 1000, 3)}
+
+    def read(self, bus):
+        """필드 전체 구간을 블록 읽기로 읽어 레코드 dict를 반환합니다."""
+        start = self.base + min(field.offset for field in self.fields.values())
+        end = self.base + max(field.offset + FIELD_SIZES[field.kind] for field in self.fields.values())
+        data = []
+        for address in range(start, end, I2C_BLOCK_MAX):
+            data += bus.read_i2c_block_data(self.device_address, address, min(I2C_BLOCK_MAX, end - address))
+        record = {}
+        for field in self.fields.values():
+            offset = self.base + field.offset - start
+            record[field.name] = _decode_field(field, data[offset:offset + FIELD_SIZES[field.kind]])
+        return record
+
+
+# --- 레이아웃 선언 ---
+
+MTR20_EEPROM_ADDRESS = 0x50
+MTR20_CLASSYS_OFFSET = 0x10
+MTR20_CUTERA_OFFSET = 0x80
+MTR40_EEPROM_ADDRESS = 0x51
+MTR40_OFFSET = 0x70
+
+# 니들팁 레코드 (제조일자 +0x19, 제조사 +0x1C) - eeprom_read/eeprom_write/shot 카운터가 쓰는 배치
+TIP_RECORD_FIELDS = (
+    Field("tip_type", 0x00, "u8"),
+    Field("shot_count", 0x01, "u16"),
+    Field("manufacture_date", 0x19, "date"),
+    Field("manufacturer", 0x1C, "u8"),
+)
+
+# MTR 2.0 CUTERA / MTR 4.0 압축 배치 (제조일자 +9, 제조사 +12)
+MTR_FIELDS = (
+    Field("tip_type", 0, "u8"),
+    Field("shot_count", 1, "u16"),
+    Field("manufacture_date", 9, "date"),
+    Field("manufacturer", 12, "u8"),
+)
+
+TIP_RECORD_LAYOUT = EepromLayout("tip", MTR20_EEPROM_ADDRESS, MTR20_CLASSYS_OFFSET, TIP_RECORD_FIELDS)
+# MTR 2.0 CLASSYS는 니들팁 레코드와 같은 영역(0x50/0x10)이므로 같은 배치를 씀
+# (압축 배치로 쓰면 eeprom_read와 shot 카운터가 제조일자/제조사를 다른 위치에서 읽게 됨)
+MTR20_CLASSYS_LAYOUT = EepromLayout("MTR 2.0 CLASSYS", MTR20_EEPROM_ADDRESS, MTR20_CLASSYS_OFFSET, TIP_RECORD_FIELDS)
+MTR20_CUTERA_LAYOUT = EepromLayout("MTR 2.0 CUTERA", MTR20_EEPROM_ADDRESS, MTR20_CUTERA_OFFSET, MTR_FIELDS)
+MTR40_LAYOUT = EepromLayout("MTR 4.0", MTR40_EEPROM_ADDRESS, MTR40_OFFSET, MTR_FIELDS)
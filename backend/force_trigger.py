@@ -0,0 +1,233 @@
+# force_trigger.py
+
+"""
+접촉력(force) 임계값 트리거 - 모터 텔레메트리 프레임마다 수신 스레드에서 바로 평가합니다.
+
+arm(threshold, ...) 후
+- force >= threshold 가 dwell 동안 유지되면 발사 (threshold - hysteresis 아래로 내려가면 dwell 초기화,
+  그 사이의 작은 흔들림은 무시)
+- 발사 동작
+    pulse: DTR 펄스를 펄스 스레드 큐에 바로 넣음 (수신 스레드에서 인라인, 가장 빠름).
+           RF 파라미터(0x44 프레임)는 arm 시 미리 보내 응답(또는 제한 시간)까지 기다려 둠
+    rf:    미리 만든 0x44 프레임을 이벤트 루프에서 전송하고 응답 프레임을 기록
+- rearm=True면 force가 threshold - hysteresis 아래로 내려간 뒤 다시 대기, 아니면 한 번 발사 후 해제
+
+제너레이터 응답은 형식이 확인되지 않았으므로 해석하지 않고 원시 프레임(hex)만 기록합니다.
+
+발사마다 프레임 수신 -> 평가, 평가 -> 발사(펄스 큐 투입/프레임 쓰기) 지연과 펄스 측정 결과를 기록하고
+on_fire(event)로 넘깁니다 (pulse 모드는 펄스 스레드, rf 모드는 이벤트 루프에서 호출).
+평가 주기는 텔레메트리 주기(keep-alive 간격, motor_keepalive 명령)를 따릅니다.
+"""
+
+import time
+from threading import Lock
+
+from rf_utils import build_rf_shot_command
+
+ACTIONS = ("pulse", "rf")
+RECENT_FIRES = 50
+
+
+class ForceTriggerConfig:
+    __slots__ = ("threshold", "hysteresis", "dwell", "action", "intensity", "rf_time", "rearm", "motor_id", "frame")
+
+    def __init__(self, threshold, hysteresis, dwell, action, intensity, rf_time, rearm, motor_id):
+        if threshold <= 0 or hysteresis < 0 or dwell < 0 or rf_time <= 0 or intensity <= 0:
+            raise ValueError("잘못된 트리거 설정입니다 (threshold/intensity/rf_time > 0, hysteresis/dwell >= 0)")
+        if hysteresis >= threshold:
+            raise ValueError("hysteresis는 threshold보다 작아야 합니다")
+        if action not in ACTIONS:
+            raise ValueError(f"지원하지 않는 동작입니다: {action}")
+        self.threshold = float(threshold)       # N
+        self.hysteresis = float(hysteresis)     # N
+        self.dwell = float(dwell)               # 초
+        self.action = action
+        self.intensity = int(intensity)
+        self.rf_time = int(rf_time)             # ms
+        self.rearm = bool(rearm)
+        self.motor_id = motor_id
+        self.frame = build_rf_shot_command(True, False, self.intensity, self.rf_time)
+
+    def describe(self):
+        return {
+            "threshold": self.threshold,
+            "hysteresis": self.hysteresis,
+            "dwell_ms": round(self.dwell * 1000, 3),
+            "action": self.action,
+            "intensity": self.intensity,
+            "rf_time": self.rf_time,
+            "rearm": self.rearm,
+            "motor_id": self.motor_id,
+        }
+
+
+class ForceTrigger:
+    def __init__(self, rf, dtr_pulser=None):
+        self.rf = rf
+        self.dtr_pulser = dtr_pulser
+        self.loop = None
+        self.lock = Lock()
+        self.config = None
+        self.state = "disarmed"     # disarmed / armed / dwell / released_wait
+        self.above_since = None     # dwell 시작 프레임 시각 (time.monotonic)
+        self.on_fire = None
+        self.on_rf_shot = None      # 발사 알림 (이벤트 루프) - 상태 조회 보류 등
+        self.fires = 0
+        self.recent = []
+        self.arm_reply = None       # pulse 동작 arm 시 RF 파라미터 프레임 응답
+
+    def attach_loop(self, loop):
+        self.loop = loop
+
+    async def arm(self, config):
+        """
+        트리거 설정. pulse 동작이면 RF 샷 파라미터를 먼저 보내고 응답(또는 제한 시간)을 기다립니다.
+        프레임을 쓰지 못했을 때만 ConnectionError.
+        """
+        self.arm_reply = None
+        if config.action == "pulse":
+            if self.dtr_pulser is None:
+                raise RuntimeError("DTR 펄스 사용 불가 (GPIO)")
+            if self.rf.is_attached():
+                sent_at = time.monotonic()
+                try:
+                    reply = await self.rf.request(config.frame)
+                    self.arm_reply = {
+                        "reply": reply.hex().upper(),
+                        "reply_ms": round((time.monotonic() - sent_at) * 1000, 3),
+                    }
+                except TimeoutError as e:
+                    print(f"[FORCE] RF 샷 파라미터 응답 없음: {e}")
+                    self.arm_reply = {"reply": None, "error": str(e)}
+        elif not self.rf.is_attached():
+            raise RuntimeError("RF 연결되지 않음")
+        with self.lock:
+            self.config = config
+            self.state = "armed"
+            self.above_since = None
+        print(f"[FORCE] 트리거 설정: {config.describe()}")
+
+    def disarm(self):
+        with self.lock:
+            self.config = None
+            self.state = "disarmed"
+            self.above_since = None
+
+    def evaluate(self, motor_id, snapshot):
+        """모터 수신 스레드에서 프레임마다 호출 (MotorControllerBase.telemetry_hook)"""
+        config = self.config
+        if config is None or motor_id != config.motor_id:
+            return
+        with self.lock:
+            if self.config is not config:
+                return
+            force = snapshot.force
+            release = config.threshold - config.hysteresis
+            state = self.state
+            if state == "released_wait":
+                if force < release:
+                    self.state = "armed"
+                return
+            if force < release:
+                self.state = "armed"
+                self.above_since = None
+                return
+            if state == "armed":
+                if force < config.threshold:
+                    return
+                self.state = "dwell"
+                self.above_since = snapshot.timestamp
+            if snapshot.timestamp - self.above_since < config.dwell:
+                return
+            # 발사 - 같은 접촉에서 다시 발사하지 않도록 상태를 먼저 바꿈
+            if config.rearm:
+                self.state = "released_wait"
+            else:
+                self.config = None
+                self.state = "disarmed"
+            above_since = self.above_since
+            self.above_since = None
+
+        evaluated_at = time.monotonic()
+        event = {
+            "action": config.action,
+            "force": snapshot.force,
+            "position": snapshot.position,
+            "threshold": config.threshold,
+            "dwell_ms": round((snapshot.timestamp - above_since) * 1000, 3),
+            "rx_to_eval_ms": round((evaluated_at - snapshot.timestamp) * 1000, 3),
+            "timestamp": time.time(),
+        }
+        if config.action == "pulse":
+            pulse = self.dtr_pulser.fire(config.rf_time)
+            event["eval_to_fire_ms"] = round((time.monotonic() - evaluated_at) * 1000, 3)
+            pulse.add_done_callback(lambda future: self._pulse_done(event, future))
+            self._notify_loop(self._notify_rf_shot, config.rf_time)
+        else:
+            self._notify_loop(self._fire_rf, config, event, evaluated_at)
+
+    def _notify_loop(self, callback, *args):
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(callback, *args)
+
+    def _notify_rf_shot(self, rf_time):
+        if self.on_rf_shot:
+            self.on_rf_shot(rf_time)
+
+    def _pulse_done(self, event, future):
+        # 펄스 스레드에서 호출
+        if future.exception() is None:
+            event["pulse"] = future.result()
+            event["trigger_to_edge_ms"] = round(
+                event["rx_to_eval_ms"] + event["eval_to_fire_ms"] + event["pulse"]["start_latency_ms"], 3)
+        else:
+            event["error"] = str(future.exception())
+        self._record(event)
+
+    def _fire_rf(self, config, event, evaluated_at):
+        # 이벤트 루프에서 호출 - 프레임은 submit 안에서 바로 쓰임
+        try:
+            reply = self.rf.submit(config.frame)
+        except ConnectionError as e:
+            event["reply"] = None
+            event["error"] = str(e)
+            self._record(event)
+            return
+        fired_at = time.monotonic()
+        event["eval_to_fire_ms"] = round((fired_at - evaluated_at) * 1000, 3)
+        self._notify_rf_shot(config.rf_time)
+        reply.add_done_callback(lambda future: self._rf_done(event, future, fired_at))
+
+    def _rf_done(self, event, future, fired_at):
+        if future.cancelled():
+            return
+        if future.exception() is None:
+            event["reply"] = future.result().hex().upper()
+            event["reply_ms"] = round((time.monotonic() - fired_at) * 1000, 3)
+        else:
+            event["reply"] = None
+            event["error"] = str(future.exception())
+        self._record(event)
+
+    def _record(self, event):
+        with self.lock:
+            self.fires += 1
+            self.recent.append(event)
+            del self.recent[:-RECENT_FIRES]
+        print(f"[FORCE] 트리거 발사: {event['force']}N, 평가->발사 {event.get('eval_to_fire_ms')}ms")
+        if self.on_fire:
+            self.on_fire(event)
+
+    def get_stats(self):
+        with self.lock:
+            config = self.config
+            return {
+                "state": self.state,
+                "config": config.describe() if config else None,
+                "arm_reply": self.arm_reply,
+                "fires": self.fires,
+                "last": self.recent[-1] if self.recent else None,
+                "recent": list(self.recent),
+            }
@@ -0,0 +1,129 @@
+# gpio_event_bridge.py
+
+"""
+gpiozero 콜백 스레드에서 asyncio 이벤트 루프로 GPIO 엣지를 넘기는 브리지.
+
+- 엣지 시각은 인터럽트 콜백 안에서 바로 기록 (time.monotonic, 벽시계 time.time)
+- 이벤트 루프로는 loop.call_soon_threadsafe로만 넘김 (콜백 스레드에는 실행 중인 루프가 없으므로
+  asyncio.create_task를 부르면 이벤트가 사라질 수 있음)
+- 루프에서 등록된 핸들러를 바로 호출하므로 주기적 큐 폴링으로 인한 지연이 없음
+- 엣지 -> 루프 전달 지연(dispatch)과 엣지 -> 클라이언트 전송 완료 지연(delivery)을 이벤트별로 측정
+"""
+
+import time
+from threading import Lock
+
+
+class GpioEdge:
+    __slots__ = ("name", "edge_at", "wall_time", "dispatched_at")
+
+    def __init__(self, name, edge_at, wall_time):
+        self.name = name
+        self.edge_at = edge_at        # time.monotonic() 인터럽트 시각
+        self.wall_time = wall_time    # time.time() (클라이언트 표시용)
+        self.dispatched_at = None
+
+
+def _latency_stats():
+    return {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0}
+
+
+def _record(stats, latency):
+    stats["count"] += 1
+    stats["total"] += latency
+    stats["last"] = latency
+    if latency > stats["max"]:
+        stats["max"] = latency
+
+
+def _summary_ms(stats):
+    count = stats["count"]
+    return {
+        "count": count,
+        "avg_ms": round(stats["total"] / count * 1000, 3) if count else 0.0,
+        "max_ms": round(stats["max"] * 1000, 3),
+        "last_ms": round(stats["last"] * 1000, 3),
+    }
+
+
+class GpioEventBridge:
+    def __init__(self):
+        self.loop = None
+        self.handlers = {}   # 이벤트 이름 -> [handler(edge)] (이벤트 루프에서 호출)
+        self.lock = Lock()
+        self.stats = {}      # 이벤트 이름 -> {"edges", "missed", "dispatch", "delivery"}
+
+    def attach_loop(self, loop):
+        self.loop = loop
+
+    def on(self, name, handler):
+        """이벤트 루프에서 호출될 핸들러를 등록합니다. handler(edge: GpioEdge)"""
+        self.handlers.setdefault(name, []).append(handler)
+        self._stats(name)
+
+    def callback(self, name, immediate=None):
+        """
+        gpiozero when_pressed/when_released에 넣을 콜백을 만듭니다.
+        immediate는 콜백 스레드에서 바로 실행할 동작 (LED 등 루프를 기다릴 필요 없는 하드웨어 출력)
+        """
+        def _on_edge():
+            edge_at = time.monotonic()
+            wall_time = time.time()
+            if immediate:
+                try:
+                    immediate()
+                except Exception as e:
+                    print(f"[GPIO] {name} 즉시 처리 오류: {e}")
+            self.emit(name, edge_at, wall_time)
+        return _on_edge
+
+    def emit(self, name, edge_at=None, wall_time=None):
+        """임의 스레드에서 호출 가능. 엣지를 이벤트 루프로 넘깁니다."""
+        edge = GpioEdge(name, edge_at if edge_at is not None else time.monotonic(),
+                        wall_time if wall_time is not None else time.time())
+        loop = self.loop
+        stats = self._stats(name)
+        with self.lock:
+            stats["edges"] += 1
+        if loop is None or loop.is_closed():
+            with self.lock:
+                stats["missed"] += 1
+            print(f"[GPIO] 이벤트 루프 없음 - {name} 이벤트 누락")
+            return
+        loop.call_soon_threadsafe(self._dispatch, edge)
+
+    def _dispatch(self, edge):
+        edge.dispatched_at = time.monotonic()
+        _record(self._stats(edge.name)["dispatch"], edge.dispatched_at - edge.edge_at)
+        for handler in self.handlers.get(edge.name, ()):
+            try:
+                handler(edge)
+            except Exception as e:
+                print(f"[GPIO] {edge.name} 핸들러 오류: {e}")
+
+    def delivered(self, edge):
+        """클라이언트 전송 완료 콜백용 - 엣지 -> 클라이언트 지연을 기록합니다."""
+        _record(self._stats(edge.name)["delivery"], time.monotonic() - edge.edge_at)
+
+    def _stats(self, name):
+        stats = self.stats.get(name)
+        if stats is None:
+            with self.lock:
+                stats = self.stats.setdefault(name, {
+                    "edges": 0,
+                    "missed": 0,
+                    "dispatch": _latency_stats(),
+                    "delivery": _latency_stats(),
+                })
+        return stats
+
+    def get_stats(self):
+        return {
+            name: {
+                "edges": stats["edges"],
+                "missed": stats["missed"],
+                "edge_to_loop": _summary_ms(stats["dispatch"]),
+                "edge_to_client": _summary_ms(stats["delivery"]),
+            }
+            for name, stats in list(self.stats.items())
+        }
@@ -0,0 +1,137 @@
+# i2c_worker.py
+
+"""
+I2C 전용 워커 스레드.
+
+모든 I2C 작업(EEPROM 읽기/쓰기)은 이 스레드 하나를 거치며, 스레드가 SMBus 핸들을 계속 열어 두고
+작업을 순서대로 실행합니다. 이벤트 루프는 결과를 asyncio future로 기다리기만 하므로
+EEPROM 쓰기 대기(수십~수백 ms) 동안에도 상태 푸시와 GPIO 이벤트가 멈추지 않습니다.
+
+    value = await i2c_worker.run("eeprom_read", read_eeprom_data, I2C_BUS, 0x50, 0x10)
+
+작업 함수는 키워드 인자 bus로 열린 SMBus를 받습니다. 작업마다 큐 대기 시간과 버스 점유 시간을 기록합니다.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Future
+from queue import Queue
+from threading import Thread, Lock
+
+
+def _timing_stats():
+    return {"count": 0, "errors": 0, "wait_total": 0.0, "wait_max": 0.0, "bus_total": 0.0, "bus_max": 0.0}
+
+
+class I2cWorker:
+    def __init__(self, bus_number=1, bus_factory=None):
+        self.bus_number = bus_number
+        self.bus_factory = bus_factory  # 기본값: smbus2.SMBus
+        self.bus = None
+        self.queue = Queue()
+        self.thread = None
+        self.lock = Lock()
+        self.stats = {}   # 작업 이름 -> 누적 시간
+        self.last = None  # 마지막 작업 시간
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.thread = Thread(target=self._run, name="i2c-worker", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join(1.0)
+        self.thread = None
+
+    def submit(self, name, func, *args, **kwargs):
+        """작업을 큐에 넣고 concurrent.futures.Future를 반환합니다 (어느 스레드에서나 호출 가능)."""
+        future = Future()
+        self.queue.put((name, func, args, kwargs, future, time.perf_counter()))
+        return future
+
+    async def run(self, name, func, *args, **kwargs):
+        """작업 결과를 기다립니다 (이벤트 루프에서 호출)."""
+        value, _ = await self.run_timed(name, func, *args, **kwargs)
+        return value
+
+    async def run_timed(self, name, func, *args, **kwargs):
+        """(결과, {"queue_wait_ms", "bus_ms"})를 반환합니다."""
+        future = self.submit(name, func, *args, **kwargs)
+        value = await asyncio.wrap_future(future)
+        return value, future.timing
+
+    def _open_bus(self):
+        if self.bus is None:
+            factory = self.bus_factory
+            if factory is None:
+                import smbus2
+                factory = smbus2.SMBus
+            self.bus = factory(self.bus_number)
+        return self.bus
+
+    def _close_bus(self):
+        if self.bus is not None:
+            try:
+                self.bus.close()
+            except Exception:
+                pass
+            self.bus = None
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            if job is None:
+                break
+            name, func, args, kwargs, future, queued_at = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            started = time.perf_counter()
+            error = None
+            try:
+                value = func(*args, bus=self._open_bus(), **kwargs)
+            except Exception as e:
+                error = e
+                if isinstance(e, OSError) or isinstance(e.__cause__, OSError):
+                    # 버스 오류 후에는 다음 작업에서 핸들을 새로 엶
+                    self._close_bus()
+            finished = time.perf_counter()
+            future.timing = self._record(name, started - queued_at, finished - started, error is not None)
+            if error is None:
+                future.set_result(value)
+            else:
+                future.set_exception(error)
+        self._close_bus()
+
+    def _record(self, name, wait, bus_time, failed):
+        with self.lock:
+            stats = self.stats.setdefault(name, _timing_stats())
+            stats["count"] += 1
+            stats["errors"] += failed
+            stats["wait_total"] += wait
+            stats["bus_total"] += bus_time
+            stats["wait_max"] = max(stats["wait_max"], wait)
+            stats["bus_max"] = max(stats["bus_max"], bus_time)
+            self.last = {"name": name, "queue_wait_ms": round(wait * 1000, 3), "bus_ms": round(bus_time * 1000, 3)}
+            return {"queue_wait_ms": self.last["queue_wait_ms"], "bus_ms": self.last["bus_ms"]}
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                "queue_depth": self.queue.qsize(),
+                "bus_open": self.bus is not None,
+                "last": self.last,
+                "operations": {
+                    name: {
+                        "count": s["count"],
+                        "errors": s["errors"],
+                        "queue_wait_avg_ms": round(s["wait_total"] / s["count"] * 1000, 3),
+                        "queue_wait_max_ms": round(s["wait_max"] * 1000, 3),
+                        "bus_avg_ms": round(s["bus_total"] / s["count"] * 1000, 3),
+                        "bus_max_ms": round(s["bus_max"] * 1000, 3),
+                    }
+                    for name, s in self.stats.items()
+                },
+            }
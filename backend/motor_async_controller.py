@@ -0,0 +1,246 @@
+# motor_async_controller.py
+
+"""
+asyncio 이벤트 루프 기반 모터 컨트롤러.
+
+MotorThreadedController의 송신/수신 스레드 대신 시리얼 파일 디스크립터를 이벤트 루프에 등록합니다.
+- 수신: loop.add_reader로 바이트가 도착하는 즉시 os.read → 파서 → 스냅샷 발행
+- 송신: 논블로킹 os.write, 커널 버퍼가 가득 차면 나머지를 보관하고 add_writer로 이어서 전송
+- keep-alive(상태 폴링): loop.call_later 타이머
+공개 API(connect, move_to_position, set_force, is_connected, 스냅샷/통계 등)는 동일합니다.
+
+connect/disconnect와 명령 함수는 다른 스레드(asyncio.to_thread, 궤적 스레드)에서 호출해도 되며,
+fd 등록과 송신은 항상 attach_loop로 지정한 루프 스레드에서 수행됩니다.
+"""
+
+import os
+import threading
+import time
+from queue import Empty
+
+from motor_frame_parser import MotorFrameParser
+from motor_bus import REPLY_TIMEOUT
+from motor_controller_base import MotorControllerBase, DEFAULT_KEEPALIVE_INTERVAL
+from motor_mode_generators import DEFAULT_MOTOR_ID
+
+
+class MotorAsyncController(MotorControllerBase):
+    def __init__(self, keepalive_interval=DEFAULT_KEEPALIVE_INTERVAL, motor_ids=(DEFAULT_MOTOR_ID,), loop=None):
+        super().__init__(keepalive_interval, motor_ids)
+        self.loop = None
+        self.loop_thread_id = None
+        self.fd = None
+        self.tx_buffer = bytearray()      # 논블로킹 write가 다 못 보낸 바이트
+        self.tx_pending = []              # tx_buffer가 비워지면 통계에 반영할 (cmd, queued_at, 채널)
+        self.pump_scheduled = False
+        self.keepalive_handle = None
+        self.awaiting = None              # 반이중 선로에서 응답을 기다리는 (채널, seq)
+        self.reply_handle = None
+        if loop is not None:
+            self.attach_loop(loop)
+
+    def attach_loop(self, loop):
+        """송수신에 사용할 이벤트 루프를 지정합니다. 루프 시작 전 connect된 포트는 이때 등록됩니다."""
+        self.loop = loop
+        loop.call_soon_threadsafe(self._attach_in_loop)
+
+    def _attach_in_loop(self):
+        self.loop_thread_id = threading.get_ident()
+        if self.running and self.fd is None and self.serial is not None:
+            self._register(self.serial)
+
+    def _call_in_loop(self, callback, *args):
+        if self.loop is None:
+            return
+        if threading.get_ident() == self.loop_thread_id:
+            callback(*args)
+        else:
+            self.loop.call_soon_threadsafe(callback, *args)
+
+    def connect(self, port, baudrate, parity, databits, stopbits):
+        if self.serial and self.serial.is_open:
+            return "이미 연결되어 있습니다."
+
+        try:
+            # pyserial은 POSIX에서 O_NONBLOCK으로 포트를 열며, 읽기/쓰기는 fd에 직접 수행
+            ser = self._open_serial(port, baudrate, parity, databits, stopbits, timeout=0)
+            self.frame_parser = MotorFrameParser()
+            self.serial = ser
+            self.running = True
+            self._call_in_loop(self._register, ser)
+            return "✅ 포트 연결 및 이벤트 루프 등록 성공"
+        except Exception as e:
+            return f"❌ 포트 연결 실패: {str(e)}"
+
+    def disconnect(self):
+        self.running = False
+        self.stop_trajectory()
+        ser = self.serial
+        if ser and ser.is_open:
+            if self.fd is not None and threading.get_ident() != self.loop_thread_id:
+                # 루프 스레드에서 fd 등록을 먼저 해제한 뒤 닫음
+                self.loop.call_soon_threadsafe(self._close, ser)
+            else:
+                self._close(ser)
+            return "🔌 포트 연결 해제 완료"
+        return "포트가 이미 닫혀 있습니다."
+
+    def _register(self, ser):
+        if not self.running or ser is not self.serial or not ser.is_open:
+            return
+        self.fd = ser.fileno()
+        self.tx_buffer.clear()
+        self.tx_pending.clear()
+        self.awaiting = None
+        self.loop.add_reader(self.fd, self._on_readable)
+        self._pump()
+
+    def _close(self, ser):
+        self._unregister()
+        try:
+            ser.close()
+        except Exception as e:
+            print(f"[MOTOR] 포트 닫기 오류: {e}")
+
+    def _unregister(self):
+        if self.fd is not None:
+            self.loop.remove_reader(self.fd)
+            self.loop.remove_writer(self.fd)
+            self.fd = None
+        for handle in (self.keepalive_handle, self.reply_handle):
+            if handle:
+                handle.cancel()
+        self.keepalive_handle = self.reply_handle = None
+        self.awaiting = None
+        self.pump_scheduled = False
+
+    def _link_lost(self, error):
+        if not self.running:
+            return
+        # USB 분리 등으로 포트가 사라짐 - 닫고 재연결 감시자에게 알림
+        print(f"[MOTOR] 포트 연결 끊김: {error}")
+        self._handle_link_lost()
+
+    # --- 수신 ---
+    def _on_readable(self):
+        try:
+            data = os.read(self.fd, 4096)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self._link_lost(e)
+            return
+        if not data:
+            # 읽기 가능인데 0바이트 = 장치 제거
+            self._link_lost("EOF")
+            return
+
+        received_at = time.monotonic()
+        for motor_id, telemetry in self.frame_parser.feed_decoded(data, with_id=True):
+            self._apply_telemetry(telemetry, received_at, motor_id)
+
+        awaiting = self.awaiting
+        if awaiting and awaiting[0].snapshots.snapshot.seq > awaiting[1]:
+            # 기다리던 모터의 응답 도착 - 다음 모터로 진행
+            self.awaiting = None
+            if self.reply_handle:
+                self.reply_handle.cancel()
+                self.reply_handle = None
+            self._pump()
+
+    # --- 송신 ---
+    def _wake_sender(self):
+        if self.loop is None or self.pump_scheduled:
+            return
+        self.pump_scheduled = True
+        self.loop.call_soon_threadsafe(self._scheduled_pump)
+
+    def _scheduled_pump(self):
+        self.pump_scheduled = False
+        self._pump()
+
+    def _pump(self):
+        """보낼 수 있는 프레임을 모두 전송하고 다음 keep-alive 타이머를 예약합니다."""
+        if self.keepalive_handle:
+            self.keepalive_handle.cancel()
+            self.keepalive_handle = None
+        if self.fd is None or not self.running:
+            return
+        # 커널 버퍼가 비워지거나 응답이 올 때까지는 다음 프레임을 만들지 않음 (최신 명령은 버스에 남아 있음)
+        if self.tx_buffer or self.awaiting:
+            return
+
+        # 1회성 명령 먼저 전송
+        while not self.tx_buffer:
+            try:
+                cmd, queued_at = self.send_queue.get_nowait()
+            except Empty:
+                break
+            self._write_frame(cmd, queued_at)
+
+        bus = self.bus
+        interval = self.keepalive_interval
+        # 보낼 것이 남아 있는 동안 모터 ID를 라운드로빈으로 돌며 한 프레임씩 전송
+        while not self.tx_buffer and self.fd is not None:
+            picked = bus.next_frame(time.perf_counter(), interval)
+            if picked is None:
+                break
+            channel, cmd, queued_at = picked
+            seq = channel.snapshots.snapshot.seq
+            self._write_frame(cmd, queued_at, channel)
+            if bus.await_reply:
+                # 반이중 선로: 응답(또는 타임아웃) 전에는 다음 모터로 넘어가지 않음
+                self.awaiting = (channel, seq)
+                self.reply_handle = self.loop.call_later(REPLY_TIMEOUT, self._reply_timeout)
+                return
+
+        if self.fd is not None and not self.tx_buffer:
+            due = bus.next_due(time.perf_counter(), interval)
+            if due is not None:
+                self.keepalive_handle = self.loop.call_later(due, self._pump)
+
+    def _reply_timeout(self):
+        self.reply_handle = None
+        if self.awaiting:
+            self.awaiting[0].reply_timeouts += 1
+            self.awaiting = None
+        self._pump()
+
+    def _write_frame(self, cmd, queued_at=None, channel=None):
+        now = time.perf_counter()
+        if channel is not None:
+            channel.last_sent = now
+        try:
+            written = os.write(self.fd, cmd)
+        except BlockingIOError:
+            written = 0
+        except OSError as e:
+            self._link_lost(e)
+            return now
+        if written < len(cmd):
+            # 커널 송신 버퍼가 가득 참 - 나머지는 쓰기 가능해지면 이어서 전송
+            self.tx_buffer += cmd[written:]
+            self.tx_pending.append((cmd, queued_at))
+            self.loop.add_writer(self.fd, self._on_writable)
+            return now
+        # 커널 버퍼에 들어간 시점 기준 (tcdrain은 루프를 막으므로 호출하지 않음)
+        self._record_tx(cmd, written, queued_at, now)
+        return now
+
+    def _on_writable(self):
+        try:
+            written = os.write(self.fd, self.tx_buffer)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self._link_lost(e)
+            return
+        del self.tx_buffer[:written]
+        if self.tx_buffer:
+            return
+        self.loop.remove_writer(self.fd)
+        now = time.perf_counter()
+        for cmd, queued_at in self.tx_pending:
+            self._record_tx(cmd, len(cmd), queued_at, now)
+        self.tx_pending.clear()
+        self._pump()
@@ -0,0 +1,108 @@
+# motor_bus.py
+
+"""
+한 시리얼 포트(RS-485 멀티드롭)에 연결된 여러 모터 ID의 명령/폴링 스케줄러.
+
+- 모터 ID별 채널이 현재 목표 명령, 스냅샷, 텔레메트리 링 버퍼를 가집니다.
+- 송신 순서는 라운드로빈: 새 명령이 있거나 폴링 시점이 된 채널을 돌아가며 한 프레임씩만 보내므로
+  한 모터가 명령을 계속 쏟아내도 다른 모터의 명령/폴링이 밀리지 않습니다.
+- 수신 프레임은 ID 바이트로 해당 채널에 전달됩니다.
+"""
+
+import time
+from threading import Lock
+
+from motor_snapshot import SnapshotPublisher
+from telemetry_ring import TelemetryRing
+
+# 여러 모터가 반이중 선로를 공유할 때 한 프레임 전송 후 응답을 기다리는 최대 시간
+REPLY_TIMEOUT = 0.03
+
+
+class MotorChannel:
+    def __init__(self, motor_id):
+        self.motor_id = motor_id
+        self.last_command = None
+        self.last_command_time = 0.0
+        self.command_pending = False
+        self.last_sent = 0.0
+        self.snapshots = SnapshotPublisher()
+        self.telemetry_ring = TelemetryRing()
+        self.reply_timeouts = 0
+
+
+class MotorBus:
+    def __init__(self, motor_ids=(0x01,)):
+        if not motor_ids:
+            raise ValueError("motor_ids가 비어 있습니다")
+        self.motor_ids = tuple(motor_ids)
+        self.channels = {motor_id: MotorChannel(motor_id) for motor_id in self.motor_ids}
+        self.primary_id = self.motor_ids[0]
+        self.lock = Lock()
+        self.rr_index = 0
+        self.unknown_frames = 0
+        # 모터가 둘 이상이면 응답을 기다린 뒤 다음 프레임을 보내 선로 충돌을 피함
+        self.await_reply = len(self.motor_ids) > 1
+
+    def channel(self, motor_id=None):
+        channel = self.channels.get(self.primary_id if motor_id is None else motor_id)
+        if channel is None:
+            raise ValueError(f"등록되지 않은 모터 ID입니다: {motor_id}")
+        return channel
+
+    def submit(self, motor_id, cmd):
+        channel = self.channel(motor_id)
+        with self.lock:
+            channel.last_command = cmd
+            channel.last_command_time = time.perf_counter()
+            channel.command_pending = True
+
+    def next_frame(self, now, keepalive_interval):
+        """
+        지금 보낼 프레임을 라운드로빈으로 하나 고릅니다.
+        반환값: (channel, cmd, queued_at) - queued_at이 None이면 keep-alive, 보낼 것이 없으면 None
+        """
+        ids = self.motor_ids
+        count = len(ids)
+        with self.lock:
+            # 새 명령이 있거나 keep-alive(폴링) 시점이 지난 채널 중 라운드로빈 순서상 첫 번째
+            for i in range(count):
+                channel = self.channels[ids[(self.rr_index + i) % count]]
+                if not channel.last_command:
+                    continue
+                if channel.command_pending:
+                    channel.command_pending = False
+                    queued_at = channel.last_command_time
+                elif keepalive_interval and now - channel.last_sent >= keepalive_interval:
+                    queued_at = None
+                else:
+                    continue
+                self.rr_index = (self.rr_index + i + 1) % count
+                return channel, channel.last_command, queued_at
+        return None
+
+    def next_due(self, now, keepalive_interval):
+        """다음 keep-alive까지 남은 시간(초). 보낼 명령이 없거나 keep-alive가 꺼져 있으면 None."""
+        if not keepalive_interval:
+            return None
+        due = None
+        for channel in self.channels.values():
+            if channel.last_command:
+                remaining = channel.last_sent + keepalive_interval - now
+                if due is None or remaining < due:
+                    due = remaining
+        return None if due is None else max(0.0, due)
+
+    def route(self, motor_id, telemetry, timestamp):
+        """수신 텔레메트리를 ID 바이트에 해당하는 채널로 전달합니다."""
+        channel = self.channels.get(motor_id)
+        if channel is None:
+            self.unknown_frames += 1
+            return None
+        setPos, position, force, sensor = telemetry
+        force_n = force * 0.001 * 9.81
+        channel.telemetry_ring.append(timestamp, setPos, position, force_n, sensor)
+        return channel.snapshots.publish(timestamp, setPos, position, round(force_n, 1), sensor)
+
+    def snapshots(self):
+        return {motor_id: channel.snapshots.snapshot for motor_id, channel in self.channels.items()}
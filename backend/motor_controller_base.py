@@ -0,0 +1,342 @@
+# motor_controller_base.py
+
+"""
+모터 컨트롤러 공통 기반 클래스.
+
+명령 생성, 모터 ID별 버스 스케줄링, 텔레메트리 디코딩/스냅샷/링 버퍼, 통계 등
+전송 방식과 무관한 부분을 모아 둡니다. 실제 시리얼 송수신은 하위 클래스가 구현합니다.
+- MotorThreadedController: 송신/수신 스레드
+- MotorAsyncController: asyncio 이벤트 루프에 파일 디스크립터 등록
+"""
+
+import platform
+import time
+from queue import Queue
+
+import serial
+
+from motor_frame_parser import MotorFrameParser, decode_telemetry
+from motor_bus import MotorBus
+from motor_trajectory import TrajectoryRunner, build_trajectory
+from motor_mode_generators import (
+    DEFAULT_MOTOR_ID,
+    generate_servo_mode_command,
+    generate_position_mode_command,
+    generate_speed_mode_command,
+    generate_force_mode_command,
+    generate_speed_force_mode_command
+)
+
+# 모터는 명령에 대한 응답으로만 텔레메트리를 보내므로 keep-alive 재전송이 곧 상태 폴링 주기입니다.
+DEFAULT_KEEPALIVE_INTERVAL = 0.05
+
+PARITY_MAP = {
+    "none": serial.PARITY_NONE,
+    "even": serial.PARITY_EVEN,
+    "odd": serial.PARITY_ODD,
+    "mark": serial.PARITY_MARK,
+    "space": serial.PARITY_SPACE
+}
+
+STOPBITS_MAP = {
+    "1": serial.STOPBITS_ONE,
+    "1.5": serial.STOPBITS_ONE_POINT_FIVE,
+    "2": serial.STOPBITS_TWO
+}
+
+
+class MotorControllerBase:
+    def __init__(self, keepalive_interval=DEFAULT_KEEPALIVE_INTERVAL, motor_ids=(DEFAULT_MOTOR_ID,)):
+        self.serial = None
+        self.send_queue = Queue()  # 덮어쓰면 안 되는 1회성 명령 (cmd, 큐잉 시각)
+        self.running = False
+        # 모터 ID별 명령/텔레메트리 채널 (첫 번째 ID가 기본 모터)
+        self.bus = MotorBus(motor_ids)
+        self.trajectory = None
+        self.on_disconnect = None  # 포트가 예기치 않게 끊겼을 때 호출
+        self.telemetry_hook = None  # 디코딩한 프레임마다 수신 스레드에서 바로 호출 (motor_id, snapshot)
+        self.keepalive_interval = keepalive_interval if keepalive_interval and keepalive_interval > 0 else None
+        self.tx_stats = {
+            "frames_sent": 0,
+            "keepalive_sent": 0,
+            "bytes_sent": 0,
+            "latency_count": 0,
+            "latency_total": 0.0,
+            "latency_last": 0.0,
+            "latency_max": 0.0,
+        }
+
+        # 기본 모터의 스냅샷/링 버퍼 (프레임마다 불변 스냅샷으로 교체, setPos/position/force/sensor 속성은 이 스냅샷을 읽음)
+        primary = self.bus.channel()
+        self.snapshots = primary.snapshots
+        self.telemetry_ring = primary.telemetry_ring  # 모든 디코딩 프레임 (단조 시계 타임스탬프)
+        self.frame_parser = MotorFrameParser()
+
+        # EEPROM 관련 변수
+        self.eeprom_data = {
+            "success": False,
+            "tipType": 0,
+            "shotCount": 0,
+            "year": 0,
+            "month": 0,
+            "day": 0,
+            "makerCode": 0
+        }
+
+    # --- 하위 클래스 구현 ---
+    def connect(self, port, baudrate, parity, databits, stopbits):
+        raise NotImplementedError
+
+    def disconnect(self):
+        raise NotImplementedError
+
+    def _wake_sender(self):
+        """새 명령이 생겼음을 송신 경로에 알립니다."""
+        raise NotImplementedError
+
+    # --- 포트 ---
+    def get_platform_port(self, port):
+        """플랫폼에 따라 적절한 포트 이름을 반환합니다."""
+        system = platform.system().lower()
+        
+        # 리눅스 환경에서 'usb-motor' 심볼릭 링크 사용
+        if system == 'linux':
+            if port.lower() == 'auto':
+                return '/dev/usb-motor'
+            elif not port.startswith('/dev/'):
+                # return f'/dev/{port}'
+                return '/dev/usb-motor'
+        
+        return port
+
+    def _open_serial(self, port, baudrate, parity, databits, stopbits, timeout):
+        # 플랫폼에 맞는 포트 이름 가져오기
+        port = self.get_platform_port(port)
+        print(f"[MOTOR] trying port: {port}, baudrate: {baudrate}")
+
+        # 사용자가 문자열로 입력했을 경우 처리
+        stopbits_key = str(stopbits)
+        if stopbits_key == "2" or stopbits_key == "3":
+            stopbits_key = "2"
+        elif stopbits_key not in STOPBITS_MAP:
+            stopbits_key = "1"
+
+        return serial.Serial(
+            port=port,
+            baudrate=int(baudrate),
+            bytesize=int(databits),
+            parity=PARITY_MAP[parity.lower()],
+            stopbits=STOPBITS_MAP[stopbits_key],
+            timeout=timeout
+        )
+
+    def is_connected(self):
+        return self.serial and self.serial.is_open
+
+    def _handle_link_lost(self):
+        self.disconnect()
+        callback = self.on_disconnect
+        if callback:
+            try:
+                callback()
+            except Exception as e:
+                print(f"[MOTOR] on_disconnect 콜백 오류: {e}")
+
+    def move_to_position(self, pos: int, mode="servo", motor_id=None):
+        try:
+            motor_id = self._resolve_motor_id(motor_id)
+            if mode == "servo":
+                cmd = generate_servo_mode_command(pos, motor_id)
+            elif mode == "position":
+                cmd = generate_position_mode_command(pos, motor_id)
+            else:
+                return f"❌ 지원하지 않는 모드입니다: {mode}"
+
+            self._submit_command(cmd, motor_id)
+            return f"📤 위치 이동 명령 큐잉 완료: {cmd.hex().upper()}"
+        except Exception as e:
+            return f"❌ 명령 생성 실패: {str(e)}"
+
+    def move_with_speed(self, speed: int, position: int, motor_id=None):
+        try:
+            motor_id = self._resolve_motor_id(motor_id)
+            cmd = generate_speed_mode_command(speed, position, motor_id)
+            self._submit_command(cmd, motor_id)
+            return f"📤 속도/위치 이동 명령 큐잉 완료: {cmd.hex().upper()}"
+        except Exception as e:
+            return f"❌ 명령 생성 실패: {str(e)}"
+
+    def set_force(self, force: float, motor_id=None):
+        try:
+            motor_id = self._resolve_motor_id(motor_id)
+            # N을 g로 변환 (1N = 101.97g)
+            force_g = int(force * 101.97)
+            cmd = generate_force_mode_command(force_g, motor_id)
+            self._submit_command(cmd, motor_id)
+            return f"📤 힘 제어 명령 큐잉 완료: {cmd.hex().upper()}"
+        except Exception as e:
+            return f"❌ 명령 생성 실패: {str(e)}"
+
+    def move_with_speed_force(self, force: float, speed: int, position: int, motor_id=None):
+        try:
+            motor_id = self._resolve_motor_id(motor_id)
+            # N을 g로 변환 (1N = 101.97g)
+            force_g = int(force * 101.97)
+            cmd = generate_speed_force_mode_command(force_g, speed, position, motor_id)
+            self._submit_command(cmd, motor_id)
+            return f"📤 속도/힘/위치 이동 명령 큐잉 완료: {cmd.hex().upper()}"
+        except Exception as e:
+            return f"❌ 명령 생성 실패: {str(e)}"
+
+    def run_trajectory(self, points, motor_id=None):
+        """
+        (시간 오프셋, mode, position, speed, force[N]) 셋포인트 목록을 미리 프레임으로 만든 뒤
+        단조 시계 데드라인에 맞춰 스트리밍합니다. 실행 중인 trajectory는 중단됩니다.
+        """
+        try:
+            motor_id = self._resolve_motor_id(motor_id)
+            frames = build_trajectory(points, motor_id)
+            if not frames:
+                return "❌ trajectory 셋포인트가 없습니다"
+            self.stop_trajectory()
+            self.trajectory = TrajectoryRunner(frames, lambda cmd: self._submit_command(cmd, motor_id))
+            self.trajectory.start()
+            return f"📤 trajectory 시작: {len(frames)}개 셋포인트, {frames[-1][0]:.3f}s"
+        except Exception as e:
+            return f"❌ trajectory 생성 실패: {str(e)}"
+
+    def stop_trajectory(self):
+        if self.trajectory and self.trajectory.is_running():
+            self.trajectory.stop()
+            return "⏹ trajectory 중단"
+        return "실행 중인 trajectory가 없습니다."
+
+    def get_trajectory_status(self):
+        if self.trajectory is None:
+            return {"running": False, "points": 0}
+        return self.trajectory.get_status()
+
+    def _resolve_motor_id(self, motor_id):
+        return self.bus.primary_id if motor_id is None else int(motor_id)
+
+    def _submit_command(self, cmd, motor_id=None):
+        """해당 모터의 현재 목표 명령을 교체하고 송신 경로를 즉시 깨웁니다."""
+        self.bus.submit(motor_id, cmd)
+        self._wake_sender()
+
+    @property
+    def last_command(self):
+        return self.bus.channel().last_command
+
+    def get_motor_ids(self):
+        return list(self.bus.motor_ids)
+
+    def send_once(self, cmd):
+        """keep-alive로 덮어쓰이지 않고 정확히 한 번 전송되어야 하는 명령을 큐잉합니다."""
+        self.send_queue.put((cmd, time.perf_counter()))
+        self._wake_sender()
+        return f"📤 1회성 명령 큐잉 완료: {cmd.hex().upper()}"
+
+    def set_keepalive_interval(self, interval):
+        """keep-alive(상태 폴링) 재전송 주기(초). 0 또는 None이면 재전송하지 않습니다."""
+        self.keepalive_interval = interval if interval and interval > 0 else None
+        self._wake_sender()
+
+    def get_tx_stats(self):
+        stats = self.tx_stats
+        count = stats["latency_count"]
+        return {
+            "frames_sent": stats["frames_sent"],
+            "keepalive_sent": stats["keepalive_sent"],
+            "bytes_sent": stats["bytes_sent"],
+            "keepalive_interval_ms": self.keepalive_interval * 1000 if self.keepalive_interval else None,
+            "latency_last_ms": round(stats["latency_last"] * 1000, 3),
+            "latency_avg_ms": round(stats["latency_total"] / count * 1000, 3) if count else 0.0,
+            "latency_max_ms": round(stats["latency_max"] * 1000, 3),
+        }
+
+    def _record_tx(self, cmd, bytes_written, queued_at, now):
+        stats = self.tx_stats
+        stats["frames_sent"] += 1
+        stats["bytes_sent"] += bytes_written or 0
+        if queued_at is None:
+            stats["keepalive_sent"] += 1
+        else:
+            # 큐잉 시점부터 송신 완료까지의 지연
+            latency = now - queued_at
+            stats["latency_count"] += 1
+            stats["latency_total"] += latency
+            stats["latency_last"] = latency
+            if latency > stats["latency_max"]:
+                stats["latency_max"] = latency
+
+        # 디버깅 정보 추가
+        if bytes_written != len(cmd):
+            print(f"[Warning] 전송된 바이트 수 불일치: {bytes_written}/{len(cmd)}")
+
+    def parse_response(self, frame):
+        try:
+            telemetry = decode_telemetry(frame)
+            if telemetry is None:
+                return
+            self._apply_telemetry(telemetry, time.monotonic(), frame[3])
+        except Exception as e:
+            print(f"[Parse Error] {str(e)}")
+            print(f"[Parse Error] frame: {frame.hex().upper()}")
+
+    def _apply_telemetry(self, telemetry, timestamp, motor_id=DEFAULT_MOTOR_ID):
+        # ID 바이트로 해당 모터 채널의 링 버퍼/스냅샷에 반영
+        snapshot = self.bus.route(motor_id, telemetry, timestamp)
+        hook = self.telemetry_hook
+        if hook is not None and snapshot is not None:
+            try:
+                hook(motor_id, snapshot)
+            except Exception as e:
+                print(f"[MOTOR] 텔레메트리 훅 오류: {e}")
+        return snapshot
+
+    # 하위 호환용 속성 - 항상 같은 프레임의 스냅샷에서 읽음
+    @property
+    def setPos(self):
+        return self.snapshots.snapshot.setPos
+
+    @property
+    def position(self):
+        return self.snapshots.snapshot.position
+
+    @property
+    def force(self):
+        return self.snapshots.snapshot.force
+
+    @property
+    def sensor(self):
+        return self.snapshots.snapshot.sensor
+
+    def get_snapshot(self, motor_id=None):
+        """최신 텔레메트리 스냅샷 (seq, timestamp, setPos, position, force, sensor)"""
+        return self.bus.channel(motor_id).snapshots.snapshot
+
+    def get_all_snapshots(self):
+        """모터 ID -> 최신 스냅샷"""
+        return self.bus.snapshots()
+
+    def wait_for_snapshot(self, after_seq, timeout=None, motor_id=None):
+        """after_seq 이후의 다음 스냅샷을 기다립니다 (스레드용). timeout이면 None."""
+        return self.bus.channel(motor_id).snapshots.wait_after(after_seq, timeout)
+
+    def wait_for_snapshot_async(self, after_seq, loop, motor_id=None):
+        """after_seq 이후의 다음 스냅샷으로 완료되는 asyncio future"""
+        return self.bus.channel(motor_id).snapshots.wait_after_async(after_seq, loop)
+
+    def get_telemetry_ring(self, motor_id=None):
+        return self.bus.channel(motor_id).telemetry_ring
+
+    def get_parser_stats(self):
+        parser = self.frame_parser
+        return {
+            "discarded_bytes": parser.discarded_bytes,
+            "resync_count": parser.resync_count,
+            "checksum_errors": parser.checksum_errors,
+            "unknown_id_frames": self.bus.unknown_frames,
+            "reply_timeouts": {motor_id: channel.reply_timeouts for motor_id, channel in self.bus.channels.items()},
+        }
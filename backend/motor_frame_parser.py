@@ -0,0 +1,148 @@
+# motor_frame_parser.py
+
+"""
+모터 응답 프레임(AA 55 | LEN | ID | CMD | DATA... | CHECKSUM) 분리기.
+
+LEN 바이트는 CMD부터 DATA 끝까지의 바이트 수이므로 전체 프레임 길이는 LEN + 5 입니다.
+다음 헤더를 기다리지 않고 길이 바이트만으로 프레임을 잘라내므로
+프레임이 도착하는 즉시 파싱할 수 있습니다.
+
+텔레메트리 디코딩은 미리 컴파일한 struct 레이아웃으로 바이너리에서 직접 수행합니다.
+(프레임 오프셋 7부터 setPos, actPos, (미사용 2바이트), force, sensor - 모두 little endian int16)
+"""
+
+import struct
+
+FRAME_HEADER = b'\xAA\x55'
+COMMAND_HEADER = b'\x55\xAA'
+FRAME_OVERHEAD = 5          # 헤더(2) + LEN(1) + ID(1) + CHECKSUM(1)
+MIN_FRAME_LENGTH = 0x01     # CMD 바이트만 있는 최소 프레임
+MAX_FRAME_LENGTH = 0x40     # 이보다 큰 LEN은 노이즈로 간주하고 재동기화
+
+TELEMETRY_STRUCT = struct.Struct('<hhxxhh')  # setPos, actPos, (skip), force, sensor
+TELEMETRY_OFFSET = 7
+TELEMETRY_MIN_FRAME = TELEMETRY_OFFSET + TELEMETRY_STRUCT.size + 1  # + checksum
+
+
+def frame_checksum_ok(frame):
+    """체크섬 = LEN부터 DATA 끝까지의 합의 하위 1바이트"""
+    length = frame[2]
+    checksum_index = length + 4
+    if len(frame) <= checksum_index:
+        return False
+    return (sum(frame[2:checksum_index]) & 0xFF) == frame[checksum_index]
+
+
+def decode_telemetry(frame):
+    """
+    단일 프레임을 (setPos, position, force_raw, sensor) 튜플로 디코딩합니다.
+    길이가 부족하거나 체크섬이 맞지 않으면 None을 반환합니다.
+    """
+    if len(frame) < TELEMETRY_MIN_FRAME or not frame_checksum_ok(frame):
+        return None
+    return TELEMETRY_STRUCT.unpack_from(frame, TELEMETRY_OFFSET)
+
+
+def decode_telemetry_buffer(data):
+    """
+    여러 프레임이 이어진 버퍼를 한 번에 디코딩합니다 (배치 모드).
+    반환값: 디코딩된 텔레메트리 튜플 리스트 (잘못된 프레임은 제외)
+    """
+    return MotorFrameParser().feed_decoded(data)
+
+
+class MotorFrameParser:
+    def __init__(self, header=FRAME_HEADER):
+        # 명령 프레임(55 AA)을 분리할 때는 header=COMMAND_HEADER 사용 (예: 장치 시뮬레이터)
+        self.header = header
+        self.buffer = bytearray()
+        self.start = 0  # 이미 소비한 바이트 위치 (앞부분 복사를 피하기 위해 오프셋으로 관리)
+        self.discarded_bytes = 0
+        self.resync_count = 0
+        self.checksum_errors = 0
+
+    def reset(self):
+        self.buffer = bytearray()
+        self.start = 0
+
+    def feed(self, data):
+        """
+        수신 바이트를 추가하고 완성된 프레임 목록(bytes)을 반환합니다.
+        미완성 프레임은 다음 호출까지 버퍼에 남습니다.
+        """
+        frames = []
+        if not data:
+            return frames
+
+        buffer = self.buffer
+        header = self.header
+        h0, h1 = header[0], header[1]
+        buffer += data
+        start = self.start
+        end = len(buffer)
+
+        with memoryview(buffer) as view:
+            while end - start >= 3:
+                # 헤더 재동기화: 파이썬 레벨 바이트 스캔 대신 find 사용
+                if buffer[start] != h0 or buffer[start + 1] != h1:
+                    header_index = buffer.find(header, start)
+                    if header_index < 0:
+                        # 마지막 바이트가 헤더 첫 바이트일 수 있으므로 남겨둠
+                        keep_from = end - 1 if buffer[end - 1] == h0 else end
+                        self.discarded_bytes += keep_from - start
+                        self.resync_count += 1
+                        start = keep_from
+                        break
+                    self.discarded_bytes += header_index - start
+                    self.resync_count += 1
+                    start = header_index
+                    continue
+
+                length = buffer[start + 2]
+                if length < MIN_FRAME_LENGTH or length > MAX_FRAME_LENGTH:
+                    # 잘못된 길이 바이트 - 헤더를 건너뛰고 다시 찾음
+                    self.discarded_bytes += 2
+                    self.resync_count += 1
+                    start += 2
+                    continue
+
+                frame_size = length + FRAME_OVERHEAD
+                if end - start < frame_size:
+                    break  # 프레임 미완성 - 다음 데이터 대기
+
+                frames.append(bytes(view[start:start + frame_size]))
+                start += frame_size
+
+        # 소비한 바이트 정리: 버퍼가 비었거나 앞부분이 충분히 쌓였을 때만 한 번에 잘라냄
+        if start >= end:
+            self.buffer = bytearray()
+            self.start = 0
+        elif start > 4096 or start > (end >> 1):
+            del buffer[:start]
+            self.start = 0
+        else:
+            self.start = start
+
+        return frames
+
+    def pending(self):
+        return len(self.buffer) - self.start
+
+    def feed_decoded(self, data, with_id=False):
+        """
+        feed()와 같지만 완성된 프레임을 텔레메트리 튜플로 디코딩해서 반환합니다.
+        with_id=True이면 (motor_id, 텔레메트리 튜플) 쌍을 반환합니다 (멀티드롭 버스용).
+        """
+        decoded = []
+        unpack_from = TELEMETRY_STRUCT.unpack_from
+        for frame in self.feed(data):
+            if len(frame) < TELEMETRY_MIN_FRAME:
+                continue
+            if not frame_checksum_ok(frame):
+                self.checksum_errors += 1
+                continue
+            if with_id:
+                decoded.append((frame[3], unpack_from(frame, TELEMETRY_OFFSET)))
+            else:
+                decoded.append(unpack_from(frame, TELEMETRY_OFFSET))
+        return decoded
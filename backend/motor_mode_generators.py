@@ -1,20 +1,21 @@
-def generate_servo_mode_command(target_position):
-    return _generate_mode_command(mode_code=0x01, speed=0, position=target_position, force=0)
+DEFAULT_MOTOR_ID = 0x01
 
-def generate_position_mode_command(target_position):
-    return _generate_mode_command(mode_code=0x00, speed=0, position=target_position, force=0)
+def generate_servo_mode_command(target_position, motor_id=DEFAULT_MOTOR_ID):
+    return _generate_mode_command(mode_code=0x01, speed=0, position=target_position, force=0, motor_id=motor_id)
 
-def generate_speed_mode_command(target_speed, target_position):
-    return _generate_mode_command(mode_code=0x02, speed=target_speed, position=target_position, force=0)
+def generate_position_mode_command(target_position, motor_id=DEFAULT_MOTOR_ID):
+    return _generate_mode_command(mode_code=0x00, speed=0, position=target_position, force=0, motor_id=motor_id)
 
-def generate_speed_force_mode_command(target_force, target_speed, target_position):
-    return _generate_mode_command(mode_code=0x05, speed=target_speed, position=target_position, force=target_force)
+def generate_speed_mode_command(target_speed, target_position, motor_id=DEFAULT_MOTOR_ID):
+    return _generate_mode_command(mode_code=0x02, speed=target_speed, position=target_position, force=0, motor_id=motor_id)
 
-def generate_force_mode_command(target_force):
+def generate_speed_force_mode_command(target_force, target_speed, target_position, motor_id=DEFAULT_MOTOR_ID):
+    return _generate_mode_command(mode_code=0x05, speed=target_speed, position=target_position, force=target_force, motor_id=motor_id)
+
+def generate_force_mode_command(target_force, motor_id=DEFAULT_MOTOR_ID):
     # target_force는 g 단위 (예: 1000g = 0x03E8)
     header = [0x55, 0xAA]
     frame_length = 0x09
-    motor_id = 0x01
     command_type = 0x32
 
     control_mode_register = [0x25, 0x00]
@@ -27,9 +28,8 @@ def generate_force_mode_command(target_force):
 
     return bytes(header + [frame_length, motor_id, command_type] + payload + [checksum])
 
-def _generate_mode_command(mode_code, speed, position, force, frame_length=0x0D):
+def _generate_mode_command(mode_code, speed, position, force, frame_length=0x0D, motor_id=DEFAULT_MOTOR_ID):
     header = [0x55, 0xAA]
-    motor_id = 0x01
     command_type = 0x32
 
     control_mode_register = [0x25, 0x00]
@@ -48,3 +48,25 @@ def _generate_mode_command(mode_code, speed, position, force, frame_length=0x0D)
     checksum = (frame_length + motor_id + command_type + sum(payload)) & 0xFF
 
     return bytes(header + [frame_length, motor_id, command_type] + payload + [checksum])
+
+
+# 모드 이름 -> 제어 모드 코드
+MODE_CODES = {
+    "position": 0x00,
+    "servo": 0x01,
+    "speed": 0x02,
+    "force": 0x03,
+    "speed_force": 0x05,
+}
+
+def generate_mode_command(mode, position=0, speed=0, force=0, motor_id=DEFAULT_MOTOR_ID):
+    """모드 이름으로 단일 명령 프레임을 생성합니다. force는 g 단위입니다."""
+    if mode == "force":
+        return generate_force_mode_command(force, motor_id=motor_id)
+    if mode not in MODE_CODES:
+        raise ValueError(f"지원하지 않는 모드입니다: {mode}")
+    return _generate_mode_command(mode_code=MODE_CODES[mode], speed=speed, position=position, force=force, motor_id=motor_id)
+
+def generate_mode_commands(setpoints, motor_id=DEFAULT_MOTOR_ID):
+    """(mode, position, speed, force) 목록을 한 번에 프레임 목록으로 변환합니다."""
+    return [generate_mode_command(mode, position, speed, force, motor_id) for mode, position, speed, force in setpoints]
@@ -0,0 +1,93 @@
+# motor_snapshot.py
+
+"""
+모터 텔레메트리 스냅샷.
+
+리더 스레드가 프레임마다 불변 스냅샷 객체를 새로 만들어 참조 하나만 교체하므로
+다른 스레드는 락 없이도 항상 같은 프레임에서 나온 값 묶음을 읽습니다.
+seq(프레임 순번)로 "seq N 이후의 다음 스냅샷"을 기다릴 수 있습니다.
+"""
+
+from threading import Event
+
+
+class MotorSnapshot:
+    __slots__ = ("seq", "timestamp", "setPos", "position", "force", "sensor")
+
+    def __init__(self, seq, timestamp, setPos, position, force, sensor):
+        self.seq = seq
+        self.timestamp = timestamp  # time.monotonic() 수신 시각
+        self.setPos = setPos
+        self.position = position
+        self.force = force          # N 단위 (소수 첫째 자리 반올림)
+        self.sensor = sensor
+
+    def as_dict(self):
+        return {
+            "seq": self.seq,
+            "timestamp": self.timestamp,
+            "setPos": self.setPos,
+            "position": self.position,
+            "force": self.force,
+            "sensor": self.sensor,
+        }
+
+
+EMPTY_SNAPSHOT = MotorSnapshot(0, 0.0, 0, 0, 0, 0)
+
+
+class SnapshotPublisher:
+    def __init__(self):
+        self.snapshot = EMPTY_SNAPSHOT
+        self._next_event = Event()
+        self._async_waiters = []  # (loop, future, seq)
+
+    def publish(self, timestamp, setPos, position, force, sensor):
+        """리더 스레드에서 호출. 새 스냅샷으로 참조를 교체하고 대기자를 깨웁니다."""
+        snapshot = MotorSnapshot(self.snapshot.seq + 1, timestamp, setPos, position, force, sensor)
+        self.snapshot = snapshot
+
+        event = self._next_event
+        self._next_event = Event()
+        event.set()
+
+        if self._async_waiters:
+            waiters, self._async_waiters = self._async_waiters, []
+            for loop, future, seq in waiters:
+                if seq < snapshot.seq:
+                    loop.call_soon_threadsafe(_resolve, future, snapshot)
+                else:
+                    self._async_waiters.append((loop, future, seq))
+        return snapshot
+
+    def wait_after(self, seq, timeout=None):
+        """
+        seq보다 큰 스냅샷을 반환합니다 (스레드용). timeout 안에 새 프레임이 없으면 None.
+        이벤트를 먼저 잡고 seq를 확인하므로 그 사이에 발행된 프레임도 놓치지 않습니다.
+        """
+        event = self._next_event
+        snapshot = self.snapshot
+        if snapshot.seq > seq:
+            return snapshot
+        if event.wait(timeout):
+            return self.snapshot
+        return None
+
+    def wait_after_async(self, seq, loop):
+        """seq보다 큰 스냅샷으로 완료되는 asyncio future를 반환합니다 (이벤트 루프에서 호출)."""
+        future = loop.create_future()
+        snapshot = self.snapshot
+        if snapshot.seq > seq:
+            future.set_result(snapshot)
+            return future
+        self._async_waiters.append((loop, future, seq))
+        # 등록 직전에 발행된 프레임 확인
+        snapshot = self.snapshot
+        if snapshot.seq > seq and not future.done():
+            future.set_result(snapshot)
+        return future
+
+
+def _resolve(future, snapshot):
+    if not future.done():
+        future.set_result(snapshot)
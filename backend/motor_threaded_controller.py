@@ -1,102 +1,35 @@
 import serial
 import time
-import os
-import platform
-from threading import Thread, Lock
-from queue import Queue, Empty
-from motor_mode_generators import (
-    generate_servo_mode_command,
-    generate_position_mode_command,
-    generate_speed_mode_command,
-    generate_force_mode_command,
-    generate_speed_force_mode_command
-)
+from threading import Thread, Lock, Event, current_thread
+from queue import Empty
+from motor_frame_parser import MotorFrameParser
+from motor_bus import REPLY_TIMEOUT
+from motor_controller_base import MotorControllerBase, DEFAULT_KEEPALIVE_INTERVAL
+from motor_mode_generators import DEFAULT_MOTOR_ID
 
 # EEPROM 기능은 ws_server.py에서 관리됨
 
-class MotorThreadedController:
-    def __init__(self):
-        self.serial = None
-        self.send_queue = Queue()
-        self.lock = Lock()
-        self.running = False
+class MotorThreadedController(MotorControllerBase):
+    def __init__(self, keepalive_interval=DEFAULT_KEEPALIVE_INTERVAL, motor_ids=(DEFAULT_MOTOR_ID,)):
+        super().__init__(keepalive_interval, motor_ids)
+        self.write_lock = Lock()   # 시리얼 write 직렬화용
+        self.command_event = Event()
         self.sender_thread = None
         self.reader_thread = None
-        self.last_command = None
-
-        self.setPos = 0
-        self.position = 0
-        self.force = 0
-        self.sensor = 0
-        
-        # EEPROM 관련 변수
-        self.eeprom_data = {
-            "success": False,
-            "tipType": 0,
-            "shotCount": 0,
-            "year": 0,
-            "month": 0,
-            "day": 0,
-            "makerCode": 0
-        }
         # EEPROM 주기적 읽기 제거 - GPIO23 인터럽트 방식으로 변경됨
 
     # EEPROM 기능은 ws_server.py에서 통합 관리됨
 
-    def get_platform_port(self, port):
-        """플랫폼에 따라 적절한 포트 이름을 반환합니다."""
-        system = platform.system().lower()
-        
-        # 리눅스 환경에서 'usb-motor' 심볼릭 링크 사용
-        if system == 'linux':
-            if port.lower() == 'auto':
-                return '/dev/usb-motor'
-            elif not port.startswith('/dev/'):
-                # return f'/dev/{port}'
-                return '/dev/usb-motor'
-        
-        return port
-
     def connect(self, port, baudrate, parity, databits, stopbits):
         if self.serial and self.serial.is_open:
             return "이미 연결되어 있습니다."
 
         try:
-            # 플랫폼에 맞는 포트 이름 가져오기
-            port = self.get_platform_port(port)
-            print(f"[MOTOR] trying port: {port}, baudrate: {baudrate}")
-
-
-            
-            parity_map = {
-                "none": serial.PARITY_NONE,
-                "even": serial.PARITY_EVEN,
-                "odd": serial.PARITY_ODD,
-                "mark": serial.PARITY_MARK,
-                "space": serial.PARITY_SPACE
-            }
+            self.running = False
+            self._join_threads()
 
-            stopbits_map = {
-                "1": serial.STOPBITS_ONE,
-                "1.5": serial.STOPBITS_ONE_POINT_FIVE,
-                "2": serial.STOPBITS_TWO
-            }
-
-            # 사용자가 문자열로 입력했을 경우 처리
-            stopbits_key = str(stopbits)
-            if stopbits_key == "2" or stopbits_key == "3":
-                stopbits_key = "2"
-            elif stopbits_key not in stopbits_map:
-                stopbits_key = "1"
-
-            self.serial = serial.Serial(
-                port=port,
-                baudrate=int(baudrate),
-                bytesize=int(databits),
-                parity=parity_map[parity.lower()],
-                stopbits=stopbits_map[stopbits_key],
-                timeout=0.1  # 0에서 0.1로 변경하여 리눅스 환경에서 더 안정적으로 작동
-            )
+            # 0에서 0.1로 변경하여 리눅스 환경에서 더 안정적으로 작동
+            self.serial = self._open_serial(port, baudrate, parity, databits, stopbits, timeout=0.1)
             self.running = True
             self.sender_thread = Thread(target=self.send_loop, daemon=True)
             self.reader_thread = Thread(target=self.read_loop, daemon=True)
@@ -109,163 +42,92 @@ class MotorThreadedController:
 
     def disconnect(self):
         self.running = False
+        self.stop_trajectory()
+        self.command_event.set()  # 대기 중인 송신 스레드 깨우기
         if self.serial and self.serial.is_open:
             self.serial.close()
             return "🔌 포트 연결 해제 완료"
         return "포트가 이미 닫혀 있습니다."
 
-    def is_connected(self):
-        return self.serial and self.serial.is_open
-
-    def move_to_position(self, pos: int, mode="servo"):
-        try:
-            if mode == "servo":
-                cmd = generate_servo_mode_command(pos)
-            elif mode == "position":
-                cmd = generate_position_mode_command(pos)
-            else:
-                return f"❌ 지원하지 않는 모드입니다: {mode}"
-
-            with self.lock:
-                self.last_command = cmd
-            return f"📤 위치 이동 명령 큐잉 완료: {cmd.hex().upper()}"
-        except Exception as e:
-            return f"❌ 명령 생성 실패: {str(e)}"
-
-    def move_with_speed(self, speed: int, position: int):
-        try:
-            cmd = generate_speed_mode_command(speed, position)
-            with self.lock:
-                self.last_command = cmd
-            return f"📤 속도/위치 이동 명령 큐잉 완료: {cmd.hex().upper()}"
-        except Exception as e:
-            return f"❌ 명령 생성 실패: {str(e)}"
-
-    def set_force(self, force: float):
-        try:
-            # N을 g로 변환 (1N = 101.97g)
-            force_g = int(force * 101.97)
-            cmd = generate_force_mode_command(force_g)
-            with self.lock:
-                self.last_command = cmd
-            return f"📤 힘 제어 명령 큐잉 완료: {cmd.hex().upper()}"
-        except Exception as e:
-            return f"❌ 명령 생성 실패: {str(e)}"
-
-    def move_with_speed_force(self, force: float, speed: int, position: int):
-        try:
-            # N을 g로 변환 (1N = 101.97g)
-            force_g = int(force * 101.97)
-            cmd = generate_speed_force_mode_command(force_g, speed, position)
-            with self.lock:
-                self.last_command = cmd
-            return f"📤 속도/힘/위치 이동 명령 큐잉 완료: {cmd.hex().upper()}"
-        except Exception as e:
-            return f"❌ 명령 생성 실패: {str(e)}"
+    def _join_threads(self, timeout=0.5):
+        """이전 연결의 송수신 스레드가 끝날 때까지 기다립니다 (재연결 시 스레드 중복 방지)."""
+        self.command_event.set()
+        current = current_thread()
+        for thread in (self.sender_thread, self.reader_thread):
+            if thread and thread.is_alive() and thread is not current:
+                thread.join(timeout)
+
+    def _wake_sender(self):
+        self.command_event.set()
+
+    def _write_frame(self, cmd, queued_at=None):
+        with self.write_lock:
+            bytes_written = self.serial.write(cmd)
+            # 리눅스에서는 명시적으로 flush 호출이 필요할 수 있음
+            self.serial.flush()
+        now = time.perf_counter()
+        # flush 완료 = 송신 버퍼가 선로로 나간 시점
+        self._record_tx(cmd, bytes_written, queued_at, now)
+        return now
 
     def send_loop(self):
+        bus = self.bus
         while self.running:
             try:
-                time.sleep(0.05)
-                with self.lock:
-                    if self.last_command:
-                        bytes_written = self.serial.write(self.last_command)
-                        # 리눅스에서는 명시적으로 flush 호출이 필요할 수 있음
-                        self.serial.flush()
-                        # 디버깅 정보 추가
-                        if bytes_written != len(self.last_command):
-                            print(f"[Warning] 전송된 바이트 수 불일치: {bytes_written}/{len(self.last_command)}")
+                # 새 명령이 오면 즉시 깨어나고, 그렇지 않으면 가장 이른 keep-alive 시점까지만 대기
+                interval = self.keepalive_interval
+                self.command_event.wait(bus.next_due(time.perf_counter(), interval))
+                self.command_event.clear()
+                if not self.running:
+                    break
+
+                # 1회성 명령 먼저 전송
+                while True:
+                    try:
+                        cmd, queued_at = self.send_queue.get_nowait()
+                    except Empty:
+                        break
+                    self._write_frame(cmd, queued_at)
+
+                # 보낼 것이 남아 있는 동안 모터 ID를 라운드로빈으로 돌며 한 프레임씩 전송
+                while self.running:
+                    picked = bus.next_frame(time.perf_counter(), interval)
+                    if picked is None:
+                        break
+                    channel, cmd, queued_at = picked
+                    seq = channel.snapshots.snapshot.seq
+                    channel.last_sent = self._write_frame(cmd, queued_at)
+                    if bus.await_reply and channel.snapshots.wait_after(seq, REPLY_TIMEOUT) is None:
+                        # 반이중 선로: 응답(또는 타임아웃) 전에는 다음 모터로 넘어가지 않음
+                        channel.reply_timeouts += 1
             except Exception as e:
                 print(f"[SendThread Error] {str(e)}")
                 # 리눅스 환경에서 시리얼 통신 에러 발생 시 짧은 시간 대기
                 time.sleep(0.1)
 
     def read_loop(self):
-        buffer = bytearray()
+        parser = self.frame_parser = MotorFrameParser()
         while self.running:
             try:
-                time.sleep(0.01)
-                
-                # EEPROM 주기적 읽기 제거 - GPIO23 인터럽트 방식으로 변경됨
-                # EEPROM은 write 명령 시에만 읽음
-                
-                # 기존 모터 시리얼 통신 로직
-                # 리눅스에서는 in_waiting 속성이 더 안정적
-                if hasattr(self.serial, 'in_waiting') and self.serial.in_waiting > 0:
-                    data = self.serial.read(self.serial.in_waiting)
-                else:
-                    # 기존 방식 유지(읽을 데이터가 없으면 빈 바이트 배열 반환)
-                    data = self.serial.read(1024)
-                
-                if data:
-                    buffer += data
+                # 수신 대기 중에는 read가 timeout(0.1s)까지 블로킹하므로 별도 sleep 없이
+                # 첫 바이트가 도착하는 즉시 깨어나고, 이미 쌓인 바이트는 한 번에 읽음
+                waiting = self.serial.in_waiting
+                data = self.serial.read(waiting if waiting > 0 else 1)
 
-                    while True:
-                        if len(buffer) < 2:
-                            break
-
-                        # 헤더 확인
-                        if buffer[0] == 0xAA and buffer[1] == 0x55:
-                            # 다음 헤더 찾기
-                            next_header_index = self.find_next_header(buffer)
-                            if next_header_index:
-                                frame = buffer[:next_header_index]
-                                buffer = buffer[next_header_index:]
-                                self.parse_response(frame)
-                            else:
-                                break  # 다음 헤더 없으면 대기
-                        else:
-                            buffer.pop(0)
+                if data:
+                    received_at = time.monotonic()
+                    for motor_id, telemetry in parser.feed_decoded(data, with_id=True):
+                        self._apply_telemetry(telemetry, received_at, motor_id)
+            except (serial.SerialException, OSError) as e:
+                if not self.running:
+                    break  # disconnect()로 포트가 닫힌 경우
+                # USB 분리 등으로 포트가 사라짐 - 닫고 재연결 감시자에게 알림
+                print(f"[ReadThread] 포트 연결 끊김: {str(e)}")
+                self._handle_link_lost()
+                break
             except Exception as e:
+                if not self.running:
+                    break
                 print(f"[ReadThread Error] {str(e)}")
                 # 리눅스 환경에서 시리얼 통신 에러 발생 시 짧은 시간 대기
                 time.sleep(0.1)
-
-    def find_next_header(self, buffer):
-        try:
-            for i in range(2, len(buffer) - 1):
-                if buffer[i] == 0xAA and buffer[i+1] == 0x55:
-                    return i
-            return None
-        except Exception as e:
-            print(f"[FindHeader Error] {str(e)}")
-            return None
-
-    def parse_response(self, frame):
-        try:
-            hex_str = frame.hex().upper()
-
-            if len(hex_str) < 34:  # 최소 필요한 길이 체크
-                return
-
-            setPos_val = hex_str[14:18]  # setPos
-            rec_val = hex_str[18:22]  # actPos
-            force_val = hex_str[26:30]  # force
-            sensor_val = hex_str[30:34]  # sensor
-
-            setPos_reorder = setPos_val[2:] + setPos_val[:2]
-            rec_reorder = rec_val[2:] + rec_val[:2]
-            force_reorder = force_val[2:] + force_val[:2]
-            sensor_reorder = sensor_val[2:] + sensor_val[:2]
-
-            setPos = int(setPos_reorder, 16)
-            position = int(rec_reorder, 16)
-            force = int(force_reorder, 16)
-            sensor = int(sensor_reorder, 16)
-
-            if setPos >= 0x8000:
-                setPos -= 0x10000
-            if position >= 0x8000:
-                position -= 0x10000
-            if force >= 0x8000:
-                force -= 0x10000
-            if sensor >= 0x8000:
-                sensor -= 0x10000
-
-            self.setPos = setPos
-            self.position = position
-            self.force = round(force * 0.001 * 9.81, 1)
-            self.sensor = sensor
-        except Exception as e:
-            print(f"[Parse Error] {str(e)}")
-            print(f"[Parse Error] frame: {frame.hex().upper()}")
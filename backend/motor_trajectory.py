@@ -0,0 +1,178 @@
+# motor_trajectory.py
+
+"""
+시간 오프셋이 지정된 모터 셋포인트 시퀀스(trajectory)를 미리 프레임으로 만들어 두고
+단조 시계(time.monotonic) 기준 데드라인에 맞춰 모터로 스트리밍합니다.
+
+셋포인트 형식: (시간 오프셋[s], mode, position, speed, force[N])
+mode: position / servo / speed / force / speed_force (motor_mode_generators.MODE_CODES)
+"""
+
+import math
+import time
+from threading import Thread, Event
+
+from motor_mode_generators import MODE_CODES, DEFAULT_MOTOR_ID, generate_mode_commands
+
+# N을 g로 변환 (1N = 101.97g) - MotorControllerBase.set_force와 동일
+NEWTON_TO_GRAM = 101.97
+
+
+def normalize_points(points):
+    """dict 또는 리스트 형태의 셋포인트를 (t, mode, position, speed, force) 튜플로 정리합니다."""
+    normalized = []
+    for point in points:
+        if isinstance(point, dict):
+            t = point.get("t", point.get("time", 0))
+            mode = point.get("mode", "position")
+            position = point.get("position", 0)
+            speed = point.get("speed", 0)
+            force = point.get("force", 0)
+        else:
+            t, mode, position, speed, force = (list(point) + [0, 0])[:5]
+        if mode not in MODE_CODES:
+            raise ValueError(f"지원하지 않는 모드입니다: {mode}")
+        if t < 0:
+            raise ValueError(f"시간 오프셋은 0 이상이어야 합니다: {t}")
+        normalized.append((float(t), mode, int(position), int(speed), float(force)))
+    normalized.sort(key=lambda p: p[0])
+    return normalized
+
+
+def build_trajectory(points, motor_id=DEFAULT_MOTOR_ID):
+    """셋포인트 목록을 [(시간 오프셋, 프레임), ...]으로 한 번에 변환합니다."""
+    normalized = normalize_points(points)
+    frames = generate_mode_commands(
+        ((mode, position, speed, int(force * NEWTON_TO_GRAM))
+         for _, mode, position, speed, force in normalized),
+        motor_id
+    )
+    return [(p[0], frame) for p, frame in zip(normalized, frames)]
+
+
+def trapezoid_profile(start, end, max_speed, accel, step=0.02, mode="position", t0=0.0):
+    """
+    사다리꼴 속도 프로파일로 start -> end 위치 셋포인트를 step 간격으로 생성합니다.
+    max_speed: 위치 단위/s, accel: 위치 단위/s^2
+    거리가 짧아 최고 속도에 도달하지 못하면 삼각형 프로파일이 됩니다.
+    """
+    if max_speed <= 0 or accel <= 0 or step <= 0:
+        raise ValueError("max_speed, accel, step은 0보다 커야 합니다")
+
+    distance = abs(end - start)
+    direction = 1 if end >= start else -1
+
+    t_acc = max_speed / accel
+    d_acc = 0.5 * accel * t_acc * t_acc
+    if 2 * d_acc > distance:
+        t_acc = math.sqrt(distance / accel)
+        d_acc = distance / 2
+        v_peak = accel * t_acc
+        t_cruise = 0.0
+    else:
+        v_peak = max_speed
+        t_cruise = (distance - 2 * d_acc) / max_speed
+    total = 2 * t_acc + t_cruise
+
+    def travelled(t):
+        if t < t_acc:
+            return 0.5 * accel * t * t
+        if t < t_acc + t_cruise:
+            return d_acc + v_peak * (t - t_acc)
+        td = min(t, total) - t_acc - t_cruise
+        return d_acc + v_peak * t_cruise + v_peak * td - 0.5 * accel * td * td
+
+    points = []
+    steps = max(1, int(math.ceil(total / step)))
+    for i in range(steps + 1):
+        t = min(i * step, total)
+        position = start + direction * travelled(t)
+        points.append((t0 + t, mode, int(round(position)), 0, 0))
+    # 마지막 점은 정확히 목표 위치
+    points[-1] = (t0 + total, mode, int(end), 0, 0)
+    return points
+
+
+def insertion_cycle_profile(insert_position, retract_position, insert_speed, retract_speed,
+                            insert_time, dwell, force=0.0, cycles=1, period=None):
+    """
+    니들 삽입/후퇴 사이클 셋포인트를 생성합니다.
+    - 삽입: speed_force 모드 (force는 N 단위 힘 제한)
+    - insert_time + dwell 후 speed 모드로 후퇴
+    cycles > 1이면 period(기본값: 삽입+후퇴 시간의 2배) 간격으로 반복합니다.
+    """
+    if cycles < 1:
+        raise ValueError("cycles는 1 이상이어야 합니다")
+    retract_at = insert_time + dwell
+    if period is None:
+        period = retract_at * 2
+    if cycles > 1 and period <= retract_at:
+        raise ValueError("period는 삽입 시간 + dwell보다 길어야 합니다")
+
+    points = []
+    for i in range(cycles):
+        t0 = i * period
+        points.append((t0, "speed_force", int(insert_position), int(insert_speed), force))
+        points.append((t0 + retract_at, "speed", int(retract_position), int(retract_speed), 0))
+    return points
+
+
+class TrajectoryRunner:
+    """
+    미리 만든 (시간 오프셋, 프레임) 목록을 단조 시계 데드라인에 맞춰 submit 함수로 전달하는 스레드.
+    submit은 프레임을 즉시 송신 경로에 올리는 함수여야 합니다 (예: MotorControllerBase._submit_command).
+    """
+
+    def __init__(self, frames, submit):
+        self.frames = frames
+        self.submit = submit
+        self.cancel_event = Event()
+        self.thread = None
+        self.started_at = None
+        self.sent = 0
+        self.max_lateness = 0.0
+        self.finished = False
+
+    def start(self):
+        self.started_at = time.monotonic()
+        self.thread = Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.cancel_event.set()
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def _run(self):
+        start = self.started_at
+        try:
+            for offset, frame in self.frames:
+                deadline = start + offset
+                remaining = deadline - time.monotonic()
+                # 데드라인까지 대기 (취소 시 즉시 종료)
+                if remaining > 0 and self.cancel_event.wait(remaining):
+                    return
+                if self.cancel_event.is_set():
+                    return
+                self.submit(frame)
+                lateness = time.monotonic() - deadline
+                if lateness > self.max_lateness:
+                    self.max_lateness = lateness
+                self.sent += 1
+        except Exception as e:
+            print(f"[Trajectory Error] {str(e)}")
+        finally:
+            self.finished = True
+
+    def get_status(self):
+        duration = self.frames[-1][0] if self.frames else 0.0
+        return {
+            "running": self.is_running(),
+            "cancelled": self.cancel_event.is_set(),
+            "points": len(self.frames),
+            "sent": self.sent,
+            "duration_s": round(duration, 3),
+            "elapsed_s": round(time.monotonic() - self.started_at, 3) if self.started_at else 0.0,
+            "max_lateness_ms": round(self.max_lateness * 1000, 3),
+        }
@@ -0,0 +1,138 @@
+# rf_pulse.py
+
+"""
+RF DTR(GPIO0) 펄스 전용 스레드.
+
+- fire(width_ms)는 펄스를 큐에 넣고 바로 반환 (이벤트 루프/핸들러를 펄스 시간 동안 막지 않음)
+- 펄스 폭은 절대 시각 기준: pin.on() 직후 시각 + 폭까지 time.sleep 후 마지막 구간만 스핀
+  (rf_utils.precise_sleep_until) - 이벤트 루프 지터와 무관하고 CPU를 계속 점유하지 않음
+- 펄스마다 실제 폭(on 호출 반환 ~ off 호출 직전), 오차, 요청~출력 지연, GPIO 호출 시간을 기록
+- 펄스는 겹치지 않게 순서대로 출력
+
+RF 에너지는 펄스 폭에 비례하므로 get_stats()/recent 기록으로 폭 정확도를 확인할 수 있습니다.
+"""
+
+import os
+import time
+from collections import deque
+from concurrent.futures import Future
+from queue import Queue
+from threading import Thread, Lock
+
+from rf_utils import precise_sleep_until
+
+RECENT_PULSES = 100
+# 실시간 우선순위 (권한이 없으면 일반 스케줄링으로 동작)
+PULSE_THREAD_PRIORITY = 50
+
+
+class DtrPulseScheduler:
+    def __init__(self, pin):
+        self.pin = pin
+        self.queue = Queue()
+        self.thread = None
+        self.lock = Lock()
+        self.realtime = False
+        self.recent = deque(maxlen=RECENT_PULSES)
+        self.count = 0
+        self.errors = 0
+        self.error_total = 0.0
+        self.error_max = 0.0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self.thread = Thread(target=self._run, name="rf-dtr-pulse", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join(1.0)
+        self.thread = None
+
+    def fire(self, width_ms):
+        """
+        width_ms 길이의 DTR HIGH 펄스를 예약하고 바로 반환합니다 (어느 스레드에서나 호출 가능).
+        반환된 concurrent.futures.Future는 펄스가 끝나면 측정 결과 dict로 완료됩니다.
+        """
+        future = Future()
+        self.queue.put((width_ms / 1000.0, time.perf_counter(), future))
+        return future
+
+    def _run(self):
+        self._set_realtime()
+        while True:
+            job = self.queue.get()
+            if job is None:
+                break
+            width, requested_at, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._pulse(width, requested_at))
+            except Exception as e:
+                with self.lock:
+                    self.errors += 1
+                print(f"[GPIO0] DTR 펄스 오류: {e}")
+                future.set_exception(e)
+
+    def _set_realtime(self):
+        if not hasattr(os, "sched_setscheduler"):
+            return
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(PULSE_THREAD_PRIORITY))
+            self.realtime = True
+        except OSError:
+            pass
+
+    def _pulse(self, width, requested_at):
+        pin = self.pin
+        before_on = time.perf_counter()
+        pin.on()
+        try:
+            started = time.perf_counter()
+            precise_sleep_until(started + width)
+        finally:
+            before_off = time.perf_counter()
+            pin.off()
+            after_off = time.perf_counter()
+
+        actual = before_off - started
+        error = actual - width
+        latency = before_on - requested_at
+        result = {
+            "requested_ms": round(width * 1000, 3),
+            "actual_ms": round(actual * 1000, 3),
+            "error_us": round(error * 1e6, 1),
+            "start_latency_ms": round(latency * 1000, 3),
+            # 실제 핀 전환 시각의 불확실성 (GPIO 호출 자체에 걸린 시간)
+            "on_call_us": round((started - before_on) * 1e6, 1),
+            "off_call_us": round((after_off - before_off) * 1e6, 1),
+            "timestamp": time.time(),
+        }
+        with self.lock:
+            self.count += 1
+            self.error_total += abs(error)
+            self.error_max = max(self.error_max, abs(error))
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+            self.recent.append(result)
+        return result
+
+    def get_stats(self):
+        with self.lock:
+            count = self.count
+            return {
+                "pulses": count,
+                "errors": self.errors,
+                "realtime": self.realtime,
+                "abs_error_avg_us": round(self.error_total / count * 1e6, 1) if count else 0.0,
+                "abs_error_max_us": round(self.error_max * 1e6, 1),
+                "start_latency_avg_ms": round(self.latency_total / count * 1000, 3) if count else 0.0,
+                "start_latency_max_ms": round(self.latency_max * 1000, 3),
+                "last": self.recent[-1] if self.recent else None,
+                "recent": list(self.recent),
+            }
@@ -0,0 +1,116 @@
+# rf_status_poller.py
+
+"""
+RF 제너레이터 상태 백그라운드 폴링.
+
+- 샷 사이에 낮은 주기(RF_STATUS_INTERVAL)로 상태 조회(0x41)를 보내고 응답 DATA를 캐시
+- 연결 후 한 번 펌웨어 조회(0x42)
+- 샷이 예약되면(hold) 그 구간과 응답 대기 중인 요청이 있는 동안은 조회하지 않음
+- 연속으로 응답이 없으면 responding=False - 포트만 열려 있고 제너레이터가 응답하지 않는 상태를 구분
+
+제너레이터 상태 응답 DATA의 형식은 확인되지 않았으므로 해석하지 않고 원시 바이트(16진 문자열)로만 전달합니다.
+"""
+
+import asyncio
+import time
+
+from rf_utils import build_rf_command
+
+RF_STATUS_INTERVAL = 1.0
+RF_STATUS_TIMEOUT = 0.1
+RF_STATUS_MISS_LIMIT = 3      # 이만큼 연속 무응답이면 responding=False
+RF_SHOT_HOLD = 0.05           # 샷 명령/펄스 이후 추가로 조회를 쉬는 시간
+
+
+def rf_reply_payload(reply):
+    """응답 프레임의 DATA 구간 (16진 문자열)"""
+    return reply[4:-2].hex().upper()
+
+
+class RfStatusPoller:
+    def __init__(self, rf, interval=RF_STATUS_INTERVAL, timeout=RF_STATUS_TIMEOUT):
+        self.rf = rf
+        self.interval = interval
+        self.timeout = timeout
+        self.status = None          # 마지막 상태 응답 DATA (16진 문자열)
+        self.firmware = None
+        self.updated_at = None      # time.time()
+        self.misses = 0
+        self.hold_until = 0.0       # time.monotonic() - 이 시각 전에는 조회하지 않음
+        self.polls = 0
+        self.deferred = 0
+        self.task = None
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    def hold(self, seconds):
+        """샷 구간 동안 조회를 미룹니다 (이벤트 루프에서 호출)."""
+        self.hold_until = max(self.hold_until, time.monotonic() + seconds + RF_SHOT_HOLD)
+
+    def reset(self):
+        """RF 포트가 다시 연결되면 펌웨어를 다시 조회"""
+        self.status = None
+        self.firmware = None
+        self.misses = 0
+
+    def summary(self):
+        """status 메시지에 넣을 상태 (조회 전이면 None)"""
+        if self.status is None and not self.misses:
+            return None
+        return {"responding": self.misses < RF_STATUS_MISS_LIMIT, "raw": self.status}
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            if not self.rf.is_attached():
+                self.reset()
+                continue
+            # 샷 구간/응답 대기 중인 요청이 끝날 때까지 미룸
+            while time.monotonic() < self.hold_until or self.rf.in_flight():
+                self.deferred += 1
+                await asyncio.sleep(max(self.hold_until - time.monotonic(), 0.01))
+            if self.firmware is None:
+                await self._query_firmware()
+            await self._poll()
+
+    async def _query_firmware(self):
+        try:
+            reply = await self.rf.request(build_rf_command("firmware"), self.timeout)
+            self.firmware = rf_reply_payload(reply)
+            print(f"[RF] 제너레이터 펌웨어: {self.firmware}")
+        except (TimeoutError, ConnectionError):
+            pass
+
+    async def _poll(self):
+        self.polls += 1
+        try:
+            reply = await self.rf.request(build_rf_command("status"), self.timeout)
+        except (TimeoutError, ConnectionError) as e:
+            self.misses += 1
+            if self.misses == RF_STATUS_MISS_LIMIT:
+                print(f"[RF] 제너레이터 상태 응답 없음 ({self.misses}회 연속): {e}")
+            return
+        status = rf_reply_payload(reply)
+        if status != self.status:
+            print(f"[RF] 제너레이터 상태 응답: {status}")
+        self.status = status
+        self.updated_at = time.time()
+        self.misses = 0
+
+    def get_stats(self):
+        return {
+            "status": self.status,
+            "firmware": self.firmware,
+            "updated_at": self.updated_at,
+            "responding": self.misses < RF_STATUS_MISS_LIMIT,
+            "misses": self.misses,
+            "polls": self.polls,
+            "deferred_for_shot": self.deferred,
+        }
@@ -0,0 +1,189 @@
+# rf_transport.py
+
+"""
+asyncio 이벤트 루프 기반 RF 제너레이터 송수신.
+
+- 수신: RF 시리얼 fd를 loop.add_reader로 등록, 도착한 바이트를 RfFrameParser로 바로 프레임 분리
+  (STX | LEN | ID | CMD | DATA... | XOR | ETX)
+- 송신: 논블로킹 os.write, 커널 버퍼가 가득 차면 나머지를 add_writer로 이어서 전송
+- 요청/응답 대응: 제너레이터는 같은 명령 바이트로 응답하므로 명령 바이트별 FIFO로 대기 중인 요청에 연결
+- 요청마다 제한 시간(call_later), 응답 대기 시간 통계
+
+    reply = await rf.request(build_rf_shot_command(True, False, 50, 60))
+
+모든 메서드는 이벤트 루프 스레드에서 호출합니다.
+"""
+
+import os
+import time
+from collections import deque
+
+from rf_utils import RfFrameParser, RF_REPLY_TIMEOUT
+
+
+class RfTransport:
+    def __init__(self):
+        self.loop = None
+        self.serial = None
+        self.fd = None
+        self.parser = RfFrameParser()
+        self.tx_buffer = bytearray()
+        self.pending = {}           # 명령 바이트 -> deque[(future, sent_at)]
+        self.on_frame = None        # 요청과 연결되지 않은 프레임 콜백 (frame)
+        self.on_link_lost = None    # 포트가 사라졌을 때 콜백 (error)
+        self.stats = {
+            "requests": 0,
+            "replies": 0,
+            "timeouts": 0,
+            "unsolicited": 0,
+            "reply_total": 0.0,
+            "reply_max": 0.0,
+            "reply_last": 0.0,
+        }
+
+    def attach(self, ser, loop):
+        """열린 RF 시리얼 포트를 이벤트 루프에 등록합니다."""
+        self.detach()
+        self.loop = loop
+        self.serial = ser
+        self.fd = ser.fileno()
+        self.parser = RfFrameParser()
+        self.tx_buffer.clear()
+        loop.add_reader(self.fd, self._on_readable)
+
+    def detach(self, error=None):
+        """fd 등록을 해제하고 대기 중인 요청을 모두 실패 처리합니다 (포트는 닫지 않음)."""
+        if self.fd is not None:
+            self.loop.remove_reader(self.fd)
+            self.loop.remove_writer(self.fd)
+            self.fd = None
+        self.serial = None
+        self.tx_buffer.clear()
+        for waiters in self.pending.values():
+            for future, _ in waiters:
+                if not future.done():
+                    future.set_exception(ConnectionError(error or "RF 포트가 닫혔습니다"))
+        self.pending.clear()
+
+    def is_attached(self):
+        return self.fd is not None
+
+    def in_flight(self):
+        """응답을 기다리는 요청 수"""
+        return sum(len(waiters) for waiters in self.pending.values())
+
+    def _link_lost(self, error):
+        print(f"[RF] 포트 연결 끊김: {error}")
+        self.detach(f"RF 포트 연결 끊김: {error}")
+        if self.on_link_lost:
+            self.on_link_lost(error)
+
+    # --- 송신 ---
+    def send(self, frame):
+        """응답을 기다리지 않고 프레임을 보냅니다."""
+        if self.fd is None:
+            raise ConnectionError("RF 포트가 연결되지 않았습니다")
+        if self.tx_buffer:
+            self.tx_buffer += frame
+            return
+        try:
+            written = os.write(self.fd, frame)
+        except BlockingIOError:
+            written = 0
+        except OSError as e:
+            self._link_lost(e)
+            raise ConnectionError(f"RF 쓰기 실패: {e}") from e
+        if written < len(frame):
+            self.tx_buffer += frame[written:]
+            self.loop.add_writer(self.fd, self._on_writable)
+
+    def _on_writable(self):
+        try:
+            written = os.write(self.fd, self.tx_buffer)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self._link_lost(e)
+            return
+        del self.tx_buffer[:written]
+        if not self.tx_buffer:
+            self.loop.remove_writer(self.fd)
+
+    def submit(self, frame, timeout=RF_REPLY_TIMEOUT):
+        """프레임을 바로 보내고 같은 명령 바이트의 응답 프레임으로 완료되는 future를 반환합니다."""
+        command = frame[3]
+        future = self.loop.create_future()
+        entry = (future, time.perf_counter())
+        waiters = self.pending.setdefault(command, deque())
+        waiters.append(entry)
+        self.stats["requests"] += 1
+        try:
+            self.send(frame)
+        except ConnectionError:
+            waiters.remove(entry)
+            raise
+        handle = self.loop.call_later(timeout, self._expire, command, entry, timeout)
+        future.add_done_callback(lambda _: handle.cancel())
+        return future
+
+    async def request(self, frame, timeout=RF_REPLY_TIMEOUT):
+        """프레임을 보내고 응답 프레임을 기다립니다. 제한 시간 초과 시 TimeoutError."""
+        return await self.submit(frame, timeout)
+
+    def _expire(self, command, entry, timeout):
+        waiters = self.pending.get(command)
+        if waiters and entry in waiters:
+            waiters.remove(entry)
+        future = entry[0]
+        if not future.done():
+            self.stats["timeouts"] += 1
+            future.set_exception(TimeoutError(f"RF 응답 없음 (명령 0x{command:02X}, {timeout * 1000:.0f} ms)"))
+
+    # --- 수신 ---
+    def _on_readable(self):
+        try:
+            data = os.read(self.fd, 4096)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self._link_lost(e)
+            return
+        if not data:
+            self._link_lost("EOF")
+            return
+
+        now = time.perf_counter()
+        for frame in self.parser.feed(data):
+            waiters = self.pending.get(frame[3])
+            while waiters:
+                future, sent_at = waiters.popleft()
+                if future.done():
+                    continue
+                elapsed = now - sent_at
+                stats = self.stats
+                stats["replies"] += 1
+                stats["reply_total"] += elapsed
+                stats["reply_last"] = elapsed
+                stats["reply_max"] = max(stats["reply_max"], elapsed)
+                future.set_result(frame)
+                break
+            else:
+                self.stats["unsolicited"] += 1
+                if self.on_frame:
+                    self.on_frame(frame)
+
+    def get_stats(self):
+        stats = self.stats
+        return {
+            "attached": self.fd is not None,
+            "requests": stats["requests"],
+            "replies": stats["replies"],
+            "timeouts": stats["timeouts"],
+            "unsolicited": stats["unsolicited"],
+            "in_flight": self.in_flight(),
+            "reply_avg_ms": round(stats["reply_total"] / stats["replies"] * 1000, 3) if stats["replies"] else 0.0,
+            "reply_max_ms": round(stats["reply_max"] * 1000, 3),
+            "reply_last_ms": round(stats["reply_last"] * 1000, 3),
+            "discarded_bytes": self.parser.discarded_bytes,
+            "checksum_errors": self.parser.checksum_errors,
+        }
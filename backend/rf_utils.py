@@ -67,6 +67,96 @@ def build_rf_shot_command(rf_1MHz_checked, rf_2MHz_checked, level_val, ontime_va
     return frame
 
 
+# -------------------------
+# RF 응답 프레임 분리 (STX | LEN | ID | CMD | DATA... | XOR | ETX)
+# -------------------------
+RF_STX = 0x02
+RF_ETX = 0x03
+RF_MIN_FRAME = 7     # STX, LEN, ID, CMD, DATA(1), XOR, ETX
+RF_MAX_FRAME = 64
+
+
+def rf_frame_checksum(frame) -> int:
+    """STX부터 DATA 끝까지 XOR"""
+    checksum = 0
+    for b in frame[:-2]:
+        checksum ^= b
+    return checksum
+
+
+class RfFrameParser:
+    """LEN 바이트(전체 프레임 길이)로 프레임을 잘라내는 증분 파서. XOR/ETX가 맞지 않으면 재동기화합니다."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.discarded_bytes = 0
+        self.checksum_errors = 0
+
+    def feed(self, data):
+        frames = []
+        buffer = self.buffer
+        buffer += data
+        start = 0
+        while len(buffer) - start >= 2:
+            if buffer[start] != RF_STX:
+                stx_index = buffer.find(RF_STX, start)
+                if stx_index < 0:
+                    self.discarded_bytes += len(buffer) - start
+                    start = len(buffer)
+                    break
+                self.discarded_bytes += stx_index - start
+                start = stx_index
+                continue
+
+            length = buffer[start + 1]
+            if length < RF_MIN_FRAME or length > RF_MAX_FRAME:
+                self.discarded_bytes += 1
+                start += 1
+                continue
+            if len(buffer) - start < length:
+                break  # 프레임 미완성
+
+            frame = bytes(buffer[start:start + length])
+            if frame[-1] != RF_ETX or rf_frame_checksum(frame) != frame[-2]:
+                # 잘못된 프레임 - STX 한 바이트만 버리고 다시 찾음
+                self.checksum_errors += 1
+                self.discarded_bytes += 1
+                start += 1
+                continue
+            frames.append(frame)
+            start += length
+
+        if start:
+            del buffer[:start]
+        return frames
+
+
+RF_REPLY_TIMEOUT = 0.2   # 19200 bps 왕복(~15 ms) + 제너레이터 처리 시간 여유
+
+
+def read_rf_reply(serial_connection_rf, timeout=RF_REPLY_TIMEOUT):
+    """
+    응답 프레임 하나가 완성될 때까지만 읽습니다 (고정 대기 없음). 제한 시간 안에 없으면 b"".
+    읽는 동안 포트 timeout을 남은 시간으로 바꿨다가 되돌립니다.
+    """
+    parser = RfFrameParser()
+    deadline = perf_counter() + timeout
+    saved_timeout = serial_connection_rf.timeout
+    try:
+        while True:
+            remaining = deadline - perf_counter()
+            if remaining <= 0:
+                return b""
+            serial_connection_rf.timeout = remaining
+            data = serial_connection_rf.read(max(1, serial_connection_rf.in_waiting))
+            if data:
+                frames = parser.feed(data)
+                if frames:
+                    return frames[0]
+    finally:
+        serial_connection_rf.timeout = saved_timeout
+
+
 # -------------------------
 # RF 포트 열기 / 닫기
 # -------------------------
@@ -115,8 +205,7 @@ def send_rf_command_util(
         cmd = build_rf_command(command_type)
         txtEdit_rf_sendmsg.append(f"Sent: {cmd.hex().upper()}")
         serial_connection_rf.write(cmd)
-        time.sleep(0.05)
-        incoming = serial_connection_rf.read_all()
+        incoming = read_rf_reply(serial_connection_rf)
         if incoming:
             txtEdit_rf_resmsg.append(f"Received: {incoming.hex().upper()}")
         else:
@@ -140,8 +229,7 @@ def send_rf_output_command_util(
         frame = build_rf_output_command(command_val, data)
         txtEdit_rf_sendmsg.append(f"Sent: {frame.hex().upper()}")
         serial_connection_rf.write(frame)
-        time.sleep(0.05)
-        incoming = serial_connection_rf.read_all()
+        incoming = read_rf_reply(serial_connection_rf)
         if incoming:
             txtEdit_rf_resmsg.append(f"Received: {incoming.hex().upper()}")
         else:
@@ -169,8 +257,7 @@ def send_rf_shot_command_util(
         txtEdit_rf_sendmsg.append(f"Sent: {frame.hex().upper()} | {status_info}")
 
         serial_connection_rf.write(frame)
-        time.sleep(0.05)
-        incoming = serial_connection_rf.read_all()
+        incoming = read_rf_reply(serial_connection_rf)
         if incoming:
             txtEdit_rf_resmsg.append(f"Received: {incoming.hex().upper()}")
         else:
@@ -179,6 +266,19 @@ def send_rf_shot_command_util(
         txtEdit_rf_resmsg.append(f"Failed to send RF shot output command: {e}")
 
 
+# 절대 시각까지 sleep 후 마지막 구간만 perf_counter 스핀 (OS sleep 오버슈트 보정)
+PRECISE_SPIN = 0.001
+
+
+def precise_sleep_until(deadline, spin=PRECISE_SPIN):
+    """perf_counter 기준 절대 시각 deadline까지 대기합니다. 스핀은 마지막 spin초만."""
+    remaining = deadline - perf_counter() - spin
+    if remaining > 0:
+        time.sleep(remaining)
+    while perf_counter() < deadline:
+        pass
+
+
 def set_dtr_high_util(
     serial_connection_rf,
     txtEdit_rf_onTime,
@@ -205,9 +305,7 @@ def set_dtr_high_util(
         pin.on()  # GPIO HIGH
         txtEdit_rf_resmsg.append("PIN set to HIGH")
 
-        # Busy-wait loop
-        while perf_counter() - start_time < dtr_ontime_s:
-            pass
+        precise_sleep_until(start_time + dtr_ontime_s)
 
         pin.off()  # GPIO LOW
         txtEdit_rf_resmsg.append("PIN set to LOW")
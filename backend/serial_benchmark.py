@@ -0,0 +1,229 @@
+# serial_benchmark.py
+
+"""
+시리얼 핫패스 성능 측정 (device_simulator의 PTY 장치 사용, 실제 하드웨어 불필요).
+
+측정 항목
+- parser: 텔레메트리 프레임 파싱/디코딩 처리량 (frames/s)
+- latency: 이동 명령 제출 -> 해당 setPos가 담긴 텔레메트리 수신까지 지연
+- jitter: keep-alive 송신 간격의 편차 (시뮬레이터 수신 시각 기준)
+- rf: RF 샷 프레임 전송 -> 응답 프레임 수신까지 지연
+
+CI에서는 --max-latency-ms / --max-jitter-ms / --min-parser-fps 로 기준을 넘으면 종료 코드 1을 반환합니다.
+
+사용 예:
+    python serial_benchmark.py --json
+    python serial_benchmark.py --max-latency-ms 30 --max-jitter-ms 10
+    python serial_benchmark.py --transport asyncio
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import struct
+import sys
+import threading
+import time
+
+import serial
+
+from device_simulator import MotorSimulator, RfSimulator
+from motor_frame_parser import MotorFrameParser
+from motor_threaded_controller import MotorThreadedController
+from motor_async_controller import MotorAsyncController
+from rf_utils import RfFrameParser, build_rf_shot_command
+
+
+def _percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summary_ms(values):
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean_ms": round(statistics.mean(values) * 1000, 3),
+        "p50_ms": round(_percentile(values, 50) * 1000, 3),
+        "p95_ms": round(_percentile(values, 95) * 1000, 3),
+        "max_ms": round(max(values) * 1000, 3),
+    }
+
+
+def _telemetry_frame(seq):
+    body = bytes([0x0D, 0x01, 0x32, 0x25, 0x00]) + struct.pack('<hhhhh', seq, seq, 0, seq & 0x3FF, 0)
+    return b'\xAA\x55' + body + bytes([sum(body) & 0xFF])
+
+
+def bench_parser(frame_count=50000, chunk_size=64, noise=True):
+    """연속된 프레임(옵션: 잡음 포함)을 chunk 단위로 넣어 디코딩 처리량을 측정합니다."""
+    frames = [_telemetry_frame(i & 0x7FFF) for i in range(frame_count)]
+    if noise:
+        junk = os.urandom(7)
+        stream = b''.join(f + junk if i % 10 == 0 else f for i, f in enumerate(frames))
+    else:
+        stream = b''.join(frames)
+
+    parser = MotorFrameParser()
+    decoded = 0
+    start = time.perf_counter()
+    for i in range(0, len(stream), chunk_size):
+        decoded += len(parser.feed_decoded(stream[i:i + chunk_size]))
+    elapsed = time.perf_counter() - start
+    return {
+        "frames": frame_count,
+        "decoded": decoded,
+        "bytes": len(stream),
+        "elapsed_s": round(elapsed, 4),
+        "frames_per_s": round(decoded / elapsed) if elapsed else 0,
+        "checksum_errors": parser.checksum_errors,
+        "discarded_bytes": parser.discarded_bytes,
+    }
+
+
+def _wait_for(predicate, timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.0002)
+    return False
+
+
+def bench_motor(samples=100, keepalive_interval=0.05, jitter_seconds=2.0, baudrate=19200, transport="thread"):
+    sim = MotorSimulator(baudrate=baudrate).start()
+    loop = None
+    if transport == "asyncio":
+        # 벤치마크 본문은 동기 코드이므로 이벤트 루프는 별도 스레드에서 실행
+        loop = asyncio.new_event_loop()
+        threading.Thread(target=loop.run_forever, daemon=True).start()
+        motor = MotorAsyncController(keepalive_interval=None, loop=loop)
+    else:
+        motor = MotorThreadedController(keepalive_interval=None)
+    try:
+        result = motor.connect(sim.port, baudrate, "none", 8, 1)
+        if not motor.is_connected():
+            raise RuntimeError(result)
+
+        # 명령 -> 텔레메트리 지연 (keep-alive 비활성화 상태에서 명령 1개당 응답 1개)
+        latencies = []
+        timeouts = 0
+        for i in range(samples):
+            target = 100 + (i % 50) * 10
+            start = time.perf_counter()
+            motor.move_to_position(target, "position")
+            if _wait_for(lambda: motor.setPos == target, 0.5):
+                latencies.append(time.perf_counter() - start)
+            else:
+                timeouts += 1
+
+        # keep-alive 송신 간격 지터
+        motor.set_keepalive_interval(keepalive_interval)
+        time.sleep(0.2)
+        mark = len(sim.rx_timestamps)
+        time.sleep(jitter_seconds)
+        stamps = sim.rx_timestamps[mark:]
+        intervals = [b - a for a, b in zip(stamps, stamps[1:])]
+        deviations = [abs(x - keepalive_interval) for x in intervals]
+
+        return {
+            "latency": {**_summary_ms(latencies), "timeouts": timeouts},
+            "jitter": {
+                "interval_ms": keepalive_interval * 1000,
+                "frames": len(stamps),
+                "mean_interval_ms": round(statistics.mean(intervals) * 1000, 3) if intervals else 0.0,
+                "stdev_ms": round(statistics.pstdev(intervals) * 1000, 3) if intervals else 0.0,
+                "max_deviation_ms": round(max(deviations) * 1000, 3) if deviations else 0.0,
+            },
+            "transport": transport,
+            "tx": motor.get_tx_stats(),
+            "parser": motor.get_parser_stats(),
+        }
+    finally:
+        motor.disconnect()
+        sim.stop()
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+
+
+def bench_rf(samples=50, baudrate=19200):
+    sim = RfSimulator(baudrate=baudrate).start()
+    port = serial.Serial(sim.port, baudrate=baudrate, timeout=0.5)
+    parser = RfFrameParser()
+    latencies = []
+    timeouts = 0
+    try:
+        frame = build_rf_shot_command(True, False, 50, 60)
+        for _ in range(samples):
+            start = time.perf_counter()
+            port.write(frame)
+            reply = None
+            deadline = start + 0.5
+            while reply is None and time.perf_counter() < deadline:
+                data = port.read(port.in_waiting or 1)
+                for received in parser.feed(data):
+                    if received[3] == frame[3]:
+                        reply = received
+            if reply is None:
+                timeouts += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+        return {"latency": {**_summary_ms(latencies), "timeouts": timeouts}, "shots": len(sim.shots)}
+    finally:
+        port.close()
+        sim.stop()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="SENSOVIA 시리얼 핫패스 벤치마크 (PTY 시뮬레이터)")
+    ap.add_argument("--samples", type=int, default=100)
+    ap.add_argument("--baudrate", type=int, default=19200)
+    ap.add_argument("--keepalive-ms", type=float, default=50.0)
+    ap.add_argument("--jitter-seconds", type=float, default=2.0)
+    ap.add_argument("--parser-frames", type=int, default=50000)
+    ap.add_argument("--transport", choices=("thread", "asyncio"), default="thread", help="모터 송수신 방식")
+    ap.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    ap.add_argument("--max-latency-ms", type=float, help="명령->텔레메트리 p95 지연 상한")
+    ap.add_argument("--max-jitter-ms", type=float, help="keep-alive 간격 최대 편차 상한")
+    ap.add_argument("--min-parser-fps", type=float, help="파서 처리량 하한 (frames/s)")
+    args = ap.parse_args(argv)
+
+    results = {
+        "parser": bench_parser(args.parser_frames),
+        "motor": bench_motor(args.samples, args.keepalive_ms / 1000.0, args.jitter_seconds, args.baudrate,
+                             args.transport),
+        "rf": bench_rf(max(1, args.samples // 2), args.baudrate),
+    }
+
+    failures = []
+    latency_p95 = results["motor"]["latency"].get("p95_ms")
+    if args.max_latency_ms is not None and (latency_p95 is None or latency_p95 > args.max_latency_ms):
+        failures.append(f"command->telemetry p95 {latency_p95}ms > {args.max_latency_ms}ms")
+    max_deviation = results["motor"]["jitter"]["max_deviation_ms"]
+    if args.max_jitter_ms is not None and max_deviation > args.max_jitter_ms:
+        failures.append(f"keep-alive jitter {max_deviation}ms > {args.max_jitter_ms}ms")
+    parser_fps = results["parser"]["frames_per_s"]
+    if args.min_parser_fps is not None and parser_fps < args.min_parser_fps:
+        failures.append(f"parser {parser_fps} frames/s < {args.min_parser_fps}")
+    results["failures"] = failures
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"[BENCH] parser: {parser_fps} frames/s ({results['parser']['decoded']}/{results['parser']['frames']} decoded)")
+        print(f"[BENCH] command->telemetry ({args.transport}): {results['motor']['latency']}")
+        print(f"[BENCH] keep-alive jitter: {results['motor']['jitter']}")
+        print(f"[BENCH] rf shot->reply: {results['rf']['latency']}")
+        for failure in failures:
+            print(f"[BENCH] FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
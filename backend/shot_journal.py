@@ -0,0 +1,309 @@
+# shot_journal.py
+
+"""
+크래시에 안전한 shot 카운터 (write-behind).
+
+샷마다 EEPROM을 쓰는 대신
+1. 로컬 append-only 저널(JSON lines)에 먼저 기록하고 fsync가 끝나면 샷을 확정
+   (동시에 들어온 기록은 fsync 한 번으로 묶음)
+2. 팁 EEPROM에는 모아서 씀 - 타이머(FLUSH_INTERVAL), N샷마다(FLUSH_EVERY), GPIO17 팁 분리 시
+3. 시작 시 저널을 재생해 EEPROM에 아직 반영되지 않은 샷을 복구하고, 해당 팁이 연결되면 기록
+
+팁 EEPROM에는 시리얼 번호가 없어 같은 배치(종류/제조일자/제조사)의 팁은 레코드만으로 구분되지 않습니다.
+그래서 미반영 샷은 (배치 키, 기록 당시 팁 EEPROM의 Shot Count) 단위로 보관하고,
+연결된 팁의 EEPROM 값이 그 기준값과 같을 때만 적용합니다. 다른 팁의 미반영 샷은 그대로 남겨 둠
+(EEPROM 값까지 같은 두 팁, 예를 들어 한 번도 쓰지 않은 같은 배치의 새 팁은 여전히 구분할 수 없음).
+
+저널 레코드 (tip: 배치 키, eeprom: 기준 EEPROM 카운트, count: 누적 shot 수)
+  {"op": "shot", "tip": ..., "eeprom": E, "count": N, "t": ...}      샷 확정 (논리 카운트)
+  {"op": "flushed", "tip": ..., "eeprom": E, "count": N, "t": ...}   EEPROM에 N까지 기록됨 (기준값이 N으로 바뀜)
+  {"op": "set", "tip": ..., "eeprom": E, "count": N, "t": ...}       eeprom_write로 카운트를 직접 설정 (미반영 샷 폐기)
+"""
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import Future
+from queue import Queue, Empty
+from threading import Thread
+
+from eeprom_layout import SHOT_COUNT_MAX
+
+FLUSH_EVERY = 10         # 이만큼 쌓이면 바로 EEPROM에 기록
+FLUSH_INTERVAL = 2.0     # 첫 미기록 샷 이후 이 시간 안에 EEPROM에 기록
+COMPACT_SIZE = 256 * 1024  # 저널이 이 크기를 넘으면 팁별 최종 상태만 남기고 다시 씀
+
+
+def tip_key(record):
+    """EEPROM 레코드의 배치 키 (팁에 시리얼 번호가 없으므로 고정 필드 조합 - 같은 배치의 팁끼리는 같음)"""
+    return f"{record['tip_type']}:{record['manufacture_date']}:{record['manufacturer']}"
+
+
+def _apply(runs, op, key, base, count):
+    """레코드 하나를 상태(배치 키 -> {기준 EEPROM 카운트: 논리 카운트})에 반영합니다."""
+    tip_runs = runs.setdefault(key, {})
+    if op == "shot":
+        tip_runs[base] = count
+    elif op == "flushed":
+        # EEPROM이 count가 되었으므로 그 뒤의 샷은 새 기준값으로 이어짐
+        logical = tip_runs.pop(base, None)
+        if logical is not None and logical > count:
+            tip_runs[count] = max(logical, tip_runs.get(count, 0))
+    elif op == "set":
+        tip_runs.pop(base, None)
+    if not tip_runs:
+        del runs[key]
+
+
+class ShotJournal:
+    def __init__(self, path):
+        self.path = path
+        self.state = {}   # 배치 키 -> {기준 EEPROM 카운트: 논리 카운트} (미반영 샷이 있는 팁만)
+        self.queue = Queue()
+        self.thread = None
+        self.file = None
+        self.fsync_count = 0
+        self.records_written = 0
+
+    def open(self):
+        """저널을 재생하고 (필요하면 압축한 뒤) 기록 스레드를 시작합니다."""
+        self.state = self._replay()
+        if os.path.exists(self.path) and os.path.getsize(self.path) > COMPACT_SIZE:
+            self._compact()
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.thread = Thread(target=self._run, name="shot-journal", daemon=True)
+        self.thread.start()
+        pending = self.pending_runs()
+        if pending:
+            print(f"[JOURNAL] EEPROM 미반영 샷 복구: {pending}")
+        return pending
+
+    def close(self):
+        if self.thread and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join(2.0)
+        self.thread = None
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def pending(self, key, base):
+        """EEPROM 값이 base인 팁의 논리 카운트 (미반영 샷이 없으면 None)"""
+        count = self.state.get(key, {}).get(base)
+        if count is not None and count > base:
+            return count
+        return None
+
+    def pending_runs(self):
+        """{"배치 키@기준 EEPROM 카운트": 미반영 샷 수}"""
+        return {
+            f"{key}@{base}": count - base
+            for key, tip_runs in self.state.items() for base, count in tip_runs.items() if count > base
+        }
+
+    def append(self, op, key, base, count):
+        """레코드를 기록하고 fsync가 끝나면 완료되는 concurrent.futures.Future를 반환합니다."""
+        _apply(self.state, op, key, base, count)
+        future = Future()
+        line = json.dumps({"op": op, "tip": key, "eeprom": base, "count": count, "t": time.time()})
+        self.queue.put((line, future))
+        return future
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            batch = [item]
+            # 이미 쌓여 있는 기록은 한 번의 fsync로 묶음
+            while True:
+                try:
+                    item = self.queue.get_nowait()
+                except Empty:
+                    break
+                if item is None:
+                    self.queue.put(None)
+                    break
+                batch.append(item)
+            # 기다리던 쪽이 취소했어도 레코드는 기록함 (상태는 이미 반영됨)
+            batch = [(line, future if future.set_running_or_notify_cancel() else None) for line, future in batch]
+            try:
+                self.file.write("".join(line + "\n" for line, _ in batch))
+                self.file.flush()
+                os.fsync(self.file.fileno())
+                self.fsync_count += 1
+                self.records_written += len(batch)
+                for _, future in batch:
+                    if future is not None:
+                        future.set_result(True)
+            except Exception as e:
+                print(f"[JOURNAL] 기록 실패: {e}")
+                for _, future in batch:
+                    if future is not None:
+                        future.set_exception(e)
+
+    def _replay(self):
+        state = {}
+        if not os.path.exists(self.path):
+            return state
+        valid_size = 0
+        legacy_flushed = {}   # eeprom 필드가 없던 이전 형식 레코드용 - 팁 키별 마지막 기록 카운트
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # 크래시로 잘린 마지막 줄
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                valid_size += len(line)
+                base = entry.get("eeprom")
+                if base is None:
+                    # 이전 형식: 마지막으로 EEPROM에 기록(또는 설정)한 카운트를 기준값으로 봄
+                    base = legacy_flushed.get(entry["tip"], 0)
+                    if entry["op"] != "shot":
+                        legacy_flushed[entry["tip"]] = entry["count"]
+                _apply(state, entry["op"], entry["tip"], base, entry["count"])
+        if valid_size != os.path.getsize(self.path):
+            # 잘린 줄 뒤에 이어 쓰지 않도록 마지막 완전한 줄까지만 남김
+            print(f"[JOURNAL] 잘린 레코드 제거 ({os.path.getsize(self.path) - valid_size} bytes)")
+            os.truncate(self.path, valid_size)
+        return state
+
+    def _compact(self):
+        tmp_path = self.path + ".tmp"
+        now = time.time()
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for key, tip_runs in self.state.items():
+                for base, count in tip_runs.items():
+                    f.write(json.dumps({"op": "shot", "tip": key, "eeprom": base, "count": count, "t": now}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        print(f"[JOURNAL] 저널 압축 완료: {len(self.state)}개 팁")
+
+
+class ShotCounter:
+    """팁 EEPROM 캐시 + 저널로 샷 수를 관리합니다 (이벤트 루프에서 사용)."""
+
+    def __init__(self, tip_cache, journal, flush_every=FLUSH_EVERY, flush_interval=FLUSH_INTERVAL):
+        self.tip_cache = tip_cache
+        self.journal = journal
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.flush_handle = None
+        self.current = None               # 연결된 팁 (배치 키, 기준 EEPROM 카운트)
+        self.lock = asyncio.Lock()        # increment 직렬화 (같은 카운트를 두 번 읽지 않도록)
+        self.flush_lock = asyncio.Lock()
+        self.eeprom_writes = 0
+        self.flush_errors = 0
+        self.last_flush = None
+
+    async def increment(self, count=1):
+        """샷을 저널에 확정하고 갱신된 레코드를 반환합니다. EEPROM 기록은 나중에 모아서 수행."""
+        async with self.lock:
+            record, _, cache_hit = await self.tip_cache.read()
+            key = tip_key(record)
+            if not cache_hit or self.current is None or self.current[0] != key:
+                # EEPROM에서 새로 읽은 값이 이 팁의 기준 카운트
+                self.current = (key, record["shot_count"])
+            key, base = self.current
+            new_count = min((self.journal.pending(key, base) or base) + count, SHOT_COUNT_MAX)
+            durable = self.journal.append("shot", key, base, new_count)
+            cached = self.tip_cache.record
+            if cached is not None and tip_key(cached) == key:
+                cached["shot_count"] = new_count
+            record["shot_count"] = new_count
+        # fsync까지 끝나야 샷 확정 (락 밖에서 기다려 연속 샷의 fsync를 묶음)
+        await asyncio.wrap_future(durable)
+
+        key, base = self.current or (key, base)
+        if (self.journal.pending(key, base) or base) - base >= self.flush_every:
+            self._schedule_flush(0)
+        elif self.flush_handle is None:
+            self._schedule_flush(self.flush_interval)
+        return record
+
+    async def set_count(self, record):
+        """eeprom_write로 레코드 전체를 쓴 뒤 호출 - 이 팁의 미반영 샷을 버리고 새 값을 기준으로 삼음"""
+        run = self.current
+        self.current = (tip_key(record), record["shot_count"])
+        if run is not None and self.journal.pending(*run) is not None:
+            await asyncio.wrap_future(self.journal.append("set", *run, record["shot_count"]))
+
+    async def on_tip_connected(self):
+        """팁 연결 후 캐시 로드 + 이 팁(배치 키와 EEPROM 카운트가 같음)의 미반영 샷 적용"""
+        self.current = None
+        await self.tip_cache.on_tip_connected()
+        record = self.tip_cache.record
+        if record is None:
+            return
+        key, base = tip_key(record), record["shot_count"]
+        self.current = (key, base)
+        pending = self.journal.pending(key, base)
+        if pending is not None:
+            print(f"[JOURNAL] 저널 복구: shot {base} -> {pending}")
+            record["shot_count"] = pending
+            self._schedule_flush(0)
+
+    def on_tip_disconnected(self):
+        """
+        팁 분리 - 분리 직전 레코드로 미반영 샷을 바로 기록 시도.
+        GPIO17이 먼저 끊기고 I2C가 살아 있으면 성공하고, 실패하면 저널에 남아 다음 연결 시 기록됩니다.
+        """
+        run = self.current
+        self.current = None
+        self.tip_cache.invalidate()
+        if run is not None and self.journal.pending(*run) is not None:
+            generation = self.tip_cache.generation
+            asyncio.get_running_loop().create_task(self.flush(run, generation))
+
+    def _schedule_flush(self, delay):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+        loop = asyncio.get_running_loop()
+        self.flush_handle = loop.call_later(delay, lambda: loop.create_task(self.flush()))
+
+    async def flush(self, run=None, generation=None):
+        """
+        논리 카운트가 EEPROM보다 앞서 있으면 Shot Count 2바이트를 한 번 씁니다.
+        run: (배치 키, 기준 EEPROM 카운트) - 없으면 연결된 팁
+        """
+        if run is None and self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        async with self.flush_lock:
+            run = run or self.current
+            if run is None:
+                return None
+            key, base = run
+            count = self.journal.pending(key, base)
+            if count is None:
+                return None
+            try:
+                timing = await self.tip_cache.write_shot_count(count, generation)
+            except Exception as e:
+                self.flush_errors += 1
+                print(f"[JOURNAL] EEPROM 기록 실패 (저널에 보존): {e}")
+                return None
+            self.eeprom_writes += 1
+            self.last_flush = {"tip": key, "eeprom": base, "count": count, "i2c": timing}
+            durable = self.journal.append("flushed", key, base, count)
+            # 저널 상태와 함께 바로 바꿔야 fsync를 기다리는 동안 들어온 샷이 새 기준값으로 이어짐
+            if self.current == run:
+                self.current = (key, count)
+            await asyncio.wrap_future(durable)
+            return count
+
+    def get_stats(self):
+        return {
+            "path": self.journal.path,
+            "eeprom_writes": self.eeprom_writes,
+            "flush_errors": self.flush_errors,
+            "last_flush": self.last_flush,
+            "fsyncs": self.journal.fsync_count,
+            "records": self.journal.records_written,
+            "pending": self.journal.pending_runs(),
+        }
@@ -0,0 +1,220 @@
+# shot_sequencer.py
+
+"""
+백엔드 샷 시퀀서 - 풋 스위치(GPIO12) 엣지에서 바로 한 샷을 실행합니다.
+
+UI가 foot_switch 이벤트를 받고 move → 대기 → rf_shot/rf_dtr_high → 대기 → move → shot_increment를
+차례로 보내던 흐름을 이벤트 루프 안의 한 파이프라인으로 실행합니다.
+
+  1. insert   깊이 위치로 이동, 텔레메트리로 도달 확인 (고정 1초 대기 대신) + settle
+  2. rf       미리 만들어 둔 RF 샷 프레임 전송 (UI 흐름처럼 응답을 기다리지 않고 바로 펄스)
+  3. pulse    DTR 펄스 (DtrPulseScheduler, 실제 폭 측정)
+  4. dwell    펄스 종료 후 delay_time
+  5. retract  0 위치로 이동, 도달 확인
+  6. count    shot 카운터 증가 (저널 fsync)
+
+단계별 소요 시간과 엣지 -> 시작 지연을 담은 shot_complete 결과를 on_complete로 넘깁니다.
+제너레이터 응답은 형식이 확인되지 않았으므로 해석하지 않고 원시 프레임(rf.reply)과
+응답 시간(phases.rf_reply, 다른 단계와 겹치는 구간)만 기록합니다.
+중간에 실패해도 삽입 이후라면 항상 retract를 시도합니다.
+"""
+
+import asyncio
+import time
+
+from rf_utils import build_rf_shot_command
+
+POSITION_TOLERANCE = 10     # 도달 판정 허용 오차 (모터 위치 단위, 0.01mm)
+ARRIVAL_TIMEOUT = 2.0
+SETTLE_TIME = 0.05          # 도달 후 안정화 시간
+
+
+class ShotRecipe:
+    __slots__ = ("depth", "intensity", "rf_time", "delay_time", "settle", "tolerance")
+
+    def __init__(self, depth, intensity, rf_time, delay_time=0, settle=SETTLE_TIME, tolerance=POSITION_TOLERANCE):
+        if depth <= 0 or intensity <= 0 or rf_time <= 0:
+            raise ValueError("잘못된 샷 레시피 값입니다 (depth/intensity/rf_time > 0)")
+        self.depth = int(depth)           # 모터 위치 단위 (UI: depth mm * 100)
+        self.intensity = int(intensity)   # RF level
+        self.rf_time = int(rf_time)       # ms
+        self.delay_time = int(delay_time)  # ms
+        self.settle = settle
+        self.tolerance = tolerance
+
+    def describe(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class ShotSequencer:
+    def __init__(self, motor, rf, dtr_pulser=None, shot_counter=None):
+        self.motor = motor
+        self.rf = rf
+        self.dtr_pulser = dtr_pulser
+        self.shot_counter = shot_counter
+        self.recipe = None
+        self.rf_frame = None
+        self.enabled = False
+        self.running = False
+        self.on_complete = None     # on_complete(result) - 이벤트 루프에서 호출
+        self.on_rf_shot = None      # on_rf_shot(rf_time_ms) - RF 구간 시작 알림 (LED, 상태 조회 보류)
+        self.shots = 0
+        self.failures = 0
+        self.rejected_busy = 0
+        self.cycle_total = 0.0
+        self.cycle_max = 0.0
+        self.cycle_min = None
+        self.last = None
+
+    def configure(self, recipe, enabled=True):
+        """레시피 설정 - RF 프레임은 여기서 한 번만 만듦"""
+        self.recipe = recipe
+        self.rf_frame = build_rf_shot_command(True, False, recipe.intensity, recipe.rf_time)
+        self.enabled = enabled
+
+    def trigger(self, edge):
+        """GPIO12 엣지 핸들러에서 호출 (이벤트 루프). 샷을 시작했으면 True."""
+        if not (self.enabled and self.recipe):
+            return False
+        if self.running:
+            self.rejected_busy += 1
+            print("[SHOT] 이전 샷 진행 중 - 풋 스위치 무시")
+            return False
+        self.running = True
+        asyncio.get_running_loop().create_task(self._run(edge))
+        return True
+
+    async def _run(self, edge):
+        recipe = self.recipe
+        started = time.monotonic()
+        phases = {}
+        result = {
+            "success": False,
+            "recipe": recipe.describe(),
+            "trigger_ms": round((started - edge.edge_at) * 1000, 3) if edge else None,
+            "phases": phases,
+        }
+        phase_start = started
+
+        def mark(name):
+            nonlocal phase_start
+            now = time.monotonic()
+            phases[name] = round((now - phase_start) * 1000, 3)
+            phase_start = now
+
+        inserted = False
+        rf_reply = None
+        try:
+            if not self.motor.is_connected():
+                raise RuntimeError("모터가 연결되지 않았습니다")
+            if not (self.rf.is_attached() or self.dtr_pulser):
+                raise RuntimeError("RF 출력 수단이 없습니다")
+
+            inserted = True
+            self.motor.move_to_position(recipe.depth, "position")
+            await self._wait_position(recipe.depth, recipe.tolerance)
+            await asyncio.sleep(recipe.settle)
+            mark("insert")
+
+            if self.on_rf_shot:
+                self.on_rf_shot(recipe.rf_time)
+            if self.rf.is_attached():
+                sent_at = time.monotonic()
+                try:
+                    rf_reply = self.rf.submit(self.rf_frame)
+                    rf_reply.add_done_callback(lambda future: self._record_rf_reply(result, future, sent_at))
+                except ConnectionError as e:
+                    # UI 흐름과 같이 RF 명령 실패로 샷을 중단하지 않음 (기록만)
+                    result["rf"] = {"reply": None, "error": str(e)}
+                mark("rf")
+
+            if self.dtr_pulser:
+                pulse = await asyncio.wrap_future(self.dtr_pulser.fire(recipe.rf_time))
+                result["pulse"] = pulse
+                mark("pulse")
+
+            await asyncio.sleep(recipe.delay_time / 1000.0)
+            mark("dwell")
+        except Exception as e:
+            result["error"] = str(e)
+            print(f"[SHOT] 샷 실패: {e}")
+        finally:
+            if inserted:
+                try:
+                    phase_start = time.monotonic()
+                    self.motor.move_to_position(0, "position")
+                    await self._wait_position(0, recipe.tolerance)
+                    mark("retract")
+                except Exception as e:
+                    result.setdefault("error", f"복귀 실패: {e}")
+            if rf_reply is not None and not rf_reply.done():
+                # 응답 또는 제한 시간까지 (보통 펄스 전에 이미 도착)
+                await asyncio.wait([rf_reply])
+
+        if "error" not in result:
+            if self.shot_counter:
+                try:
+                    record = await self.shot_counter.increment()
+                    result["shot_count"] = record["shot_count"]
+                except Exception as e:
+                    # 샷은 이미 나갔으므로 성공으로 두고 카운트 오류만 알림
+                    result["count_error"] = str(e)
+                mark("count")
+            result["success"] = True
+
+        total = time.monotonic() - started
+        result["total_ms"] = round(total * 1000, 3)
+        result["timestamp"] = time.time()
+        self._record(result["success"], total)
+        self.last = result
+        self.running = False
+        print(f"[SHOT] 샷 {'완료' if result['success'] else '실패'}: {result['total_ms']}ms {phases}")
+        if self.on_complete:
+            self.on_complete(result)
+
+    @staticmethod
+    def _record_rf_reply(result, future, sent_at):
+        if future.cancelled():
+            return
+        if future.exception() is None:
+            result["rf"] = {"reply": future.result().hex().upper()}
+            result["phases"]["rf_reply"] = round((time.monotonic() - sent_at) * 1000, 3)
+        else:
+            result["rf"] = {"reply": None, "error": str(future.exception())}
+
+    async def _wait_position(self, target, tolerance, timeout=ARRIVAL_TIMEOUT):
+        """텔레메트리 위치가 target ± tolerance에 들어올 때까지 기다립니다."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        snapshot = self.motor.get_snapshot()
+        while abs(snapshot.position - target) > tolerance:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise TimeoutError(f"위치 {target} 도달 시간 초과 (현재 {snapshot.position})")
+            try:
+                snapshot = await asyncio.wait_for(self.motor.wait_for_snapshot_async(snapshot.seq, loop), remaining)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"위치 {target} 도달 시간 초과 (현재 {snapshot.position})") from None
+
+    def _record(self, success, total):
+        if not success:
+            self.failures += 1
+            return
+        self.shots += 1
+        self.cycle_total += total
+        self.cycle_max = max(self.cycle_max, total)
+        self.cycle_min = total if self.cycle_min is None else min(self.cycle_min, total)
+
+    def get_stats(self):
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "recipe": self.recipe.describe() if self.recipe else None,
+            "shots": self.shots,
+            "failures": self.failures,
+            "rejected_busy": self.rejected_busy,
+            "cycle_avg_ms": round(self.cycle_total / self.shots * 1000, 3) if self.shots else 0.0,
+            "cycle_min_ms": round(self.cycle_min * 1000, 3) if self.cycle_min is not None else 0.0,
+            "cycle_max_ms": round(self.cycle_max * 1000, 3),
+            "last": self.last,
+        }
@@ -0,0 +1,109 @@
+# telemetry_codec.py
+
+"""
+WebSocket 상태(status) 메시지의 바이너리 인코딩.
+
+JSON status 메시지와 같은 내용을 고정 struct 레이아웃으로 보냅니다 (리틀 엔디언).
+
+  헤더 (4바이트)
+    version   B   STATUS_BINARY_VERSION
+    kind      B   KIND_STATUS(0x01) 전체 상태 / KIND_HEARTBEAT(0x02) 생존 신호
+    flags     B   bit0 motor_connected, bit1 rf_connected,
+                  bit2 RF 상태 있음, bit3 rf responding
+                  (bit3은 bit2가 켜져 있을 때만 의미 있음, 상태 응답 원시 바이트는 JSON에만)
+    count     B   뒤따르는 모터 레코드 수 (heartbeat는 기본 모터 1개, 모터 미연결이면 0)
+  모터 레코드 (15바이트 x count, 첫 레코드가 기본 모터)
+    motor_id  B
+    seq       I
+    setPos    h
+    position  h
+    force     f   N
+    sensor    h
+
+클라이언트는 {"cmd": "set_encoding", "encoding": "binary"}로 요청하며 기본값은 JSON입니다.
+"""
+
+import struct
+
+STATUS_BINARY_VERSION = 1
+
+KIND_STATUS = 0x01
+KIND_HEARTBEAT = 0x02
+
+FLAG_MOTOR_CONNECTED = 0x01
+FLAG_RF_CONNECTED = 0x02
+FLAG_RF_STATUS = 0x04
+FLAG_RF_RESPONDING = 0x08
+
+ENCODINGS = ("json", "binary")
+
+HEADER_STRUCT = struct.Struct('<BBBB')
+MOTOR_STRUCT = struct.Struct('<BIhhfh')
+
+
+def encode_status(snapshots, motor_connected, rf_connected, heartbeat=False, rf_status=None):
+    """
+    snapshots: 모터 ID -> MotorSnapshot (첫 번째가 기본 모터)
+    rf_status: RfStatusPoller.summary() (없으면 None)
+    반환값: 바이너리 WebSocket 프레임으로 보낼 bytes
+    """
+    flags = (FLAG_MOTOR_CONNECTED if motor_connected else 0) | (FLAG_RF_CONNECTED if rf_connected else 0)
+    if rf_status is not None:
+        flags |= FLAG_RF_STATUS
+        flags |= FLAG_RF_RESPONDING if rf_status.get("responding") else 0
+    if not motor_connected:
+        items = []
+    elif heartbeat:
+        items = list(snapshots.items())[:1]
+    else:
+        items = list(snapshots.items())
+
+    buf = bytearray(HEADER_STRUCT.size + MOTOR_STRUCT.size * len(items))
+    HEADER_STRUCT.pack_into(buf, 0, STATUS_BINARY_VERSION,
+                            KIND_HEARTBEAT if heartbeat else KIND_STATUS, flags, len(items))
+    offset = HEADER_STRUCT.size
+    for motor_id, s in items:
+        MOTOR_STRUCT.pack_into(buf, offset, motor_id, s.seq, s.setPos, s.position, s.force, s.sensor)
+        offset += MOTOR_STRUCT.size
+    return bytes(buf)
+
+
+def decode_status(data):
+    """encode_status의 역변환. JSON status 메시지와 같은 형태의 dict를 반환합니다."""
+    if len(data) < HEADER_STRUCT.size:
+        raise ValueError(f"바이너리 상태 프레임이 너무 짧습니다: {len(data)}")
+    version, kind, flags, count = HEADER_STRUCT.unpack_from(data, 0)
+    if version != STATUS_BINARY_VERSION:
+        raise ValueError(f"지원하지 않는 바이너리 상태 버전입니다: {version}")
+    expected = HEADER_STRUCT.size + MOTOR_STRUCT.size * count
+    if len(data) != expected:
+        raise ValueError(f"바이너리 상태 프레임 길이 불일치: {len(data)}/{expected}")
+
+    result = {
+        "motor_connected": bool(flags & FLAG_MOTOR_CONNECTED),
+        "rf_connected": bool(flags & FLAG_RF_CONNECTED),
+    }
+    if flags & FLAG_RF_STATUS:
+        result["rf_status"] = {
+            "responding": bool(flags & FLAG_RF_RESPONDING),
+        }
+    if kind == KIND_HEARTBEAT:
+        result["heartbeat"] = True
+
+    motors = {}
+    offset = HEADER_STRUCT.size
+    for _ in range(count):
+        motor_id, seq, setPos, position, force, sensor = MOTOR_STRUCT.unpack_from(data, offset)
+        offset += MOTOR_STRUCT.size
+        motors[motor_id] = {"position": position, "force": round(force, 1), "sensor": sensor,
+                            "setPos": setPos, "seq": seq}
+
+    if motors:
+        primary = next(iter(motors.values()))
+        if kind == KIND_HEARTBEAT:
+            result["seq"] = primary["seq"]
+        else:
+            result.update(primary)
+            if len(motors) > 1:
+                result["motors"] = {str(motor_id): m for motor_id, m in motors.items()}
+    return {"type": "status", "data": result}
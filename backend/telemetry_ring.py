@@ -0,0 +1,130 @@
+# telemetry_ring.py
+
+"""
+디코딩된 모터 텔레메트리 프레임을 단조 시계 타임스탬프와 함께 저장하는 고정 크기 링 버퍼.
+array 기반이라 용량이 고정되어 있고 라즈베리파이에서도 메모리 사용량이 일정합니다.
+"""
+
+import time
+from array import array
+from threading import Lock
+
+FIELDS = ("setPos", "position", "force", "sensor")
+DEFAULT_CAPACITY = 8192
+
+
+class TelemetryRing:
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.columns = {
+            "setPos": array('h', bytes(2 * capacity)),
+            "position": array('h', bytes(2 * capacity)),
+            "force": array('f', bytes(4 * capacity)),   # N 단위
+            "sensor": array('h', bytes(2 * capacity)),
+        }
+        self.head = 0     # 다음에 쓸 위치
+        self.count = 0
+        self.total = 0    # 지금까지 저장한 전체 프레임 수
+        self.lock = Lock()
+
+    def append(self, timestamp, setPos, position, force, sensor):
+        with self.lock:
+            i = self.head
+            self.timestamps[i] = timestamp
+            columns = self.columns
+            columns["setPos"][i] = setPos
+            columns["position"][i] = position
+            columns["force"][i] = force
+            columns["sensor"][i] = sensor
+            self.head = (i + 1) % self.capacity
+            if self.count < self.capacity:
+                self.count += 1
+            self.total += 1
+
+    def clear(self):
+        with self.lock:
+            self.head = 0
+            self.count = 0
+
+    def _physical(self, logical):
+        """가장 오래된 프레임을 0으로 하는 논리 인덱스를 배열 인덱스로 변환"""
+        return (self.head - self.count + logical) % self.capacity
+
+    def _lower_bound(self, timestamp):
+        """timestamp 이상인 첫 논리 인덱스 (타임스탬프는 단조 증가)"""
+        lo, hi = 0, self.count
+        timestamps = self.timestamps
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if timestamps[self._physical(mid)] < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def window(self, since=None, until=None, fields=FIELDS):
+        """
+        [since, until] 구간의 프레임을 {"t": [...], field: [...]} 형태로 반환합니다.
+        since/until은 time.monotonic() 기준이며 None이면 버퍼 처음/끝을 의미합니다.
+        """
+        with self.lock:
+            start = 0 if since is None else self._lower_bound(since)
+            end = self.count if until is None else self._lower_bound(until + 1e-9)
+            indices = [self._physical(i) for i in range(start, end)]
+            timestamps = self.timestamps
+            result = {"t": [timestamps[i] for i in indices]}
+            for field in fields:
+                column = self.columns[field]
+                if column.typecode == 'f':
+                    # float32 저장값을 보기 좋게 정리
+                    result[field] = [round(column[i], 3) for i in indices]
+                else:
+                    result[field] = [column[i] for i in indices]
+        return result
+
+    def downsample(self, since=None, until=None, buckets=100, fields=FIELDS):
+        """
+        구간을 buckets개의 동일 시간 버킷으로 나눠 필드별 min/max/mean을 계산합니다.
+        비어 있는 버킷은 결과에서 제외됩니다.
+        """
+        samples = self.window(since, until, fields)
+        timestamps = samples["t"]
+        if not timestamps or buckets <= 0:
+            return {"t": [], "count": [], **{f: {"min": [], "max": [], "mean": []} for f in fields}}
+
+        t_start = timestamps[0] if since is None else since
+        t_end = timestamps[-1] if until is None else until
+        width = (t_end - t_start) / buckets or 1e-9
+
+        groups = {}
+        for i, t in enumerate(timestamps):
+            b = min(int((t - t_start) / width), buckets - 1)
+            groups.setdefault(b, []).append(i)
+
+        result = {"t": [], "count": []}
+        for field in fields:
+            result[field] = {"min": [], "max": [], "mean": []}
+        for b in sorted(groups):
+            members = groups[b]
+            result["t"].append(t_start + (b + 0.5) * width)
+            result["count"].append(len(members))
+            for field in fields:
+                values = [samples[field][i] for i in members]
+                result[field]["min"].append(min(values))
+                result[field]["max"].append(max(values))
+                result[field]["mean"].append(round(sum(values) / len(values), 3))
+        return result
+
+    def query(self, seconds=None, since=None, until=None, buckets=None, fields=FIELDS):
+        """WebSocket 요청 파라미터를 그대로 받아 원본 또는 다운샘플 결과를 반환합니다."""
+        now = time.monotonic()
+        if seconds is not None:
+            since = now - seconds
+        fields = tuple(f for f in fields if f in self.columns)
+        if buckets:
+            data = self.downsample(since, until, int(buckets), fields)
+        else:
+            data = self.window(since, until, fields)
+        return {"now": now, "capacity": self.capacity, "stored": self.count, "total": self.total,
+                "downsampled": bool(buckets), "data": data}
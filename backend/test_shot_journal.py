@@ -0,0 +1,104 @@
+# test_shot_journal.py
+
+import asyncio
+
+from shot_journal import ShotJournal, ShotCounter
+
+
+class FakeTipCache:
+    """I2C 없이 팁 EEPROM을 흉내 내는 TipEepromCache 대역 (팁 연결/분리, Shot Count 기록)"""
+
+    def __init__(self):
+        self.eeprom = None      # 연결된 팁의 EEPROM 레코드
+        self.record = None
+        self.generation = 0
+
+    def connect(self, eeprom):
+        self.eeprom = eeprom
+
+    def disconnect(self):
+        self.eeprom = None
+
+    def invalidate(self):
+        self.generation += 1
+        self.record = None
+
+    async def on_tip_connected(self):
+        self.invalidate()
+        self.record = dict(self.eeprom)
+
+    async def read(self):
+        return dict(self.record), None, True
+
+    async def write_shot_count(self, shot_count, generation=None):
+        if self.eeprom is None or (generation is not None and generation != self.generation):
+            raise RuntimeError("팁 없음")
+        self.eeprom["shot_count"] = shot_count
+        if self.record is not None:
+            self.record["shot_count"] = shot_count
+        return {}
+
+
+def same_batch_tip(shot_count):
+    return {"tip_type": 3, "shot_count": shot_count, "manufacture_date": "2025-03-04", "manufacturer": 2}
+
+
+def test_pending_shots_stay_with_their_tip_within_a_batch(tmp_path):
+    async def run():
+        journal = ShotJournal(str(tmp_path / "journal.jsonl"))
+        journal.open()
+        cache = FakeTipCache()
+        counter = ShotCounter(cache, journal, flush_every=100, flush_interval=60)
+
+        tip_a = same_batch_tip(40)
+        tip_b = same_batch_tip(7)
+
+        # 팁 A: 3샷 후 EEPROM 기록 전에 분리 (I2C가 먼저 끊겨 분리 시 기록 실패)
+        cache.connect(tip_a)
+        await counter.on_tip_connected()
+        for _ in range(3):
+            await counter.increment()
+        cache.disconnect()
+        counter.on_tip_disconnected()
+        await asyncio.sleep(0)
+
+        # 같은 배치의 팁 B: A의 미반영 샷을 받지 않고 자기 카운트에서 시작
+        cache.connect(tip_b)
+        await counter.on_tip_connected()
+        assert cache.record["shot_count"] == 7
+        record = await counter.increment()
+        assert record["shot_count"] == 8
+        await counter.flush()
+        assert tip_b["shot_count"] == 8
+        assert tip_a["shot_count"] == 40
+        cache.disconnect()
+        counter.on_tip_disconnected()
+
+        # 팁 A를 다시 꽂으면 저널에 남아 있던 A의 샷이 적용됨
+        cache.connect(tip_a)
+        await counter.on_tip_connected()
+        assert cache.record["shot_count"] == 43
+        await counter.flush()
+        assert tip_a["shot_count"] == 43
+        assert journal.pending_runs() == {}
+        journal.close()
+
+    asyncio.run(run())
+
+
+def test_replay_keeps_runs_of_same_batch_tips_apart(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = ShotJournal(path)
+    journal.open()
+    key = "3:2025-03-04:2"
+    journal.append("shot", key, 40, 43).result()
+    journal.append("shot", key, 7, 9).result()
+    journal.append("flushed", key, 7, 8).result()
+    journal.close()
+
+    replayed = ShotJournal(path)
+    replayed.open()
+    assert replayed.pending(key, 40) == 43
+    assert replayed.pending(key, 8) == 9
+    assert replayed.pending(key, 7) is None
+    replayed.close()
@@ -0,0 +1,112 @@
+# tip_eeprom_cache.py
+
+"""
+니들팁 EEPROM 레코드의 write-through 메모리 캐시.
+
+- GPIO17 팁 연결 이벤트에서 레코드를 한 번 읽어 두고, 분리 이벤트에서 무효화
+- eeprom_read는 마지막 읽기 이후 팁이 분리되지 않았으면 캐시로 응답
+- Shot Count 기록은 2바이트만 쓰고 캐시를 갱신 (shot 증가 자체는 shot_journal.ShotCounter가 관리)
+- 모든 I2C 접근은 I2cWorker를 거침
+
+팁 연결 상태를 알 수 없는 환경(GPIO 없음)에서는 presence_tracked=False로 만들어
+읽기마다 EEPROM에서 다시 읽습니다.
+"""
+
+import asyncio
+
+from eeprom_layout import SHOT_COUNT_MAX
+from eeprom_utils import read_eeprom_data, write_eeprom_data, write_shot_count
+
+
+class TipEepromCache:
+    def __init__(self, worker, i2c_bus, device_address=0x50, start_address=0x10, presence_tracked=True):
+        self.worker = worker
+        self.i2c_bus = i2c_bus
+        self.device_address = device_address
+        self.start_address = start_address
+        self.presence_tracked = presence_tracked
+        self.record = None
+        self.generation = 0   # 팁 연결/분리마다 증가 - 진행 중이던 로드 결과를 버리기 위함
+        self.lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self):
+        """팁 분리 (또는 연결 직후 다시 읽어야 할 때)"""
+        self.generation += 1
+        self.record = None
+
+    async def on_tip_connected(self):
+        self.invalidate()
+        try:
+            await self.load()
+        except Exception as e:
+            print(f"[EEPROM] 팁 연결 시 EEPROM 로드 실패: {e}")
+
+    async def load(self):
+        """EEPROM에서 레코드를 읽어 캐시에 저장합니다."""
+        generation = self.generation
+        record, timing = await self.worker.run_timed(
+            "eeprom_read", read_eeprom_data, self.i2c_bus, self.device_address, self.start_address
+        )
+        if generation == self.generation:
+            self.record = record
+        return dict(record), timing
+
+    async def read(self):
+        """(레코드, I2C 시간 또는 None, 캐시 적중 여부)"""
+        async with self.lock:
+            if self.presence_tracked and self.record is not None:
+                self.hits += 1
+                return dict(self.record), None, True
+            self.misses += 1
+            record, timing = await self.load()
+            return record, timing, False
+
+    async def write_record(self, tip_type, shot_count, manufacture_date, manufacturer):
+        """레코드 전체를 쓰고 캐시를 쓴 값으로 갱신합니다."""
+        async with self.lock:
+            generation = self.generation
+            writes, timing = await self.worker.run_timed(
+                "eeprom_write", write_eeprom_data,
+                self.i2c_bus, self.device_address, self.start_address,
+                tip_type, shot_count, manufacture_date, manufacturer
+            )
+            if generation == self.generation:
+                self.record = {
+                    "tip_type": tip_type,
+                    "shot_count": shot_count,
+                    "manufacture_date": f"{manufacture_date['year']:04d}-{manufacture_date['month']:02d}-{manufacture_date['day']:02d}",
+                    "manufacturer": manufacturer,
+                }
+            return {**timing, **writes}
+
+    async def write_shot_count(self, shot_count, generation=None):
+        """
+        Shot Count 2바이트만 씁니다 (ShotCounter의 모아 쓰기용). I2C 시간을 반환합니다.
+        generation을 주면 그 사이 다른 팁이 연결된 경우 쓰지 않고 RuntimeError.
+        """
+        async with self.lock:
+            if generation is None:
+                generation = self.generation
+            elif generation != self.generation:
+                raise RuntimeError("다른 팁이 연결되어 Shot Count를 쓰지 않았습니다")
+            shot_count = min(shot_count, SHOT_COUNT_MAX)
+            writes, timing = await self.worker.run_timed(
+                "shot_count_write", write_shot_count,
+                self.i2c_bus, self.device_address, self.start_address, shot_count
+            )
+            if generation != self.generation:
+                raise RuntimeError("Shot Count 쓰는 중 팁이 분리되었습니다")
+            if self.record is not None:
+                self.record["shot_count"] = shot_count
+            return {**timing, **writes}
+
+    def get_stats(self):
+        return {
+            "cached": self.record is not None,
+            "presence_tracked": self.presence_tracked,
+            "hits": self.hits,
+            "misses": self.misses,
+            "generation": self.generation,
+        }
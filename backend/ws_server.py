@@ -2,15 +2,30 @@ import asyncio
 import websockets
 import json
 import time
-import queue
 import threading
+import os
 from motor_threaded_controller import MotorThreadedController
+from motor_async_controller import MotorAsyncController
+from motor_trajectory import trapezoid_profile, insertion_cycle_profile
+from device_watcher import DeviceWatcher
+from telemetry_codec import ENCODINGS, STATUS_BINARY_VERSION, encode_status
+from client_session import ClientSession, HEARTBEAT
+from gpio_event_bridge import GpioEventBridge
+from command_registry import CommandRegistry, Param, Reply
+from i2c_worker import I2cWorker
+from shot_journal import ShotJournal, ShotCounter
+from eeprom_layout import MTR20_CLASSYS_LAYOUT, MTR20_CUTERA_LAYOUT, MTR40_LAYOUT
+from tip_eeprom_cache import TipEepromCache
 from rf_utils import (
     open_rf_port_util, close_rf_port_util, 
     send_rf_output_command_util, send_rf_shot_command_util,
     build_rf_shot_command, set_dtr_high_util
 )
-from eeprom_utils import read_eeprom_data, write_eeprom_data
+from rf_transport import RfTransport
+from rf_pulse import DtrPulseScheduler
+from rf_status_poller import RfStatusPoller
+from shot_sequencer import ShotSequencer, ShotRecipe
+from force_trigger import ForceTrigger, ForceTriggerConfig
 import serial
 
 # EEPROM 관련 import
@@ -24,11 +39,9 @@ except ImportError:
 
 # EEPROM 설정
 I2C_BUS = 1
-MTR20_EEPROM_ADDRESS = 0x50
-MTR20_CLASSYS_OFFSET = 0x10
-MTR20_CUTERA_OFFSET = 0x80
-MTR40_EEPROM_ADDRESS = 0x51
-MTR40_OFFSET = 0x70
+
+# 모든 I2C 작업은 이 워커 스레드 하나를 거침 (SMBus 핸들 유지, 작업 직렬화)
+i2c_worker = I2cWorker(I2C_BUS)
 
 # --- GPIO 초기화 (gpiozero 라이브러리) ---
 gpio_available = False
@@ -38,9 +51,15 @@ pin12 = None # GPIO12 for foot switch (풋 스위치)
 # RF 연결 관련 변수
 rf_connection = None
 rf_connected = False
+# RF 송수신은 이벤트 루프에서 (응답 프레임 파싱 + 명령 바이트로 요청/응답 연결)
+rf = RfTransport()
+# 샷 사이 RF 제너레이터 상태 조회 (ready/fault/온도) - status 메시지에 포함
+rf_status = RfStatusPoller(rf)
+# RF 출력 설정 명령 (연결 후 한 번)
+RF_OUTPUT_SETUP_COMMAND = bytes.fromhex('020901430100014903')
 
-# 풋 스위치 이벤트 큐
-foot_switch_queue = queue.Queue()
+# GPIO 엣지 -> 이벤트 루프 브리지 (엣지 시각 기록, call_soon_threadsafe로 전달)
+gpio_bridge = GpioEventBridge()
 
 try:
     from gpiozero import Button, DigitalOutputDevice
@@ -60,48 +79,18 @@ try:
     # GPIO27: LED 출력 (니들팁 분리됨 표시)
     pin27 = DigitalOutputDevice(27)
     
-    # GPIO17 인터럽트 이벤트 핸들러
+    # GPIO17 인터럽트 - LED는 콜백 스레드에서 바로 켜고, 클라이언트 알림은 브리지로 이벤트 루프에 전달
     def _on_needle_tip_connected():
         print("[GPIO17] 니들팁 연결 인터럽트 발생")
         pin22.on()   # GPIO22 LED ON
         pin27.off()  # GPIO27 LED OFF
         print("[GPIO17] 니들팁 연결됨 - GPIO22 LED ON")
-        
-        # 모든 연결된 클라이언트에게 GPIO17 상태 변경 알림
-        gpio17_event = {
-            "type": "gpio17_status",
-            "data": {
-                "gpio17": "HIGH",
-                "needle_tip_connected": True
-            }
-        }
-        for ws in connected_clients.copy():
-            try:
-                asyncio.create_task(ws.send(json.dumps(gpio17_event)))
-            except Exception as e:
-                print(f"[WARN] GPIO17 상태 전송 실패: {e}")
-                connected_clients.discard(ws)
     
     def _on_needle_tip_disconnected():
         print("[GPIO17] 니들팁 분리 인터럽트 발생")
         pin22.off()  # GPIO22 LED OFF
         pin27.on()   # GPIO27 LED ON
         print("[GPIO17] 니들팁 분리됨 - GPIO27 LED ON")
-        
-        # 모든 연결된 클라이언트에게 GPIO17 상태 변경 알림
-        gpio17_event = {
-            "type": "gpio17_status",
-            "data": {
-                "gpio17": "LOW",
-                "needle_tip_connected": False
-            }
-        }
-        for ws in connected_clients.copy():
-            try:
-                asyncio.create_task(ws.send(json.dumps(gpio17_event)))
-            except Exception as e:
-                print(f"[WARN] GPIO17 상태 전송 실패: {e}")
-                connected_clients.discard(ws)
     
     # GPIO17 상태에 따른 LED 제어 함수
     def update_needle_tip_leds():
@@ -162,37 +151,14 @@ try:
     print(f"[GPIO12] 풋 스위치 초기화 완료 (풀다운 설정)")
     print(f"[GPIO12] 초기 풋 스위치 상태: {'HIGH' if pin12.is_pressed else 'LOW'}")
 
-    # 풋 스위치 이벤트 핸들러 정의 (동기 함수로 변경)
-    def _on_foot_switch_pressed_sync():
-        print("=" * 50)
-        print("[GPIO12] 풋 스위치 눌림 감지!")
-        print("[GPIO12] 이벤트 큐에 신호 추가")
-        
-        # 큐에 풋 스위치 이벤트 추가
-        foot_switch_data = {
-            "type": "foot_switch",
-            "data": {
-                "pressed": True,
-                "timestamp": time.time()
-            }
-        }
-        
-        try:
-            foot_switch_queue.put_nowait(foot_switch_data)
-            print("[GPIO12] 풋 스위치 이벤트 큐에 추가 완료")
-        except queue.Full:
-            print("[WARN] 풋 스위치 이벤트 큐가 가득참")
-        
-        print("=" * 50)
-    
     def _on_foot_switch_released_sync():
         print("[GPIO12] 풋 스위치 released 인터럽트 발생")
 
     # 이벤트 핸들러 할당
-    pin12.when_pressed = _on_foot_switch_pressed_sync
+    pin12.when_pressed = gpio_bridge.callback("foot_switch_pressed")
     pin12.when_released = _on_foot_switch_released_sync
-    pin17.when_pressed = _on_needle_tip_connected
-    pin17.when_released = _on_needle_tip_disconnected
+    pin17.when_pressed = gpio_bridge.callback("needle_tip_connected", _on_needle_tip_connected)
+    pin17.when_released = gpio_bridge.callback("needle_tip_disconnected", _on_needle_tip_disconnected)
     
     # 풋 스위치 이벤트 핸들러가 제대로 등록되었는지 확인
     print(f"[GPIO12] 이벤트 핸들러 등록 확인:")
@@ -215,8 +181,39 @@ except Exception as e:
     print(f"[ERROR] GPIO 초기화 오류: {e}")
 # --- [여기까지 수정] ---
 
-motor = MotorThreadedController()
-connected_clients = set()
+# GPIO0 DTR 펄스 전용 스레드 (절대 시각 sleep + 마지막 스핀, 펄스 폭 측정)
+dtr_pulser = DtrPulseScheduler(pin0) if pin0 else None
+
+# 니들팁 EEPROM 캐시 - GPIO17로 팁 연결/분리를 알 수 있을 때만 캐시로 응답
+tip_cache = TipEepromCache(i2c_worker, I2C_BUS, 0x50, 0x10, presence_tracked=gpio_available and pin17 is not None)
+
+# shot 수는 로컬 저널에 먼저 기록(fsync)하고 EEPROM에는 모아서 씀
+SHOT_JOURNAL_PATH = os.environ.get(
+    "SENSOVIA_SHOT_JOURNAL", os.path.join(os.path.dirname(os.path.abspath(__file__)), "shot_journal.jsonl")
+)
+shot_journal = ShotJournal(SHOT_JOURNAL_PATH)
+shot_counter = ShotCounter(tip_cache, shot_journal)
+
+# 같은 RS-485 선로의 모터 ID 목록 (두 번째 액추에이터 장착 시 (0x01, 0x02))
+MOTOR_IDS = (0x01,)
+
+# 모터 송수신 방식: "thread"(송신/수신 스레드, 기본값) 또는 "asyncio"(이벤트 루프에 fd 등록)
+MOTOR_TRANSPORT = os.environ.get("SENSOVIA_MOTOR_TRANSPORT", "thread").lower()
+
+if MOTOR_TRANSPORT == "asyncio":
+    motor = MotorAsyncController(motor_ids=MOTOR_IDS)
+else:
+    motor = MotorThreadedController(motor_ids=MOTOR_IDS)
+print(f"[MOTOR] 송수신 방식: {MOTOR_TRANSPORT}")
+
+# 풋 스위치 엣지에서 바로 실행하는 백엔드 샷 시퀀서 (shot_recipe 명령으로 레시피를 설정하면 활성화)
+shot_sequencer = ShotSequencer(motor, rf, dtr_pulser, shot_counter if eeprom_available else None)
+
+# 접촉력 임계값 트리거 - 모터 수신 스레드에서 텔레메트리 프레임마다 평가 (force_arm 명령으로 설정)
+force_trigger = ForceTrigger(rf, dtr_pulser)
+motor.telemetry_hook = force_trigger.evaluate
+client_sessions = {}  # websocket -> ClientSession (구독 토픽, 푸시 주기, 인코딩)
+
 
 # 모터 자동 연결 시도
 try:
@@ -241,372 +238,684 @@ try:
     )
     rf_connected = True
     print(f"[RF] 자동 연결 성공: /dev/usb-rf")
-    
-    # RF 출력 설정 명령어 전송 (020901430100014903)
-    setup_command = bytes.fromhex('020901430100014903')
-    rf_connection.write(setup_command)
-    print(f"[RF] 출력 설정 명령어 전송: {setup_command.hex().upper()}")
-    
+    # 출력 설정 명령은 main()에서 이벤트 루프에 등록한 뒤 응답과 함께 확인
 except Exception as e:
     rf_connected = False
     print(f"[RF] 자동 연결 실패: {e}")
 
 
 # 모터 재연결 관련
-motor_reconnect_task = None
+MOTOR_DEVICE_PATH = '/dev/usb-motor'
+MOTOR_RECONNECT_BACKOFF_MIN = 0.05
+MOTOR_RECONNECT_BACKOFF_MAX = 5.0
+motor_link_lost = None  # asyncio.Event - main()에서 생성
+device_watcher = DeviceWatcher('/dev')
 
 # --- [삭제] RPi.GPIO용 gpio23_callback 함수 삭제 ---
 
-# EEPROM 관련 함수들은 이전과 동일합니다.
-def write_eeprom_mtr20(tip_type, shot_count, year, month, day, maker_code, country="CLASSYS"):
+# MTR 2.0/4.0 EEPROM 함수 - 필드 배치는 eeprom_layout에 선언, I2C는 모두 i2c_worker를 거침
+async def _write_mtr_eeprom(layout, tip_type, shot_count, year, month, day, maker_code):
     if not eeprom_available: return {"success": False, "error": "EEPROM 기능 비활성화"}
-    eeprom_address = MTR20_EEPROM_ADDRESS
-    offset = MTR20_CUTERA_OFFSET if country == "CUTERA" else MTR20_CLASSYS_OFFSET
+    record = {
+        "tip_type": tip_type,
+        "shot_count": shot_count,
+        "manufacture_date": {"year": year, "month": month, "day": day},
+        "manufacturer": maker_code,
+    }
     try:
-        bus = smbus2.SMBus(I2C_BUS)
-        bus.write_byte_data(eeprom_address, offset + 0, tip_type); time.sleep(0.01)
-        bus.write_byte_data(eeprom_address, offset + 1, (shot_count >> 8) & 0xFF); time.sleep(0.01)
-        bus.write_byte_data(eeprom_address, offset + 2, shot_count & 0xFF); time.sleep(0.01)
-        bus.write_byte_data(eeprom_address, offset + 9, (year - 2000) & 0xFF); time.sleep(0.01)
-        bus.write_byte_data(eeprom_address, offset + 10, month & 0xFF); time.sleep(0.01)
-        bus.write_byte_data(eeprom_address, offset + 11, day & 0xFF); time.sleep(0.01)
-        bus.write_byte_data(eeprom_address, offset + 12, maker_code & 0xFF); time.sleep(0.01)
-        bus.close()
-        return {"success": True, "message": f"MTR 2.0 {country} EEPROM 쓰기 성공"}
-    except Exception as e: return {"success": False, "error": f"EEPROM 쓰기 실패: {e}"}
-
-def read_eeprom_mtr20(country="CLASSYS"):
-    if not eeprom_available: return {"success": False, "error": "EEPROM 기능 비활성화"}
-    eeprom_address = MTR20_EEPROM_ADDRESS
-    offset = MTR20_CUTERA_OFFSET if country == "CUTERA" else MTR20_CLASSYS_OFFSET
-    bus = None; max_retries = 3
-    for attempt in range(max_retries):
+        # 페이지 단위 블록 쓰기 + ACK 폴링
+        result, timing = await i2c_worker.run_timed("mtr_eeprom_write", layout.write, record=record)
+    except Exception as e:
+        return {"success": False, "error": f"EEPROM 쓰기 실패: {e}"}
+    if layout is MTR20_CLASSYS_LAYOUT:
+        # 니들팁 레코드와 같은 영역 - 캐시와 shot 카운터 기준값을 새 레코드로 맞춤
         try:
-            bus = smbus2.SMBus(I2C_BUS)
-            tip_type = bus.read_byte_data(eeprom_address, offset + 0)
-            shot = bus.read_i2c_block_data(eeprom_address, offset + 1, 2); shot_count = (shot[0] << 8) | shot[1]
-            year_off = bus.read_byte_data(eeprom_address, offset + 9); month = bus.read_byte_data(eeprom_address, offset + 10); day = bus.read_byte_data(eeprom_address, offset + 11)
-            year = 2000 + year_off
-            maker_code = bus.read_byte_data(eeprom_address, offset + 12)
-            return {"success": True, "tipType": tip_type, "shotCount": shot_count, "year": year, "month": month, "day": day, "makerCode": maker_code, "mtrVersion": "2.0", "country": country}
+            await tip_cache.load()
+            await shot_counter.set_count(tip_cache.record)
         except Exception as e:
-            if attempt < max_retries - 1: time.sleep(0.1)
-            else: return {"success": False, "error": f"EEPROM 읽기 실패: {e}"}
-        finally:
-            if bus is not None:
-                try: bus.close()
-                except: pass
+            print(f"[EEPROM] MTR 2.0 CLASSYS 쓰기 후 다시 읽기 실패: {e}")
+    return {"success": True, "message": f"{layout.name} EEPROM 쓰기 성공", "i2c": {**timing, **result}}
 
-def write_eeprom_mtr40(tip_type, shot_count, year, month, day, maker_code):
-    if not eeprom_available: return {"success": False, "error": "EEPROM 기능 비활성화"}
-    eeprom_address = MTR40_EEPROM_ADDRESS; offset = MTR40_OFFSET
-    try:
-        bus = smbus2.SMBus(I2C_BUS)
-        bus.write_byte_data(eeprom_address, offset + 0, tip_type); time.sleep(0.01)
-        bus.write_byte_data(eeprom_address, offset + 1, (shot_count >> 8) & 0xFF); time.sleep(0.01)
-        bus.write_byte_data(eeprom_address, offset + 2, shot_count & 0xFF); time.sleep(0.01)
-        bus.write_byte_data(eeprom_address, offset + 9, (year - 2000) & 0xFF); time.sleep(0.01)
-        bus.write_byte_data(eeprom_address, offset + 10, month & 0xFF); time.sleep(0.01)
-        bus.write_byte_data(eeprom_address, offset + 11, day & 0xFF); time.sleep(0.01)
-        bus.write_byte_data(eeprom_address, offset + 12, maker_code & 0xFF); time.sleep(0.01)
-        bus.close()
-        return {"success": True, "message": f"MTR 4.0 EEPROM 쓰기 성공"}
-    except Exception as e: return {"success": False, "error": f"EEPROM 쓰기 실패: {e}"}
-
-def read_eeprom_mtr40():
+async def _read_mtr_eeprom(layout):
     if not eeprom_available: return {"success": False, "error": "EEPROM 기능 비활성화"}
-    eeprom_address = MTR40_EEPROM_ADDRESS; offset = MTR40_OFFSET
-    bus = None; max_retries = 3
+    max_retries = 3
     for attempt in range(max_retries):
         try:
-            bus = smbus2.SMBus(I2C_BUS)
-            tip_type = bus.read_byte_data(eeprom_address, offset + 0)
-            shot = bus.read_i2c_block_data(eeprom_address, offset + 1, 2); shot_count = (shot[0] << 8) | shot[1]
-            year_off = bus.read_byte_data(eeprom_address, offset + 9); month = bus.read_byte_data(eeprom_address, offset + 10); day = bus.read_byte_data(eeprom_address, offset + 11)
-            year = 2000 + year_off
-            maker_code = bus.read_byte_data(eeprom_address, offset + 12)
-            return {"success": True, "tipType": tip_type, "shotCount": shot_count, "year": year, "month": month, "day": day, "makerCode": maker_code, "mtrVersion": "4.0", "country": "ALL"}
+            record = await i2c_worker.run("mtr_eeprom_read", layout.read)
+            year, month, day = (int(v) for v in record["manufacture_date"].split("-"))
+            return {"success": True, "tipType": record["tip_type"], "shotCount": record["shot_count"], "year": year, "month": month, "day": day, "makerCode": record["manufacturer"]}
         except Exception as e:
-            if attempt < max_retries - 1: time.sleep(0.1)
+            if attempt < max_retries - 1: await asyncio.sleep(0.1)
             else: return {"success": False, "error": f"EEPROM 읽기 실패: {e}"}
-        finally:
-            if bus is not None:
-                try: bus.close()
-                except: pass
+
+async def write_eeprom_mtr20(tip_type, shot_count, year, month, day, maker_code, country="CLASSYS"):
+    layout = MTR20_CUTERA_LAYOUT if country == "CUTERA" else MTR20_CLASSYS_LAYOUT
+    return await _write_mtr_eeprom(layout, tip_type, shot_count, year, month, day, maker_code)
+
+async def read_eeprom_mtr20(country="CLASSYS"):
+    result = await _read_mtr_eeprom(MTR20_CUTERA_LAYOUT if country == "CUTERA" else MTR20_CLASSYS_LAYOUT)
+    if result["success"]:
+        result.update(mtrVersion="2.0", country=country)
+    return result
+
+async def write_eeprom_mtr40(tip_type, shot_count, year, month, day, maker_code):
+    return await _write_mtr_eeprom(MTR40_LAYOUT, tip_type, shot_count, year, month, day, maker_code)
+
+async def read_eeprom_mtr40():
+    result = await _read_mtr_eeprom(MTR40_LAYOUT)
+    if result["success"]:
+        result.update(mtrVersion="4.0", country="ALL")
+    return result
+
+# --- WebSocket 명령 ---
+# 명령별 파라미터 스키마/블로킹 여부/응답 타입은 등록 시 선언, handler는 dict 조회 한 번으로 디스패치
+commands = CommandRegistry()
+
+
+@commands.command("connect", reply="serial", blocking=True, params={
+    "port": Param(str, "auto"),
+    "baudrate": Param(float, 19200),
+    "parity": Param(str, "none"),
+    "databits": Param(float, 8),
+    "stopbits": Param((int, float, str), 1),
+})
+def cmd_connect(session, port, baudrate, parity, databits, stopbits):
+    # 포트 열기는 블로킹이므로 스레드에서 실행
+    return motor.connect(port, baudrate, parity, databits, stopbits)
+
+
+@commands.command("disconnect", reply="serial")
+def cmd_disconnect(session):
+    result = motor.disconnect()
+    # 기존과 같이 재연결 감시자가 다시 연결하도록 알림
+    motor_link_lost.set()
+    return result
+
+
+@commands.command("move", reply="serial", params={
+    "position": Param(float),
+    "mode": Param(str, "position"),
+    "motor_id": Param(int, None),
+})
+def cmd_move(session, position, mode, motor_id):
+    return motor.move_to_position(position, mode, motor_id)
+
+
+@commands.command("motor_keepalive", reply="motor_keepalive", params={"interval_ms": Param(float, 50)})
+def cmd_motor_keepalive(session, interval_ms):
+    # keep-alive(상태 폴링) 재전송 주기 설정 (ms, 0이면 재전송 안 함)
+    motor.set_keepalive_interval(interval_ms / 1000.0 if interval_ms else None)
+    return motor.get_tx_stats()
+
+
+@commands.command("trajectory", reply="trajectory", params={
+    "profile": Param(str, None),
+    "params": Param(dict, {}),
+    "points": Param(list, []),
+    "motor_id": Param(int, None),
+})
+def cmd_trajectory(session, profile, params, points, motor_id):
+    # 셋포인트 목록 또는 생성 프로파일(trapezoid / insertion)로 trajectory 실행
+    if profile == "trapezoid":
+        points = trapezoid_profile(**params)
+    elif profile == "insertion":
+        points = insertion_cycle_profile(**params)
+    result = motor.run_trajectory(points, motor_id)
+    return Reply(result=result, status=motor.get_trajectory_status())
+
+
+@commands.command("trajectory_stop", reply="trajectory")
+def cmd_trajectory_stop(session):
+    result = motor.stop_trajectory()
+    return Reply(result=result, status=motor.get_trajectory_status())
+
+
+@commands.command("trajectory_status", reply="trajectory_status")
+def cmd_trajectory_status(session):
+    return motor.get_trajectory_status()
+
+
+@commands.command("telemetry_history", reply="telemetry_history", params={
+    "seconds": Param(float, None),
+    "since": Param(float, None),
+    "until": Param(float, None),
+    "buckets": Param(int, None),
+    "fields": Param((list, tuple), ("setPos", "position", "force", "sensor")),
+    "motor_id": Param(int, None),
+})
+def cmd_telemetry_history(session, seconds, since, until, buckets, fields, motor_id):
+    # 링 버퍼에서 시간 구간 조회 (seconds: 최근 N초, since/until: time.monotonic 기준, buckets: 다운샘플)
+    return motor.get_telemetry_ring(motor_id).query(
+        seconds=seconds, since=since, until=until, buckets=buckets, fields=fields
+    )
+
+
+@commands.command("set_encoding", reply="set_encoding", params={"encoding": Param(str, "json")})
+def cmd_set_encoding(session, encoding):
+    # 상태 스트림 인코딩 협상 (명령/응답은 계속 JSON)
+    if encoding not in ENCODINGS:
+        raise ValueError(f"지원하지 않는 인코딩입니다: {encoding}")
+    session.encoding = encoding
+    session.needs_full = True  # 새 인코딩으로 전체 상태 재전송
+    return {"encoding": encoding, "version": STATUS_BINARY_VERSION}
+
+
+@commands.command("subscribe", reply="subscribe", params={
+    "topics": Param(list, None),
+    "rate_hz": Param(float, None),
+})
+def cmd_subscribe(session, topics, rate_hz):
+    # 받을 토픽(status/foot_switch/gpio17_status)과 상태 푸시 주기(Hz)
+    return session.subscribe(topics, rate_hz)
+
+
+@commands.command("gpio_stats", reply="gpio_stats")
+def cmd_gpio_stats(session):
+    # GPIO 엣지 -> 이벤트 루프 / 엣지 -> 클라이언트 전송 지연
+    return gpio_bridge.get_stats()
+
+
+@commands.command("client_stats", reply="client_stats")
+def cmd_client_stats(session):
+    # 클라이언트별 송신 큐 깊이/버린 상태 메시지 수
+    return [
+        {"remote": str(s.websocket.remote_address), "self": s is session, **s.get_stats()}
+        for s in list(client_sessions.values())
+    ]
+
+
+@commands.command("command_stats", reply="command_stats")
+def cmd_command_stats(session):
+    # 명령별 처리 시간 히스토그램/오류 수
+    return commands.get_stats()
+
+
+@commands.command("motor_tx_stats", reply="motor_tx_stats")
+def cmd_motor_tx_stats(session):
+    return {**motor.get_tx_stats(), **motor.get_parser_stats()}
+
+
+@commands.command("eeprom_read", reply="eeprom_read")
+async def cmd_eeprom_read(session):
+    try:
+        if eeprom_available:
+            # 마지막 읽기 이후 팁이 분리되지 않았으면 캐시에서 응답
+            eeprom_data, timing, cached = await tip_cache.read()
+            return {"success": True, "data": eeprom_data, "cached": cached, "i2c": timing}
+        return {"success": False, "error": "EEPROM 기능 사용 불가"}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@commands.command("eeprom_write", reply="eeprom_write", params={
+    "tip_type": Param(float, 64),
+    "shot_count": Param(float, 0),
+    "manufacture_date": Param(dict, {"year": 2024, "month": 1, "day": 1}),
+    "manufacturer": Param(float, 1),
+})
+async def cmd_eeprom_write(session, tip_type, shot_count, manufacture_date, manufacturer):
+    try:
+        if eeprom_available:
+            timing = await tip_cache.write_record(tip_type, shot_count, manufacture_date, manufacturer)
+            if tip_cache.record is not None:
+                await shot_counter.set_count(tip_cache.record)
+            return {"success": True, "message": "EEPROM 쓰기 완료", "i2c": timing}
+        return {"success": False, "error": "EEPROM 기능 사용 불가"}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@commands.command("shot_increment", reply="shot_increment")
+async def cmd_shot_increment(session):
+    if not eeprom_available:
+        print(f"[EEPROM] EEPROM 기능 사용 불가")
+        return {"success": False, "error": "EEPROM 기능 사용 불가"}
+    try:
+        # 저널 fsync 후 응답, EEPROM Shot Count는 ShotCounter가 모아서 기록
+        updated_data = await shot_counter.increment()
+        print(f"[EEPROM] shotCount 증가: {updated_data['shot_count']}")
+        return {"success": True, "data": updated_data}
+    except Exception as e:
+        oe = e if isinstance(e, OSError) else e.__cause__
+        if isinstance(oe, OSError) and oe.errno == 121:  # Remote I/O error
+            print(f"[EEPROM] I2C 통신 오류 (Errno 121): EEPROM이 연결되지 않았거나 I2C 버스에 문제가 있습니다.")
+            return {"success": False, "error": "EEPROM I2C 통신 오류: 하드웨어 연결을 확인하세요"}
+        if isinstance(oe, OSError):
+            print(f"[EEPROM] I2C OSError: {oe}")
+            return {"success": False, "error": f"I2C 오류: {str(oe)}"}
+        print(f"[EEPROM] shot_increment 오류: {str(e)}")
+        return {"success": False, "error": str(e)}
+
+
+@commands.command("i2c_stats", reply="i2c_stats")
+def cmd_i2c_stats(session):
+    # I2C 작업별 큐 대기/버스 점유 시간, 팁 EEPROM 캐시 적중
+    return {**i2c_worker.get_stats(), "tip_cache": tip_cache.get_stats(), "shot_journal": shot_counter.get_stats()}
+
+
+@commands.command("rf_shot", reply="rf_shot", params={
+    "intensity": Param(float, 50),
+    "rf_time": Param(float, 60),
+})
+def cmd_rf_shot(session, intensity, rf_time):
+    # RF 샷 명령 처리 - 프레임을 바로 쓰고 응답 (뒤따르는 rf_dtr_high가 RF 왕복을 기다리지 않도록)
+    # 제너레이터 응답 프레임과 응답 시간은 rf_shot_reply 메시지로 따로 보냄
+    if not (rf_connected and rf.is_attached()):
+        return "RF 연결되지 않음"
+
+    # RF 샷 중 LED 깜빡임 시작
+    if gpio_available and pin22 and pin27:
+        asyncio.create_task(blink_leds_during_rf_shot(rf_time))
+
+    # 1MHz 고정, level과 ontime은 같은 값으로 설정
+    frame = build_rf_shot_command(
+        rf_1MHz_checked=True,
+        rf_2MHz_checked=False,
+        level_val=int(intensity),
+        ontime_val=int(rf_time)
+    )
+
+    # 샷 구간에는 상태 조회를 쉼
+    rf_status.hold(rf_time / 1000.0)
+    sent_at = time.perf_counter()
+    try:
+        reply = rf.submit(frame)
+    except ConnectionError as e:
+        print(f"[RF] 샷 명령 전송 실패: {e}")
+        return f"RF 샷 명령 전송 실패: {e}"
+    reply.add_done_callback(lambda future: _send_rf_shot_reply(session, future, sent_at))
+    print(f"[RF] 샷 명령 전송: 1MHz, Level:{intensity}, OnTime:{rf_time}ms")
+    return "RF 샷 명령 전송 완료"
+
+
+def _send_rf_shot_reply(session, future, sent_at):
+    # 응답 DATA 형식이 확인되지 않았으므로 해석하지 않고 원시 프레임만 전달
+    if future.cancelled():
+        return
+    if future.exception() is None:
+        result = {
+            "reply": future.result().hex().upper(),
+            "reply_ms": round((time.perf_counter() - sent_at) * 1000, 3),
+        }
+        print(f"[RF] 샷 명령 응답: {result['reply']} ({result['reply_ms']}ms)")
+    else:
+        result = {"reply": None, "reply_ms": None, "error": str(future.exception())}
+        print(f"[RF] 샷 명령 응답 없음: {future.exception()}")
+    session.send(json.dumps({"type": "rf_shot_reply", "result": result}))
+
+
+@commands.command("rf_stats", reply="rf_stats")
+def cmd_rf_stats(session):
+    # RF 요청/응답 수, 응답 대기 시간, 타임아웃, 프레임 오류
+    return {"connected": rf_connected, **rf.get_stats(), "generator": rf_status.get_stats()}
+
+
+@commands.command("shot_recipe", reply="shot_recipe", params={
+    "depth": Param(float),
+    "intensity": Param(float),
+    "rf_time": Param(float),
+    "delay_time": Param(float, 0),
+    "enabled": Param(bool, True),
+})
+def cmd_shot_recipe(session, depth, intensity, rf_time, delay_time, enabled):
+    # 백엔드 샷 시퀀서 레시피 (depth는 모터 위치 단위: mm * 100)
+    shot_sequencer.configure(ShotRecipe(depth, intensity, rf_time, delay_time), enabled)
+    return shot_sequencer.get_stats()
+
+
+@commands.command("shot_trigger", reply="shot_trigger")
+def cmd_shot_trigger(session):
+    # 풋 스위치 없이 샷 한 번 실행 (결과는 shot_complete 이벤트)
+    return {"started": shot_sequencer.trigger(None)}
+
+
+@commands.command("shot_sequencer_stats", reply="shot_sequencer_stats")
+def cmd_shot_sequencer_stats(session):
+    return shot_sequencer.get_stats()
+
+
+@commands.command("force_arm", reply="force_arm", params={
+    "threshold": Param(float),
+    "hysteresis": Param(float, 0.5),
+    "dwell_ms": Param(float, 0),
+    "action": Param(str, "pulse"),
+    "intensity": Param(float, 50),
+    "rf_time": Param(float, 60),
+    "rearm": Param(bool, False),
+    "motor_id": Param(int, None),
+})
+async def cmd_force_arm(session, threshold, hysteresis, dwell_ms, action, intensity, rf_time, rearm, motor_id):
+    # force >= threshold가 dwell_ms 동안 유지되면 발사 (pulse: DTR 펄스, rf: RF 샷 프레임)
+    if motor_id is None:
+        motor_id = motor.get_motor_ids()[0]
+    config = ForceTriggerConfig(threshold, hysteresis, dwell_ms / 1000.0, action, intensity, rf_time, rearm, motor_id)
+    try:
+        await force_trigger.arm(config)
+    except (RuntimeError, TimeoutError, ConnectionError) as e:
+        print(f"[FORCE] 트리거 설정 실패: {e}")
+        return {"success": False, "error": str(e)}
+    return {"success": True, **force_trigger.get_stats()}
+
+
+@commands.command("force_disarm", reply="force_disarm")
+def cmd_force_disarm(session):
+    force_trigger.disarm()
+    return force_trigger.get_stats()
+
+
+@commands.command("force_trigger_stats", reply="force_trigger_stats")
+def cmd_force_trigger_stats(session):
+    # 발사별 force, 수신 -> 평가 -> 발사 지연, 펄스 측정 결과
+    return force_trigger.get_stats()
+
+
+@commands.command("get_gpio17_status", reply="gpio17_status")
+def cmd_get_gpio17_status(session):
+    # 초기 GPIO17 상태 확인 (연결 시 한 번만)
+    if gpio_available and pin17:
+        gpio17_state = "HIGH" if pin17.is_pressed else "LOW"
+        print(f"[GPIO17] 초기 상태 전송: {gpio17_state}")
+        return Reply(data={"gpio17": gpio17_state, "needle_tip_connected": pin17.is_pressed})
+    return Reply(data={"gpio17": "UNKNOWN", "needle_tip_connected": False})
+
+
+@commands.command("rf_dtr_high", reply="rf_dtr_high", params={"rf_time": Param(float, 60)})
+def cmd_rf_dtr_high(session, rf_time):
+    # RF DTR HIGH 명령 처리 (GPIO0 제어)
+    if not (gpio_available and dtr_pulser):
+        return "GPIO 사용 불가"
+
+    # RF 샷 중 LED 깜빡임 시작
+    if pin22 and pin27:
+        asyncio.create_task(blink_leds_during_rf_shot(rf_time))
+
+    rf_status.hold(rf_time / 1000.0)
+    # 펄스 스레드에 예약하고 바로 응답 - 폭은 펄스 스레드가 측정해서 기록
+    pulse = dtr_pulser.fire(rf_time)
+    pulse.add_done_callback(_log_dtr_pulse)
+    print(f"[GPIO0] DTR HIGH 펄스 예약 ({rf_time}ms)")
+    return f"DTR {rf_time}ms HIGH 펄스 예약 완료"
+
+
+def _log_dtr_pulse(pulse):
+    if pulse.exception() is None:
+        result = pulse.result()
+        print(f"[GPIO0] DTR LOW - 실제 {result['actual_ms']}ms (오차 {result['error_us']}us)")
+
+
+@commands.command("rf_pulse_stats", reply="rf_pulse_stats")
+def cmd_rf_pulse_stats(session):
+    # DTR 펄스별 실제 폭/오차/지연 기록
+    if not dtr_pulser:
+        return {"success": False, "error": "GPIO 사용 불가"}
+    return dtr_pulser.get_stats()
+
 
 async def handler(websocket):
     print("[INFO] 클라이언트 연결됨")
-    connected_clients.add(websocket)
+    session = ClientSession(websocket)
+    client_sessions[websocket] = session
+    session.start(next_status_payload)
     try:
         async for msg in websocket:
             try:
                 data = json.loads(msg)
-                # handler 함수 내부 로직은 이전과 동일
-                # ...
-                if data["cmd"] == "connect":
-                    result = motor.connect(data.get("port"), data.get("baudrate"), data.get("parity"), data.get("databits"), data.get("stopbits"))
-                    await websocket.send(json.dumps({"type": "serial", "result": result}))
-                elif data["cmd"] == "disconnect":
-                    result = motor.disconnect()
-                    await websocket.send(json.dumps({"type": "serial", "result": result}))
-                elif data["cmd"] == "move":
-                    result = motor.move_to_position(data.get("position"), data.get("mode", "position"))
-                    await websocket.send(json.dumps({"type": "serial", "result": result}))
-                elif data["cmd"] == "eeprom_read":
-                    try:
-                        if eeprom_available:
-                            eeprom_data = read_eeprom_data(I2C_BUS, 0x50, 0x10)
-                            result = {"success": True, "data": eeprom_data}
-                        else:
-                            result = {"success": False, "error": "EEPROM 기능 사용 불가"}
-                    except Exception as e:
-                        result = {"success": False, "error": str(e)}
-                    await websocket.send(json.dumps({"type": "eeprom_read", "result": result}))
-                elif data["cmd"] == "eeprom_write":
-                    try:
-                        if eeprom_available:
-                            tip_type = data.get("tip_type", 64)
-                            shot_count = data.get("shot_count", 0)
-                            manufacture_date = data.get("manufacture_date", {"year": 2024, "month": 1, "day": 1})
-                            manufacturer = data.get("manufacturer", 1)
-                            
-                            write_eeprom_data(I2C_BUS, 0x50, 0x10, tip_type, shot_count, manufacture_date, manufacturer)
-                            result = {"success": True, "message": "EEPROM 쓰기 완료"}
-                        else:
-                            result = {"success": False, "error": "EEPROM 기능 사용 불가"}
-                    except Exception as e:
-                        result = {"success": False, "error": str(e)}
-                    await websocket.send(json.dumps({"type": "eeprom_write", "result": result}))
-                elif data["cmd"] == "shot_increment":
-                    try:
-                        print(f"[EEPROM] shot_increment 명령 수신")
-                        print(f"[EEPROM] eeprom_available: {eeprom_available}")
-                        
-                        if eeprom_available:
-                            try:
-                                # I2C 버스 재초기화 시도
-                                import smbus2
-                                bus = smbus2.SMBus(I2C_BUS)
-                                
-                                # EEPROM 연결 테스트
-                                test_read = bus.read_byte_data(0x50, 0x10)
-                                print(f"[EEPROM] I2C 연결 테스트 성공: {test_read}")
-                                bus.close()
-                                
-                                # 현재 EEPROM 데이터 읽기
-                                print(f"[EEPROM] 현재 데이터 읽기 시작 - I2C_BUS: {I2C_BUS}, Address: 0x50, Offset: 0x10")
-                                current_data = read_eeprom_data(I2C_BUS, 0x50, 0x10)
-                                print(f"[EEPROM] 현재 데이터: {current_data}")
-                                
-                                # shotCount 증가
-                                old_shot_count = current_data["shot_count"]
-                                new_shot_count = old_shot_count + 1
-                                print(f"[EEPROM] shotCount 증가: {old_shot_count} -> {new_shot_count}")
-                                
-                                # EEPROM에 업데이트된 shotCount 쓰기
-                                manufacture_date_parts = current_data["manufacture_date"].split("-")
-                                manufacture_date = {
-                                    "year": int(manufacture_date_parts[0]),
-                                    "month": int(manufacture_date_parts[1]),
-                                    "day": int(manufacture_date_parts[2])
-                                }
-                                print(f"[EEPROM] 제조일자: {manufacture_date}")
-                                
-                                print(f"[EEPROM] EEPROM 쓰기 시작...")
-                                write_eeprom_data(
-                                    I2C_BUS, 0x50, 0x10,
-                                    current_data["tip_type"],
-                                    new_shot_count,
-                                    manufacture_date,
-                                    current_data["manufacturer"]
-                                )
-                                print(f"[EEPROM] EEPROM 쓰기 완료")
-                                
-                                # 쓰기 완료 후 잠시 대기
-                                import time
-                                time.sleep(0.1)
-                                
-                                # 업데이트된 데이터 다시 읽기
-                                print(f"[EEPROM] 업데이트된 데이터 다시 읽기...")
-                                updated_data = read_eeprom_data(I2C_BUS, 0x50, 0x10)
-                                print(f"[EEPROM] 업데이트된 데이터: {updated_data}")
-                                
-                                result = {"success": True, "data": updated_data}
-                                
-                            except OSError as oe:
-                                if oe.errno == 121:  # Remote I/O error
-                                    print(f"[EEPROM] I2C 통신 오류 (Errno 121): EEPROM이 연결되지 않았거나 I2C 버스에 문제가 있습니다.")
-                                    result = {"success": False, "error": "EEPROM I2C 통신 오류: 하드웨어 연결을 확인하세요"}
-                                else:
-                                    print(f"[EEPROM] I2C OSError: {oe}")
-                                    result = {"success": False, "error": f"I2C 오류: {str(oe)}"}
-                        else:
-                            print(f"[EEPROM] EEPROM 기능 사용 불가")
-                            result = {"success": False, "error": "EEPROM 기능 사용 불가"}
-                    except Exception as e:
-                        print(f"[EEPROM] shot_increment 오류: {str(e)}")
-                        import traceback
-                        traceback.print_exc()
-                        result = {"success": False, "error": str(e)}
-                    await websocket.send(json.dumps({"type": "shot_increment", "result": result}))
-                elif data["cmd"] == "rf_shot":
-                    # RF 샷 명령 처리
-                    if rf_connected and rf_connection:
-                        intensity = data.get("intensity", 50)  # INTENSITY 값 (기본값 50%)
-                        rf_time = data.get("rf_time", 60)      # RF 시간 값 (기본값 60ms)
-                        
-                        # RF 샷 중 LED 깜빡임 시작
-                        if gpio_available and pin22 and pin27:
-                            asyncio.create_task(blink_leds_during_rf_shot(rf_time))
-                        
-                        # 1MHz 고정, level과 ontime은 같은 값으로 설정
-                        frame = build_rf_shot_command(
-                            rf_1MHz_checked=True,
-                            rf_2MHz_checked=False, 
-                            level_val=intensity,
-                            ontime_val=rf_time
-                        )
-                        
-                        rf_connection.write(frame)
-                        print(f"[RF] 샷 명령 전송: 1MHz, Level:{intensity}, OnTime:{rf_time}ms")
-                        await websocket.send(json.dumps({"type": "rf_shot", "result": "RF 샷 명령 전송 완료"}))
-                    else:
-                        await websocket.send(json.dumps({"type": "rf_shot", "result": "RF 연결되지 않음"}))
-                elif data["cmd"] == "get_gpio17_status":
-                    # 초기 GPIO17 상태 확인 (연결 시 한 번만)
-                    if gpio_available and pin17:
-                        gpio17_state = "HIGH" if pin17.is_pressed else "LOW"
-                        needle_tip_connected = pin17.is_pressed
-                        
-                        gpio17_event = {
-                            "type": "gpio17_status",
-                            "data": {
-                                "gpio17": gpio17_state,
-                                "needle_tip_connected": needle_tip_connected
-                            }
-                        }
-                        await websocket.send(json.dumps(gpio17_event))
-                        print(f"[GPIO17] 초기 상태 전송: {gpio17_state}")
-                    else:
-                        await websocket.send(json.dumps({"type": "gpio17_status", "data": {"gpio17": "UNKNOWN", "needle_tip_connected": False}}))
-                elif data["cmd"] == "rf_dtr_high":
-                    # RF DTR HIGH 명령 처리 (GPIO0 제어)
-                    if gpio_available and pin0:
-                        rf_time = data.get("rf_time", 60)  # RF 시간 값 (ms)
-                        
-                        # RF 샷 중 LED 깜빡임 시작
-                        if gpio_available and pin22 and pin27:
-                            asyncio.create_task(blink_leds_during_rf_shot(rf_time))
-                        
-                        # DTR HIGH 설정
-                        pin0.on()
-                        print(f"[GPIO0] DTR HIGH 설정 ({rf_time}ms)")
-                        
-                        # 지정된 시간만큼 대기 후 LOW로 변경
-                        await asyncio.sleep(rf_time / 1000.0)  # ms를 초로 변환
-                        
-                        pin0.off()
-                        print(f"[GPIO0] DTR LOW 설정")
-                        
-                        await websocket.send(json.dumps({"type": "rf_dtr_high", "result": f"DTR {rf_time}ms 동안 HIGH 설정 완료"}))
-                    else:
-                        await websocket.send(json.dumps({"type": "rf_dtr_high", "result": "GPIO 사용 불가"}))
-                else:
-                    await websocket.send(json.dumps({"type": "error", "result": "알 수 없는 명령어"}))
+                reply = await commands.dispatch(session, data)
+                if reply is not None:
+                    session.send(json.dumps(reply))
             except Exception as e:
                 print(f"[ERROR] 처리 중 에러: {str(e)}")
-                await websocket.send(json.dumps({"type": "error", "result": str(e)}))
+                session.send(json.dumps({"type": "error", "result": str(e)}))
     finally:
-        connected_clients.discard(websocket)
+        session.stop()
+        client_sessions.pop(websocket, None)
         print("[INFO] 클라이언트 연결 해제됨")
 
-async def check_and_reconnect_motor():
-    max_motor_retries = 3
-    if not motor.is_connected():
-        print("[MOTOR] 연결 끊어짐, 재연결 시도...")
-        for i in range(max_motor_retries):
+async def motor_reconnect_supervisor():
+    """
+    모터 연결이 끊기면 이벤트 루프를 막지 않고 재연결합니다.
+    - 연결 해제는 리더 스레드의 on_disconnect 콜백(motor_link_lost)으로 즉시 감지
+    - /dev/usb-motor가 없으면 inotify로 생성 이벤트를 기다리고, 실패 시 지수 백오프
+    - 포트 열기(motor.connect)는 스레드에서 실행
+    """
+    backoff = MOTOR_RECONNECT_BACKOFF_MIN
+    while True:
+        if motor.is_connected():
+            backoff = MOTOR_RECONNECT_BACKOFF_MIN
+            motor_link_lost.clear()
+            if motor.is_connected():
+                await motor_link_lost.wait()
+            continue
+
+        print("[MOTOR] 연결 끊어짐, 재연결 대기...")
+        appeared = await device_watcher.wait_for(MOTOR_DEVICE_PATH, timeout=backoff)
+        if appeared:
             try:
-                # 안전 종료
-                if hasattr(motor, 'disconnect'):
-                    motor.disconnect()
-                await asyncio.sleep(1.0)
-
-                # 재시도: 반드시 connect 호출
-                result = motor.connect('auto', 19200, 'none', 8, 1)
-                print(f"[MOTOR] 재연결 시도 {i+1}: {result}")
-                if motor.is_connected():
-                    print(f"[MOTOR] 재연결 성공 (시도 {i+1})")
-                    return True
+                result = await asyncio.to_thread(motor.connect, 'auto', 19200, 'none', 8, 1)
+                print(f"[MOTOR] 재연결 시도: {result}")
             except Exception as e:
-                print(f"[MOTOR] 재연결 실패 {i+1}: {e}")
-        print("[MOTOR] 최대 재시도 횟수 초과")
-        return False
-    return True
-
+                print(f"[MOTOR] 재연결 실패: {e}")
+            if motor.is_connected():
+                print("[MOTOR] 재연결 성공")
+                continue
+            # 장치 노드는 있지만 열기 실패 (udev 권한 설정 중 등) - 백오프 후 재시도
+            await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, MOTOR_RECONNECT_BACKOFF_MAX)
 
-async def push_motor_status():
-    global motor_reconnect_task
-    while True:
-        await asyncio.sleep(0.05)
-        
-        # 풋 스위치 이벤트 큐 처리
-        try:
-            while not foot_switch_queue.empty():
-                foot_switch_data = foot_switch_queue.get_nowait()
-                print(f"[GPIO12] 큐에서 풋 스위치 이벤트 처리: {json.dumps(foot_switch_data)}")
-                print(f"[GPIO12] 연결된 클라이언트 수: {len(connected_clients)}")
-                
-                success_count = 0
-                for ws in connected_clients.copy():
-                    try:
-                        await ws.send(json.dumps(foot_switch_data))
-                        success_count += 1
-                        print(f"[GPIO12] 클라이언트에게 신호 전송 성공 ({success_count})")
-                    except Exception as e:
-                        print(f"[WARN] 풋 스위치 신호 전송 실패: {e}")
-                        connected_clients.discard(ws)
-                
-                print(f"[GPIO12] 총 {success_count}개 클라이언트에게 신호 전송 완료")
-        except queue.Empty:
-            pass
-        
-        motor_connected = motor.is_connected()
-        if not motor_connected and (motor_reconnect_task is None or motor_reconnect_task.done()):
-            motor_reconnect_task = asyncio.create_task(check_and_reconnect_motor())
 
-        
-        data = {}
-        if motor_connected:
-            data = {
-                "type": "status",
-                "data": {
-                    "position": motor.position, "force": motor.force, "sensor": motor.sensor, "setPos": motor.setPos,
-                    "motor_connected": True,
-                    "rf_connected": rf_connected,
-                }
-            }
-        else:
-            data = {
-                "type": "status",
-                "data": {
-                    "motor_connected": False,
-                    "rf_connected": rf_connected,
-                }
+def build_status_message(snapshots, motor_connected):
+    """상태 메시지 전체 (모든 클라이언트에 같은 내용이므로 틱당 한 번만 만듦)"""
+    generator = rf_status.summary()
+    if not motor_connected:
+        data = {
+            "type": "status",
+            "data": {
+                "motor_connected": False,
+                "rf_connected": rf_connected,
             }
+        }
+        if generator is not None:
+            data["data"]["rf_status"] = generator
+        return data
+    snapshot = snapshots[MOTOR_IDS[0]]
+    data = {
+        "type": "status",
+        "data": {
+            "position": snapshot.position, "force": snapshot.force, "sensor": snapshot.sensor, "setPos": snapshot.setPos,
+            "seq": snapshot.seq,
+            "motor_connected": True,
+            "rf_connected": rf_connected,
+        }
+    }
+    if len(snapshots) > 1:
+        # 멀티드롭 버스: 모터 ID별 텔레메트리
+        data["data"]["motors"] = {
+            str(motor_id): {"position": s.position, "force": s.force, "sensor": s.sensor, "setPos": s.setPos, "seq": s.seq}
+            for motor_id, s in snapshots.items()
+        }
+    if generator is not None:
+        data["data"]["rf_status"] = generator
+    return data
+
+
+def build_heartbeat_message(snapshots, motor_connected):
+    """값이 바뀌지 않은 구간의 생존 신호 (클라이언트는 status의 data를 병합하므로 기존 값이 유지됨)"""
+    data = {"motor_connected": motor_connected, "rf_connected": rf_connected, "heartbeat": True}
+    if motor_connected:
+        data["seq"] = snapshots[MOTOR_IDS[0]].seq
+    return {"type": "status", "data": data}
+
+
+def publish_event(topic, message, on_sent=None):
+    """
+    이벤트를 한 번만 직렬화해서 구독 중인 클라이언트의 송신 큐에 넣습니다 (이벤트 루프에서 호출).
+    on_sent는 클라이언트마다 전송이 끝나면 호출됩니다.
+    """
+    sessions = [session for session in list(client_sessions.values()) if session.wants(topic)]
+    if sessions:
+        payload = json.dumps(message)
+        for session in sessions:
+            session.send(payload, on_sent)
+    return len(sessions)
+
+
+def on_foot_switch_pressed(edge):
+    print(f"[GPIO12] 풋 스위치 눌림 (엣지 -> 루프 {(edge.dispatched_at - edge.edge_at) * 1000:.2f}ms)")
+    # 백엔드 시퀀서가 활성화되어 있으면 여기서 바로 샷 시작 (UI는 sequencer=True면 사이클을 돌리지 않음)
+    handled = shot_sequencer.trigger(edge)
+    foot_switch_data = {
+        "type": "foot_switch",
+        "data": {
+            "pressed": True,
+            "timestamp": edge.wall_time,
+            "sequencer": handled
+        }
+    }
+    sent = publish_event("foot_switch", foot_switch_data, lambda: gpio_bridge.delivered(edge))
+    print(f"[GPIO12] {sent}개 클라이언트에게 신호 전송")
+
+
+def on_sequencer_rf_shot(rf_time):
+    # 시퀀서 RF 구간: 상태 조회 보류 + LED 깜빡임 (rf_shot/rf_dtr_high 명령과 같음)
+    rf_status.hold(rf_time / 1000.0)
+    if gpio_available and pin22 and pin27:
+        asyncio.create_task(blink_leds_during_rf_shot(rf_time))
+
+
+def on_shot_complete(result):
+    publish_event("shot_complete", {"type": "shot_complete", "data": result})
+
+
+shot_sequencer.on_rf_shot = on_sequencer_rf_shot
+shot_sequencer.on_complete = on_shot_complete
+force_trigger.on_rf_shot = on_sequencer_rf_shot
+
+
+def on_needle_tip_changed(edge):
+    connected = edge.name == "needle_tip_connected"
+    # 팁 EEPROM 캐시: 연결 시 한 번 읽어 두고(저널의 미반영 샷 적용) 분리 시 무효화 + 미반영 샷 기록 시도
+    if connected:
+        asyncio.get_running_loop().create_task(shot_counter.on_tip_connected())
+    else:
+        shot_counter.on_tip_disconnected()
+    gpio17_event = {
+        "type": "gpio17_status",
+        "data": {
+            "gpio17": "HIGH" if connected else "LOW",
+            "needle_tip_connected": connected,
+            "timestamp": edge.wall_time
+        }
+    }
+    publish_event("gpio17_status", gpio17_event, lambda: gpio_bridge.delivered(edge))
+
+
+gpio_bridge.on("foot_switch_pressed", on_foot_switch_pressed)
+gpio_bridge.on("needle_tip_connected", on_needle_tip_changed)
+gpio_bridge.on("needle_tip_disconnected", on_needle_tip_changed)
+
+
+_status_cache = {}  # (인코딩, heartbeat 여부) -> (프레임 키, 직렬화된 메시지)
+
+
+def next_status_payload(session):
+    """
+    세션의 이번 틱 상태 메시지 (보낼 것이 없으면 None).
+    같은 프레임/인코딩의 메시지는 한 번만 직렬화해서 모든 세션이 공유합니다.
+    """
+    motor_connected = bool(motor.is_connected())
+    # 한 프레임에서 나온 값 묶음을 한 번에 읽음 (찢어진 읽기 방지)
+    snapshots = motor.get_all_snapshots()
+
+    # keep-alive 응답으로 seq는 계속 증가하므로 값 자체가 바뀌었는지로 판단
+    generator = rf_status.summary()
+    values = (motor_connected, rf_connected, tuple(generator.values()) if generator else None) + (
+        tuple((s.position, s.force, s.sensor, s.setPos) for s in snapshots.values()) if motor_connected else ()
+    )
+    kind = session.status_due(values, time.monotonic())
+    if kind is None:
+        return None
+    heartbeat = kind == HEARTBEAT
+
+    frame_key = (values, tuple(s.seq for s in snapshots.values()))
+    cache_key = (session.encoding, heartbeat)
+    cached = _status_cache.get(cache_key)
+    if cached and cached[0] == frame_key:
+        return cached[1]
+
+    if session.encoding == "binary":
+        payload = encode_status(snapshots, motor_connected, rf_connected, heartbeat, generator)
+    else:
+        message = (build_heartbeat_message if heartbeat else build_status_message)(snapshots, motor_connected)
+        payload = json.dumps(message)
+    _status_cache[cache_key] = (frame_key, payload)
+    return payload
+
+
+def on_rf_link_lost(error):
+    global rf_connected
+    rf_connected = False
+    try:
+        rf_connection.close()
+    except Exception:
+        pass
+
+
+async def configure_rf_output():
+    # RF 출력 설정 명령 전송 후 응답 확인
+    print(f"[RF] 출력 설정 명령어 전송: {RF_OUTPUT_SETUP_COMMAND.hex().upper()}")
+    try:
+        reply = await rf.request(RF_OUTPUT_SETUP_COMMAND)
+        print(f"[RF] 출력 설정 응답: {reply.hex().upper()}")
+    except (TimeoutError, ConnectionError) as e:
+        print(f"[RF] 출력 설정 응답 없음: {e}")
 
-        for ws in connected_clients.copy():
-            try:
-                await ws.send(json.dumps(data))
-            except Exception as e:
-                print(f"[WARN] 상태 전송 실패: {e}")
-                connected_clients.discard(ws)
 
 async def main():
+    global motor_link_lost
+    loop = asyncio.get_running_loop()
+    motor_link_lost = asyncio.Event()
+    # 리더 스레드에서 호출되므로 이벤트 루프로 넘겨서 설정
+    motor.on_disconnect = lambda: loop.call_soon_threadsafe(motor_link_lost.set)
+    if isinstance(motor, MotorAsyncController):
+        # 시작 시 연결된 포트는 여기서 이벤트 루프에 등록됨
+        motor.attach_loop(loop)
+    gpio_bridge.attach_loop(loop)
+    force_trigger.attach_loop(loop)
+    # 발사 결과는 펄스 스레드 또는 이벤트 루프에서 오므로 루프로 넘겨서 전송
+    force_trigger.on_fire = lambda event: loop.call_soon_threadsafe(
+        publish_event, "force_trigger", {"type": "force_trigger", "data": event})
+    if dtr_pulser:
+        dtr_pulser.start()
+    if rf_connected and rf_connection:
+        rf.on_link_lost = on_rf_link_lost
+        rf.attach(rf_connection, loop)
+        asyncio.create_task(configure_rf_output())
+    rf_status.start()
+    i2c_worker.start()
+    # 지난 실행에서 EEPROM에 반영되지 못한 샷은 해당 팁이 연결될 때 기록됨
+    shot_journal.open()
+    if eeprom_available and gpio_available and pin17 and pin17.is_pressed:
+        # 시작 시 이미 연결되어 있는 팁
+        asyncio.create_task(shot_counter.on_tip_connected())
+    device_watcher.start(loop)
+    asyncio.create_task(motor_reconnect_supervisor())
+
     async with websockets.serve(handler, "0.0.0.0", 8765):
         print("[INFO] WebSocket 모터 서버 실행 중 (ws://0.0.0.0:8765)")
-        await push_motor_status()
+        try:
+            await asyncio.Future()  # 종료될 때까지 실행
+        finally:
+            # 종료 시 미반영 샷 기록 시도 (실패해도 저널에 남음)
+            try:
+                await asyncio.wait_for(shot_counter.flush(), 1.0)
+            except Exception as e:
+                print(f"[JOURNAL] 종료 시 EEPROM 기록 실패: {e}")
 
 def cleanup_gpio():
+    # 진행 중인 DTR 펄스를 끝낸 뒤 핀을 닫음
+    if dtr_pulser:
+        dtr_pulser.stop()
+
     # --- gpiozero 객체 정리 ---
     if gpio_available:
         try:
@@ -626,6 +935,10 @@ def cleanup_gpio():
             print("[OK] RF 연결 정리 완료")
         except Exception as e:
             print(f"[ERROR] RF 정리 오류: {e}")
+
+    # I2C 워커 정리 (SMBus 핸들 닫기)
+    i2c_worker.stop()
+    shot_journal.close()
     # --- [여기까지 수정] ---
 
 if __name__ == "__main__":
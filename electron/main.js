@@ -11,6 +11,59 @@ const maxReconnectAttempts = 5;
 const reconnectDelay = 2000;
 const serverUrl = 'ws://127.0.0.1:8765';
 
+// 바이너리 상태 프레임 (backend/telemetry_codec.py와 동일한 레이아웃)
+const STATUS_BINARY_VERSION = 1;
+const STATUS_KIND_HEARTBEAT = 0x02;
+const STATUS_HEADER_SIZE = 4;
+const STATUS_MOTOR_SIZE = 15;
+
+function decodeBinaryStatus(buf) {
+  const version = buf.readUInt8(0);
+  if (version !== STATUS_BINARY_VERSION) {
+    throw new Error(`지원하지 않는 바이너리 상태 버전: ${version}`);
+  }
+  const kind = buf.readUInt8(1);
+  const flags = buf.readUInt8(2);
+  const count = buf.readUInt8(3);
+  const data = {
+    motor_connected: (flags & 0x01) !== 0,
+    rf_connected: (flags & 0x02) !== 0,
+  };
+  if (flags & 0x04) {
+    // RF 제너레이터 응답 여부 (상태 응답 원시 바이트는 JSON 인코딩에만 있음)
+    data.rf_status = {
+      responding: (flags & 0x08) !== 0,
+    };
+  }
+  if (kind === STATUS_KIND_HEARTBEAT) {
+    data.heartbeat = true;
+  }
+
+  const motors = {};
+  let first = null;
+  for (let i = 0, offset = STATUS_HEADER_SIZE; i < count; i++, offset += STATUS_MOTOR_SIZE) {
+    const motor = {
+      seq: buf.readUInt32LE(offset + 1),
+      setPos: buf.readInt16LE(offset + 5),
+      position: buf.readInt16LE(offset + 7),
+      force: Math.round(buf.readFloatLE(offset + 9) * 10) / 10,
+      sensor: buf.readInt16LE(offset + 13),
+    };
+    motors[buf.readUInt8(offset)] = motor;
+    if (first === null) first = motor;
+  }
+
+  if (first !== null) {
+    if (kind === STATUS_KIND_HEARTBEAT) {
+      data.seq = first.seq;
+    } else {
+      Object.assign(data, first);
+      if (count > 1) data.motors = motors;
+    }
+  }
+  return { type: 'status', data };
+}
+
 function createWindow() {
   const win = new BrowserWindow({
     width: 1366,
@@ -52,14 +105,22 @@ function connectWebSocket() {
         win.webContents.send('websocket-connected');
       });
       
+      // 상태 스트림은 바이너리로 수신 (명령/응답은 JSON)
+      sendWebSocketCommand({ cmd: 'set_encoding', encoding: 'binary' });
+
       // 모터 자동 연결
       connectMotor();
     });
 
-    ws.on('message', (data) => {
+    ws.on('message', (data, isBinary) => {
       try {
-        const message = JSON.parse(data.toString());
-        console.log('[Main] WebSocket 메시지 수신:', message);
+        let message;
+        if (isBinary) {
+          message = decodeBinaryStatus(data);
+        } else {
+          message = JSON.parse(data.toString());
+          console.log('[Main] WebSocket 메시지 수신:', message);
+        }
         
         // 모든 렌더러 프로세스에 메시지 전달
         BrowserWindow.getAllWindows().forEach(win => {